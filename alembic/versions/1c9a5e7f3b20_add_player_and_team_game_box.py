@@ -0,0 +1,90 @@
+"""add player and team game box scores
+
+Revision ID: 1c9a5e7f3b20
+Revises: f40c8e25d913
+Create Date: 2026-10-19 16:42:20.583116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '1c9a5e7f3b20'
+down_revision: Union[str, None] = 'f40c8e25d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('player_game_box',
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.BigInteger(), nullable=False),
+    sa.Column('team_id', sa.BigInteger(), nullable=False),
+    sa.Column('opponent_team_id', sa.BigInteger(), nullable=False),
+    sa.Column('is_home', sa.Boolean(), nullable=False),
+    sa.Column('seconds_played', sa.Integer(), nullable=False),
+    sa.Column('pts', sa.Integer(), nullable=False),
+    sa.Column('field_goals_made', sa.Integer(), nullable=False),
+    sa.Column('field_goals_attempted', sa.Integer(), nullable=False),
+    sa.Column('two_pointers_made', sa.Integer(), nullable=False),
+    sa.Column('two_pointers_attempted', sa.Integer(), nullable=False),
+    sa.Column('three_pointers_made', sa.Integer(), nullable=False),
+    sa.Column('three_pointers_attempted', sa.Integer(), nullable=False),
+    sa.Column('free_throws_made', sa.Integer(), nullable=False),
+    sa.Column('free_throws_attempted', sa.Integer(), nullable=False),
+    sa.Column('offensive_rebounds', sa.Integer(), nullable=False),
+    sa.Column('defensive_rebounds', sa.Integer(), nullable=False),
+    sa.Column('total_rebounds', sa.Integer(), nullable=False),
+    sa.Column('assists', sa.Integer(), nullable=False),
+    sa.Column('steals', sa.Integer(), nullable=False),
+    sa.Column('blocks', sa.Integer(), nullable=False),
+    sa.Column('turnovers', sa.Integer(), nullable=False),
+    sa.Column('personal_fouls', sa.Integer(), nullable=False),
+    sa.Column('plus_minus', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+    sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('game_id', 'player_id')
+    )
+    op.create_index('ix_player_game_box_player_season', 'player_game_box', ['player_id', 'season_id'], unique=False)
+    op.create_table('team_game_box',
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.BigInteger(), nullable=False),
+    sa.Column('opponent_team_id', sa.BigInteger(), nullable=False),
+    sa.Column('is_home', sa.Boolean(), nullable=False),
+    sa.Column('pts', sa.Integer(), nullable=False),
+    sa.Column('field_goals_made', sa.Integer(), nullable=False),
+    sa.Column('field_goals_attempted', sa.Integer(), nullable=False),
+    sa.Column('two_pointers_made', sa.Integer(), nullable=False),
+    sa.Column('two_pointers_attempted', sa.Integer(), nullable=False),
+    sa.Column('three_pointers_made', sa.Integer(), nullable=False),
+    sa.Column('three_pointers_attempted', sa.Integer(), nullable=False),
+    sa.Column('free_throws_made', sa.Integer(), nullable=False),
+    sa.Column('free_throws_attempted', sa.Integer(), nullable=False),
+    sa.Column('offensive_rebounds', sa.Integer(), nullable=False),
+    sa.Column('defensive_rebounds', sa.Integer(), nullable=False),
+    sa.Column('total_rebounds', sa.Integer(), nullable=False),
+    sa.Column('assists', sa.Integer(), nullable=False),
+    sa.Column('steals', sa.Integer(), nullable=False),
+    sa.Column('blocks', sa.Integer(), nullable=False),
+    sa.Column('turnovers', sa.Integer(), nullable=False),
+    sa.Column('personal_fouls', sa.Integer(), nullable=False),
+    sa.Column('plus_minus', sa.Integer(), nullable=False),
+    sa.Column('matches_official', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+    sa.PrimaryKeyConstraint('game_id', 'team_id')
+    )
+    op.create_index('ix_team_game_box_team_season', 'team_game_box', ['team_id', 'season_id'], unique=False)
+    # existing games are filled from their stored events by python -m loaders.backfillLoader --rebuild-derived, the
+    # stat rules live in loaders/buildBoxScores.py. app/constants/schema.txt keeps the model on pbp_raw_event for
+    # seasons before the current one until that rebuild has run
+
+
+def downgrade() -> None:
+    op.drop_index('ix_team_game_box_team_season', table_name='team_game_box')
+    op.drop_table('team_game_box')
+    op.drop_index('ix_player_game_box_player_season', table_name='player_game_box')
+    op.drop_table('player_game_box')
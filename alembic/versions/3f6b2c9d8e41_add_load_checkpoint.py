@@ -0,0 +1,38 @@
+"""add load checkpoint
+
+Revision ID: 3f6b2c9d8e41
+Revises: 90199cdf1e57
+Create Date: 2026-10-19 09:12:04.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6b2c9d8e41'
+down_revision: Union[str, None] = '90199cdf1e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('load_checkpoint',
+    sa.Column('job', sa.Text(), nullable=False),
+    sa.Column('shard', sa.Text(), nullable=False),
+    sa.Column('status', sa.Text(), server_default=sa.text("'pending'"), nullable=False),
+    sa.Column('games_loaded', sa.Integer(), nullable=True),
+    sa.Column('events_loaded', sa.Integer(), nullable=True),
+    sa.Column('elapsed_seconds', sa.Float(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.Column('finished_at', postgresql.TIMESTAMP(), nullable=True),
+    sa.Column('updated_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('job', 'shard')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('load_checkpoint')
@@ -0,0 +1,40 @@
+"""add data version
+
+Revision ID: 47c2e8b1d0f9
+Revises: d7b35e90f1a4
+Create Date: 2026-10-19 18:51:27.630148
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '47c2e8b1d0f9'
+down_revision: Union[str, None] = 'd7b35e90f1a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # one sequence for every season so versions are comparable across seasons and never go backwards
+    op.execute('CREATE SEQUENCE data_version_seq')
+    op.create_table('data_version',
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('season_id')
+    )
+    # season 0 versions the objects spanning every season (rollups)
+    op.execute(
+        "INSERT INTO data_version (season_id, version) "
+        "SELECT season_id, nextval('data_version_seq') FROM (SELECT DISTINCT season_id FROM game WHERE season_id IS NOT NULL "
+        "UNION SELECT 0) s ORDER BY season_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('data_version')
+    op.execute('DROP SEQUENCE IF EXISTS data_version_seq')
@@ -0,0 +1,49 @@
+"""add pbp event actor
+
+Revision ID: 5b0e93d7a4c8
+Revises: e29a7b13c6f0
+Create Date: 2026-10-19 14:36:09.661257
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e93d7a4c8'
+down_revision: Union[str, None] = 'e29a7b13c6f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTOR_ROLES = ['shooter', 'assister', 'jump_ball_winner', 'jump_ball_loser', 'jump_ball_recovered', 'rebounder',
+               'turnover', 'foul_drawn', 'fouler', 'stealer', 'blocker', 'sub_in', 'sub_out']
+
+
+def upgrade() -> None:
+    op.create_table('pbp_event_actor',
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('event_num', sa.Integer(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.BigInteger(), nullable=False),
+    sa.Column('role', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+    sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('game_id', 'event_num', 'role', 'player_id')
+    )
+    # backfill from the events already loaded, one row per non-null actor column
+    values = ", ".join(f"('{role}', e.{role}_id)" for role in ACTOR_ROLES)
+    op.execute(
+        "INSERT INTO pbp_event_actor (game_id, event_num, season_id, player_id, role) "
+        "SELECT e.game_id, e.event_num, e.season_id, a.player_id, a.role "
+        f"FROM pbp_raw_event e CROSS JOIN LATERAL (VALUES {values}) AS a(role, player_id) "
+        "WHERE a.player_id IS NOT NULL"
+    )
+    op.create_index('ix_pbp_event_actor_player_season_role', 'pbp_event_actor', ['player_id', 'season_id', 'role'], unique=False,
+                    postgresql_include=['game_id', 'event_num'])
+    op.execute('ANALYZE pbp_event_actor')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pbp_event_actor_player_season_role', table_name='pbp_event_actor')
+    op.drop_table('pbp_event_actor')
@@ -0,0 +1,58 @@
+"""add question audit
+
+Revision ID: 5d8e2a4c9f16
+Revises: 47c2e8b1d0f9
+Create Date: 2026-10-19 19:32:08.214567
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e2a4c9f16'
+down_revision: Union[str, None] = '47c2e8b1d0f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('question_audit',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('asked_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('user_email', sa.Text(), nullable=True),
+    sa.Column('question', sa.Text(), nullable=False),
+    sa.Column('normalized_question', sa.Text(), nullable=False),
+    sa.Column('sql_hash', sa.Text(), nullable=True),
+    sa.Column('generated_sql', sa.Text(), nullable=True),
+    sa.Column('status', sa.Text(), nullable=False),
+    sa.Column('result_rows', sa.Integer(), nullable=True),
+    sa.Column('total_ms', sa.Float(), nullable=True),
+    sa.Column('stage_ms', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('llm_tokens', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_question_audit_asked_at', 'question_audit', ['asked_at'], unique=False)
+    op.create_index('ix_question_audit_sql_hash', 'question_audit', ['sql_hash'], unique=False)
+    op.create_index('ix_question_audit_normalized_question', 'question_audit', ['normalized_question'], unique=False)
+    # default privileges hand every new table to oracle_ro, but generated sql must never read users' questions
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'oracle_ro') THEN
+                REVOKE ALL ON TABLE question_audit FROM oracle_ro;
+            END IF;
+        END
+        $$;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_audit_normalized_question', table_name='question_audit')
+    op.drop_index('ix_question_audit_sql_hash', table_name='question_audit')
+    op.drop_index('ix_question_audit_asked_at', table_name='question_audit')
+    op.drop_table('question_audit')
@@ -0,0 +1,100 @@
+"""add season rollups
+
+Revision ID: 6e1b4d8c2a57
+Revises: 1c9a5e7f3b20
+Create Date: 2026-10-19 17:15:38.240981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1b4d8c2a57'
+down_revision: Union[str, None] = '1c9a5e7f3b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# every rollup needs a unique index over all rows for REFRESH ... CONCURRENTLY, so grouping keys are never null
+ROLLUPS = {
+    'mv_player_season_shooting': """
+        SELECT season_id, shooter_id AS player_id, coalesce(area, 'Unknown') AS area, coalesce(descriptor, 'none') AS descriptor,
+               shot_value, count(*) AS attempts, count(*) FILTER (WHERE shot_made) AS makes,
+               coalesce(sum(shot_value) FILTER (WHERE shot_made), 0) AS points
+        FROM pbp_raw_event
+        WHERE event_type IN ('2pt', '3pt') AND shooter_id IS NOT NULL AND shot_value IS NOT NULL
+        GROUP BY season_id, shooter_id, coalesce(area, 'Unknown'), coalesce(descriptor, 'none'), shot_value
+    """,
+    'mv_assist_pairs': """
+        SELECT season_id, event_team_id AS team_id, assister_id, shooter_id, count(*) AS assists,
+               count(*) FILTER (WHERE shot_value = 3) AS three_point_assists, coalesce(sum(shot_value), 0) AS points
+        FROM pbp_raw_event
+        WHERE assister_id IS NOT NULL AND shooter_id IS NOT NULL AND event_team_id IS NOT NULL
+        GROUP BY season_id, event_team_id, assister_id, shooter_id
+    """,
+    'mv_team_season_opponent_scoring': """
+        SELECT season_id, opponent_team_id AS team_id, count(*) AS games, sum(pts) AS opponent_pts,
+               round(avg(pts), 2) AS opponent_pts_per_game, sum(field_goals_made) AS opponent_field_goals_made,
+               sum(field_goals_attempted) AS opponent_field_goals_attempted, sum(three_pointers_made) AS opponent_three_pointers_made,
+               sum(three_pointers_attempted) AS opponent_three_pointers_attempted, sum(free_throws_made) AS opponent_free_throws_made,
+               sum(free_throws_attempted) AS opponent_free_throws_attempted
+        FROM team_game_box
+        GROUP BY season_id, opponent_team_id
+    """,
+    'mv_player_season_home_away': """
+        SELECT season_id, player_id, is_home, count(*) FILTER (WHERE seconds_played > 0) AS games,
+               sum(seconds_played) AS seconds_played, sum(pts) AS pts, sum(total_rebounds) AS total_rebounds,
+               sum(assists) AS assists, sum(steals) AS steals, sum(blocks) AS blocks, sum(turnovers) AS turnovers,
+               sum(field_goals_made) AS field_goals_made, sum(field_goals_attempted) AS field_goals_attempted,
+               sum(three_pointers_made) AS three_pointers_made, sum(three_pointers_attempted) AS three_pointers_attempted,
+               sum(free_throws_made) AS free_throws_made, sum(free_throws_attempted) AS free_throws_attempted,
+               sum(plus_minus) AS plus_minus
+        FROM player_game_box
+        GROUP BY season_id, player_id, is_home
+    """,
+}
+
+UNIQUE_KEYS = {
+    'mv_player_season_shooting': ['season_id', 'player_id', 'area', 'descriptor', 'shot_value'],
+    'mv_assist_pairs': ['season_id', 'team_id', 'assister_id', 'shooter_id'],
+    'mv_team_season_opponent_scoring': ['season_id', 'team_id'],
+    'mv_player_season_home_away': ['season_id', 'player_id', 'is_home'],
+}
+
+# security definer so the loaders' app_rw role can refresh views it doesn't own, limited to the known rollups
+REFRESH_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION refresh_rollup(p_name text) RETURNS void
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    IF p_name NOT IN ({", ".join(f"'{name}'" for name in ROLLUPS)}) THEN
+        RAISE EXCEPTION 'unknown rollup %', p_name;
+    END IF;
+    EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', p_name);
+END
+$$;
+REVOKE ALL ON FUNCTION refresh_rollup(text) FROM PUBLIC;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'app_rw') THEN
+        GRANT EXECUTE ON FUNCTION refresh_rollup(text) TO app_rw;
+    END IF;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    for name, query in ROLLUPS.items():
+        op.execute(f'CREATE MATERIALIZED VIEW {name} AS {query}')
+        op.execute(f'CREATE UNIQUE INDEX ux_{name} ON {name} ({", ".join(UNIQUE_KEYS[name])})')
+    # leaderboard lookups that don't start from a single player
+    op.execute('CREATE INDEX ix_mv_player_season_shooting_season_area ON mv_player_season_shooting (season_id, area)')
+    op.execute('CREATE INDEX ix_mv_assist_pairs_season_shooter ON mv_assist_pairs (season_id, shooter_id)')
+    op.execute(REFRESH_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute('DROP FUNCTION IF EXISTS refresh_rollup(text)')
+    for name in reversed(list(ROLLUPS)):
+        op.execute(f'DROP MATERIALIZED VIEW IF EXISTS {name}')
@@ -0,0 +1,48 @@
+"""add possessions
+
+Revision ID: 8d2f61c0b7e5
+Revises: 5b0e93d7a4c8
+Create Date: 2026-10-19 15:02:47.318904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f61c0b7e5'
+down_revision: Union[str, None] = '5b0e93d7a4c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the old init.sql sketch (serial id, references to a pbp_raw_event id column) was never created by alembic
+    op.execute('DROP TABLE IF EXISTS possessions')
+    op.create_table('possessions',
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('possession_num', sa.Integer(), nullable=False),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('offense_team_id', sa.BigInteger(), nullable=False),
+    sa.Column('defense_team_id', sa.BigInteger(), nullable=False),
+    sa.Column('start_event_num', sa.Integer(), nullable=False),
+    sa.Column('end_event_num', sa.Integer(), nullable=False),
+    sa.Column('start_clock', sa.Interval(), nullable=True),
+    sa.Column('end_clock', sa.Interval(), nullable=True),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('result', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+    sa.PrimaryKeyConstraint('game_id', 'possession_num')
+    )
+    op.create_index('ix_possessions_season_offense', 'possessions', ['season_id', 'offense_team_id'], unique=False)
+    op.create_index('ix_possessions_season_defense', 'possessions', ['season_id', 'defense_team_id'], unique=False)
+    # existing games are filled from their stored events by python -m loaders.backfillLoader --rebuild-derived, the
+    # possession rules live in loaders/buildPossessions.py and aren't duplicated in sql
+
+
+def downgrade() -> None:
+    op.drop_index('ix_possessions_season_defense', table_name='possessions')
+    op.drop_index('ix_possessions_season_offense', table_name='possessions')
+    op.drop_table('possessions')
@@ -0,0 +1,86 @@
+"""add shots and shot bins
+
+Revision ID: 9a4f2c61e8d3
+Revises: 6e1b4d8c2a57
+Create Date: 2026-10-19 17:48:03.771529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f2c61e8d3'
+down_revision: Union[str, None] = '6e1b4d8c2a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREVIOUS_ROLLUPS = ['mv_player_season_shooting', 'mv_assist_pairs', 'mv_team_season_opponent_scoring', 'mv_player_season_home_away']
+ROLLUPS = PREVIOUS_ROLLUPS + ['mv_player_season_shot_bins']
+
+SHOT_BINS = """
+    SELECT season_id, shooter_id AS player_id, bin, count(*) AS attempts, count(*) FILTER (WHERE shot_made) AS makes,
+           coalesce(sum(shot_value) FILTER (WHERE shot_made), 0) AS points
+    FROM shots
+    WHERE bin IS NOT NULL
+    GROUP BY season_id, shooter_id, bin
+"""
+
+
+def _refresh_function(rollups: list[str]) -> str:
+    return f"""
+CREATE OR REPLACE FUNCTION refresh_rollup(p_name text) RETURNS void
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    IF p_name NOT IN ({", ".join(f"'{name}'" for name in rollups)}) THEN
+        RAISE EXCEPTION 'unknown rollup %', p_name;
+    END IF;
+    EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', p_name);
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    # replaces the unfinished init.sql sketch
+    op.execute('DROP TABLE IF EXISTS shots')
+    op.create_table('shots',
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('event_num', sa.Integer(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('shooter_id', sa.BigInteger(), nullable=False),
+    sa.Column('team_id', sa.BigInteger(), nullable=True),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('clock_seconds', sa.Float(), nullable=True),
+    sa.Column('shot_value', sa.Integer(), nullable=False),
+    sa.Column('shot_made', sa.Boolean(), nullable=True),
+    sa.Column('shot_distance', sa.Float(), nullable=True),
+    sa.Column('area', sa.Text(), nullable=True),
+    sa.Column('area_detail', sa.Text(), nullable=True),
+    sa.Column('descriptor', sa.Text(), nullable=True),
+    sa.Column('x', sa.Float(), nullable=True),
+    sa.Column('y', sa.Float(), nullable=True),
+    sa.Column('zone', sa.Text(), nullable=True),
+    sa.Column('bin', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+    sa.ForeignKeyConstraint(['shooter_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('game_id', 'event_num')
+    )
+    op.create_index('ix_shots_season_shooter_zone', 'shots', ['season_id', 'shooter_id', 'zone'], unique=False,
+                    postgresql_include=['shot_made', 'shot_value'])
+    op.create_index('ix_shots_season_bin', 'shots', ['season_id', 'bin'], unique=False,
+                    postgresql_include=['shot_made'])
+    # existing games are filled from their stored events by python -m loaders.backfillLoader --rebuild-derived, which
+    # refreshes mv_player_season_shot_bins once it's done. the coordinate and zone rules live in loaders/buildShots.py
+    op.execute(f'CREATE MATERIALIZED VIEW mv_player_season_shot_bins AS {SHOT_BINS}')
+    op.execute('CREATE UNIQUE INDEX ux_mv_player_season_shot_bins ON mv_player_season_shot_bins (season_id, player_id, bin)')
+    op.execute(_refresh_function(ROLLUPS))
+
+
+def downgrade() -> None:
+    op.execute(_refresh_function(PREVIOUS_ROLLUPS))
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS mv_player_season_shot_bins')
+    op.drop_index('ix_shots_season_bin', table_name='shots')
+    op.drop_index('ix_shots_season_shooter_zone', table_name='shots')
+    op.drop_table('shots')
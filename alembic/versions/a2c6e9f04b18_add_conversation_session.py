@@ -0,0 +1,49 @@
+"""add conversation session
+
+Revision ID: a2c6e9f04b18
+Revises: 5d8e2a4c9f16
+Create Date: 2026-10-19 21:14:37.508213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c6e9f04b18'
+down_revision: Union[str, None] = '5d8e2a4c9f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('conversation_session',
+    sa.Column('id', sa.Text(), nullable=False),
+    sa.Column('user_email', sa.Text(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('turns', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'[]'::jsonb"), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_conversation_session_expires_at', 'conversation_session', ['expires_at'], unique=False)
+    op.create_index('ix_conversation_session_user_email', 'conversation_session', ['user_email'], unique=False)
+    # like question_audit, generated sql must never read other users' conversations
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'oracle_ro') THEN
+                REVOKE ALL ON TABLE conversation_session FROM oracle_ro;
+            END IF;
+        END
+        $$;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conversation_session_user_email', table_name='conversation_session')
+    op.drop_index('ix_conversation_session_expires_at', table_name='conversation_session')
+    op.drop_table('conversation_session')
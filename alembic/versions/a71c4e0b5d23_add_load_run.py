@@ -0,0 +1,40 @@
+"""add load run
+
+Revision ID: a71c4e0b5d23
+Revises: 3f6b2c9d8e41
+Create Date: 2026-10-19 10:41:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71c4e0b5d23'
+down_revision: Union[str, None] = '3f6b2c9d8e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('load_run',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('run_name', sa.Text(), nullable=False),
+    sa.Column('status', sa.Text(), nullable=False),
+    sa.Column('started_at', postgresql.TIMESTAMP(), nullable=False),
+    sa.Column('finished_at', postgresql.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('elapsed_seconds', sa.Float(), nullable=True),
+    sa.Column('games', sa.Integer(), nullable=True),
+    sa.Column('events', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('stats', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_load_run_run_name'), 'load_run', ['run_name'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_load_run_run_name'), table_name='load_run')
+    op.drop_table('load_run')
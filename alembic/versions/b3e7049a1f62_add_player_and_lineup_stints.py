@@ -0,0 +1,74 @@
+"""add player and lineup stints
+
+Revision ID: b3e7049a1f62
+Revises: 8d2f61c0b7e5
+Create Date: 2026-10-19 15:31:12.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7049a1f62'
+down_revision: Union[str, None] = '8d2f61c0b7e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # replaces the unused init.sql sketch (serial id, references to a pbp_raw_event id column)
+    op.execute('DROP TABLE IF EXISTS player_stints')
+    op.create_table('player_stints',
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.BigInteger(), nullable=False),
+    sa.Column('team_id', sa.BigInteger(), nullable=False),
+    sa.Column('stint_num', sa.Integer(), nullable=False),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('start_event_num', sa.Integer(), nullable=False),
+    sa.Column('end_event_num', sa.Integer(), nullable=False),
+    sa.Column('start_clock', sa.Interval(), nullable=True),
+    sa.Column('end_clock', sa.Interval(), nullable=True),
+    sa.Column('seconds_played', sa.Integer(), nullable=False),
+    sa.Column('points_for', sa.Integer(), nullable=False),
+    sa.Column('points_against', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+    sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('game_id', 'player_id', 'stint_num')
+    )
+    op.create_index('ix_player_stints_player_season', 'player_stints', ['player_id', 'season_id'], unique=False,
+                    postgresql_include=['seconds_played', 'points_for', 'points_against'])
+    op.create_table('lineup_stints',
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.BigInteger(), nullable=False),
+    sa.Column('opponent_team_id', sa.BigInteger(), nullable=False),
+    sa.Column('stint_num', sa.Integer(), nullable=False),
+    sa.Column('lineup_hash', sa.Text(), nullable=False),
+    sa.Column('player_ids', postgresql.ARRAY(sa.BigInteger()), nullable=False),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('start_event_num', sa.Integer(), nullable=False),
+    sa.Column('end_event_num', sa.Integer(), nullable=False),
+    sa.Column('start_clock', sa.Interval(), nullable=True),
+    sa.Column('end_clock', sa.Interval(), nullable=True),
+    sa.Column('seconds_played', sa.Integer(), nullable=False),
+    sa.Column('points_for', sa.Integer(), nullable=False),
+    sa.Column('points_against', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+    sa.PrimaryKeyConstraint('game_id', 'team_id', 'stint_num')
+    )
+    op.create_index('ix_lineup_stints_season_team_lineup', 'lineup_stints', ['season_id', 'team_id', 'lineup_hash'], unique=False)
+    op.create_index('ix_lineup_stints_player_ids', 'lineup_stints', ['player_ids'], unique=False, postgresql_using='gin')
+    # existing games are filled from their stored events by python -m loaders.backfillLoader --rebuild-derived, the
+    # substitution replay lives in loaders/buildStints.py
+
+
+def downgrade() -> None:
+    op.drop_index('ix_lineup_stints_player_ids', table_name='lineup_stints')
+    op.drop_index('ix_lineup_stints_season_team_lineup', table_name='lineup_stints')
+    op.drop_table('lineup_stints')
+    op.drop_index('ix_player_stints_player_season', table_name='player_stints')
+    op.drop_table('player_stints')
@@ -0,0 +1,47 @@
+"""add pbp workload indexes
+
+Revision ID: c4d81f6a2b97
+Revises: a71c4e0b5d23
+Create Date: 2026-10-19 11:58:20.331870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d81f6a2b97'
+down_revision: Union[str, None] = 'a71c4e0b5d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# indexes on pbp_raw_event for the access paths generated questions use most (see benchmarks/question_corpus.json),
+# built concurrently so the loaders and /question keep working during the migration
+INDEXES = [
+    dict(index_name='ix_pbp_season_shooter_shots', columns=['season_id', 'shooter_id'],
+         postgresql_where=sa.text("event_type IN ('2pt', '3pt', 'freethrow')"),
+         postgresql_include=['game_id', 'event_type', 'shot_made', 'shot_value', 'area', 'event_team_id', 'home_team_id']),
+    dict(index_name='ix_pbp_season_assister', columns=['season_id', 'assister_id'],
+         postgresql_where=sa.text('assister_id IS NOT NULL'),
+         postgresql_include=['shooter_id', 'game_id', 'shot_value']),
+    dict(index_name='ix_pbp_season_rebounder', columns=['season_id', 'rebounder_id'],
+         postgresql_where=sa.text('rebounder_id IS NOT NULL'),
+         postgresql_include=['offensive_rebound', 'game_id']),
+    dict(index_name='ix_pbp_season_event_team_type', columns=['season_id', 'event_team_id', 'event_type']),
+    dict(index_name='ix_pbp_season_type_subtype', columns=['season_id', 'event_type', 'event_subtype']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index in INDEXES:
+            op.create_index(index['index_name'], 'pbp_raw_event', index['columns'], unique=False, postgresql_concurrently=True,
+                            if_not_exists=True, **{k: v for k, v in index.items() if k.startswith('postgresql_')})
+        op.execute('ANALYZE pbp_raw_event')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index in reversed(INDEXES):
+            op.drop_index(index['index_name'], table_name='pbp_raw_event', postgresql_concurrently=True, if_exists=True)
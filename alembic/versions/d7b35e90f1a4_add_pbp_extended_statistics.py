@@ -0,0 +1,55 @@
+"""add pbp extended statistics
+
+Revision ID: d7b35e90f1a4
+Revises: 9a4f2c61e8d3
+Create Date: 2026-10-19 18:20:44.905312
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b35e90f1a4'
+down_revision: Union[str, None] = '9a4f2c61e8d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# correlated column groups the planner otherwise multiplies as if independent
+PARENT_STATISTICS = {
+    'pbp_raw_event_type_subtype_stats': ['event_type', 'event_subtype'],
+    'pbp_raw_event_season_team_stats': ['season_id', 'event_team_id'],
+}
+# same groups as loaders.maintenance.PARTITION_STATISTICS, which creates them for partitions added later
+PARTITION_STATISTICS = {
+    'type_subtype': ['event_type', 'event_subtype'],
+    'team_type': ['event_team_id', 'event_type'],
+}
+
+
+def _partitions() -> list[str]:
+    rows = op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'pbp_raw_event'"
+    ))
+    return [row[0] for row in rows]
+
+
+def upgrade() -> None:
+    for name, columns in PARENT_STATISTICS.items():
+        op.execute(f'CREATE STATISTICS IF NOT EXISTS {name} (ndistinct, dependencies, mcv) ON {", ".join(columns)} FROM pbp_raw_event')
+    for partition in _partitions():
+        for suffix, columns in PARTITION_STATISTICS.items():
+            op.execute(f'CREATE STATISTICS IF NOT EXISTS {partition}_{suffix}_stats (ndistinct, dependencies, mcv) '
+                       f'ON {", ".join(columns)} FROM {partition}')
+        op.execute(f'ANALYZE {partition}')
+    op.execute('ANALYZE pbp_raw_event')
+
+
+def downgrade() -> None:
+    for partition in _partitions():
+        for suffix in PARTITION_STATISTICS:
+            op.execute(f'DROP STATISTICS IF EXISTS {partition}_{suffix}_stats')
+    for name in PARENT_STATISTICS:
+        op.execute(f'DROP STATISTICS IF EXISTS {name}')
@@ -0,0 +1,95 @@
+"""partition pbp_raw_event by season
+
+Revision ID: e29a7b13c6f0
+Revises: c4d81f6a2b97
+Create Date: 2026-10-19 13:20:45.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e29a7b13c6f0'
+down_revision: Union[str, None] = 'c4d81f6a2b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTOR_COLUMNS = ['shooter_id', 'assister_id', 'jump_ball_winner_id', 'jump_ball_loser_id', 'jump_ball_recovered_id',
+                 'rebounder_id', 'turnover_id', 'foul_drawn_id', 'fouler_id', 'stealer_id', 'blocker_id', 'sub_in_id', 'sub_out_id']
+TEAM_COLUMNS = ['home_team', 'away_team', 'possession_team', 'event_team']
+
+INDEXES = [
+    ("ix_pbp_season_shooter_shots", "(season_id, shooter_id) INCLUDE (game_id, event_type, shot_made, shot_value, area, event_team_id, home_team_id) "
+                                    "WHERE event_type IN ('2pt', '3pt', 'freethrow')"),
+    ("ix_pbp_season_assister", "(season_id, assister_id) INCLUDE (shooter_id, game_id, shot_value) WHERE assister_id IS NOT NULL"),
+    ("ix_pbp_season_rebounder", "(season_id, rebounder_id) INCLUDE (offensive_rebound, game_id) WHERE rebounder_id IS NOT NULL"),
+    ("ix_pbp_season_event_team_type", "(season_id, event_team_id, event_type)"),
+    ("ix_pbp_season_type_subtype", "(season_id, event_type, event_subtype)"),
+]
+
+# creates the list partition for a season on demand, security definer so the loaders' app_rw role can call it
+# without owning pbp_raw_event
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_pbp_partition(p_season_id integer) RETURNS text
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+DECLARE
+    partition_name text := format('pbp_raw_event_%s', p_season_id);
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format('CREATE TABLE %I PARTITION OF pbp_raw_event FOR VALUES IN (%s)', partition_name, p_season_id);
+    END IF;
+    RETURN partition_name;
+END
+$$;
+REVOKE ALL ON FUNCTION ensure_pbp_partition(integer) FROM PUBLIC;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'app_rw') THEN
+        GRANT EXECUTE ON FUNCTION ensure_pbp_partition(integer) TO app_rw;
+    END IF;
+END
+$$;
+"""
+
+
+def _add_constraints(table: str) -> None:
+    for column in ACTOR_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT pbp_raw_event_{column}_fkey FOREIGN KEY ({column}) REFERENCES player (id)")
+    for prefix in TEAM_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT pbp_raw_event_{prefix}_fkey FOREIGN KEY ({prefix}_id, {prefix}_abrev) "
+                   f"REFERENCES modern_team_index (id, abrev)")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT pbp_raw_event_game_id_fkey FOREIGN KEY (game_id) REFERENCES game (id)")
+
+
+def upgrade() -> None:
+    # the partition key has to be part of the primary key, so season_id joins (game_id, event_num)
+    op.execute("CREATE TABLE pbp_raw_event_partitioned (LIKE pbp_raw_event INCLUDING DEFAULTS) PARTITION BY LIST (season_id)")
+    op.execute("ALTER TABLE pbp_raw_event_partitioned ALTER COLUMN season_id SET NOT NULL")
+    op.execute(ENSURE_PARTITION_FUNCTION.replace("PARTITION OF pbp_raw_event ", "PARTITION OF pbp_raw_event_partitioned "))
+    op.execute("SELECT ensure_pbp_partition(season_id) FROM (SELECT DISTINCT season_id FROM pbp_raw_event WHERE season_id IS NOT NULL) s")
+    op.execute("INSERT INTO pbp_raw_event_partitioned SELECT * FROM pbp_raw_event")
+
+    op.drop_table('pbp_raw_event')
+    op.execute("ALTER TABLE pbp_raw_event_partitioned RENAME TO pbp_raw_event")
+    op.execute(ENSURE_PARTITION_FUNCTION)
+    op.execute("ALTER TABLE pbp_raw_event ADD CONSTRAINT pbp_raw_event_pkey PRIMARY KEY (game_id, event_num, season_id)")
+    _add_constraints('pbp_raw_event')
+    # indexes created on the parent cascade to every current and future partition
+    for name, definition in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON pbp_raw_event {definition}")
+    op.execute("ANALYZE pbp_raw_event")
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE pbp_raw_event_plain (LIKE pbp_raw_event INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE pbp_raw_event_plain ALTER COLUMN season_id DROP NOT NULL")
+    op.execute("INSERT INTO pbp_raw_event_plain SELECT * FROM pbp_raw_event")
+    op.drop_table('pbp_raw_event')
+    op.execute("DROP FUNCTION IF EXISTS ensure_pbp_partition(integer)")
+    op.execute("ALTER TABLE pbp_raw_event_plain RENAME TO pbp_raw_event")
+    op.execute("ALTER TABLE pbp_raw_event ADD CONSTRAINT pbp_raw_event_pkey PRIMARY KEY (game_id, event_num)")
+    _add_constraints('pbp_raw_event')
+    for name, definition in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON pbp_raw_event {definition}")
@@ -0,0 +1,78 @@
+"""add clock seconds and game state
+
+Revision ID: f40c8e25d913
+Revises: b3e7049a1f62
+Create Date: 2026-10-19 16:04:55.127630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f40c8e25d913'
+down_revision: Union[str, None] = 'b3e7049a1f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# same rules as PBPDataLoader.game_seconds_elapsed and GameStateBuilder
+GAME_SECONDS_ELAPSED = (
+    "CASE WHEN period <= 4 THEN (period - 1) * 720 + 720 - clock_seconds "
+    "ELSE 2880 + (period - 5) * 300 + 300 - clock_seconds END"
+)
+
+
+def upgrade() -> None:
+    op.add_column('pbp_raw_event', sa.Column('clock_seconds', sa.Float(), nullable=True))
+    op.add_column('pbp_raw_event', sa.Column('game_seconds_elapsed', sa.Float(), nullable=True))
+    op.execute('UPDATE pbp_raw_event SET clock_seconds = EXTRACT(EPOCH FROM clock) WHERE clock IS NOT NULL')
+    op.execute(f'UPDATE pbp_raw_event SET game_seconds_elapsed = {GAME_SECONDS_ELAPSED} WHERE clock_seconds IS NOT NULL')
+
+    op.create_table('game_state',
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('event_num', sa.Integer(), nullable=False),
+    sa.Column('season_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('clock_seconds', sa.Float(), nullable=False),
+    sa.Column('game_seconds_elapsed', sa.Float(), nullable=False),
+    sa.Column('seconds_remaining', sa.Float(), nullable=False),
+    sa.Column('home_score', sa.Integer(), nullable=False),
+    sa.Column('away_score', sa.Integer(), nullable=False),
+    sa.Column('margin', sa.Integer(), nullable=False),
+    sa.Column('is_clutch', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['game.id'], ),
+    sa.PrimaryKeyConstraint('game_id', 'event_num')
+    )
+    # backfill from the events already loaded, scores are carried forward over events that don't report one
+    op.execute(
+        """
+        INSERT INTO game_state (game_id, event_num, season_id, period, clock_seconds, game_seconds_elapsed,
+                                seconds_remaining, home_score, away_score, margin, is_clutch)
+        SELECT game_id, event_num, season_id, period, clock_seconds, game_seconds_elapsed,
+               CASE WHEN period <= 4 THEN (4 - period) * 720 + clock_seconds ELSE clock_seconds END,
+               home_score, away_score, home_score - away_score,
+               period >= 4 AND clock_seconds <= 300 AND abs(home_score - away_score) <= 5
+        FROM (
+            SELECT e.game_id, e.event_num, e.season_id, e.period, e.clock_seconds, e.game_seconds_elapsed,
+                   coalesce(max(e.home_score) OVER w, 0) AS home_score,
+                   coalesce(max(e.away_score) OVER w, 0) AS away_score
+            FROM pbp_raw_event e
+            WHERE e.event_type <> 'game'
+            WINDOW w AS (PARTITION BY e.game_id ORDER BY e.event_num)
+        ) s
+        WHERE clock_seconds IS NOT NULL
+        """
+    )
+    op.create_index('ix_game_state_season_clutch', 'game_state', ['season_id', 'game_id', 'event_num'], unique=False,
+                    postgresql_where=sa.text('is_clutch'))
+    op.create_index('ix_game_state_season_remaining_margin', 'game_state', ['season_id', 'seconds_remaining', 'margin'], unique=False)
+    op.execute('ANALYZE game_state')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_game_state_season_remaining_margin', table_name='game_state')
+    op.drop_index('ix_game_state_season_clutch', table_name='game_state')
+    op.drop_table('game_state')
+    op.drop_column('pbp_raw_event', 'game_seconds_elapsed')
+    op.drop_column('pbp_raw_event', 'clock_seconds')
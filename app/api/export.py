@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import psycopg
+import logging
+from app.core.config import settings
+from app.services.oracle import Oracle
+from app.services.auth_service import get_current_active_user
+from app.models.user import UserInDB
+from app.models.reqres import ExportRequest
+from app.services.rate_limiting import limiter
+from app.services.export import EXPORT_MEDIA_TYPES, ExportBusy, arrow_available, bounded, rollup_query, start_stream, stream_arrow, stream_csv
+
+router = APIRouter()
+log = logging.getLogger(__name__)
+
+# the full result table for a question (one sql generation call, no interpretation) or a season rollup, streamed as csv
+# or an arrow ipc stream. no pool connection is taken by the dependency, the stream holds its own while it runs
+@router.post("/export")
+@limiter.limit("5/minute")
+async def export_results(export: ExportRequest, request: Request,
+                         current_user: UserInDB = Depends(get_current_active_user)) -> StreamingResponse:
+    log.info(f"EXPORT ENDPOINT HIT BY USER: {current_user.email} ROLLUP: {export.rollup} FORMAT: {export.format}")
+    if export.format == "arrow" and not arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow export is not available")
+
+    if export.rollup:
+        query = rollup_query(export.rollup, export.season_id)
+        filename = export.rollup if export.season_id is None else f"{export.rollup}_{export.season_id}"
+    else:
+        oracle = Oracle(logger=log, schema=request.app.state.schema, client=request.app.state.openai_client)
+        generated = oracle.sanitize_sql(oracle.get_sql_from_question(export.question))
+        if not generated:
+            raise HTTPException(status_code=500, detail="Problem generating query")
+        query = generated
+        filename = "export"
+
+    chunks = stream_csv(bounded(query)) if export.format == "csv" else stream_arrow(bounded(query))
+    try:
+        body = await start_stream(chunks)
+    except ExportBusy:
+        log.warning(f"EXPORT REJECTED, ALL {settings.EXPORT_MAX_CONCURRENT} EXPORT SLOTS BUSY")
+        raise HTTPException(status_code=503, detail="Too many exports running, try again shortly", headers={"Retry-After": "5"})
+    except psycopg.Error as e:
+        log.error(f"PROBLEM RUNNING EXPORT QUERY: {e}")
+        raise HTTPException(status_code=500, detail="Problem querying database")
+
+    extension = "csv" if export.format == "csv" else "arrows"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[export.format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'})
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 from app.db.db import get_async_conn_ro
 from psycopg import AsyncConnection
 from app.services.oracle import Oracle
@@ -7,15 +7,29 @@ from app.models.user import UserInDB
 import logging
 from app.models.reqres import QuestionBase, AnswerBase
 from app.services.rate_limiting import limiter
+from app.services.metrics import new_trace
+from app.services.audit import audit_writer, audit_record
 
 router = APIRouter()
 log = logging.getLogger(__name__)
 
 @router.post("/question", response_model=AnswerBase)
 @limiter.limit("10/minute")
-async def get_answer(question: QuestionBase, request: Request, conn: AsyncConnection = Depends(get_async_conn_ro), 
+async def get_answer(question: QuestionBase, request: Request, response: Response, conn: AsyncConnection = Depends(get_async_conn_ro), 
                      current_user: UserInDB = Depends(get_current_active_user)) -> AnswerBase:
     log.info(f"QUESTION ENDPOINT HIT BY USER: {current_user.email} QUESTION LENGTH: {len(question.question)}")
-    oracle = Oracle(logger=log, schema=request.app.state.schema, client=request.app.state.openai_client)
-    textual_answer = await oracle.ask_oracle(question.question, conn=conn)
+    trace = new_trace()
+    trace.record("pool_wait", getattr(request.state, "pool_wait_seconds", 0.0))
+    oracle = Oracle(logger=log, schema=request.app.state.schema, client=request.app.state.openai_client,
+                    analytics=request.app.state.analytics)
+    status = "error"
+    try:
+        textual_answer = await oracle.ask_oracle(question.question, conn=conn, trace=trace)
+        status = "ok"
+    finally:
+        trace.finish(status)
+        audit_writer.submit(audit_record(current_user.email, question.question, trace, status))
+    server_timing = trace.server_timing()
+    if server_timing:
+        response.headers["Server-Timing"] = server_timing
     return AnswerBase(answer=textual_answer)
\ No newline at end of file
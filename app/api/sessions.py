@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from app.db.db import get_async_conn_ro, get_async_pool_rw
+from psycopg import AsyncConnection
+import psycopg
+import logging
+from app.services.oracle import Oracle
+from app.services.auth_service import get_current_active_user
+from app.models.user import UserInDB
+from app.models.reqres import QuestionBase, AnswerBase, SessionPublic
+from app.core.config import settings
+from app.services.rate_limiting import limiter
+from app.services.metrics import new_trace
+from app.services.audit import audit_writer, audit_record
+from app.services.sessions import create_session, get_session, save_turn, delete_session, result_cache
+
+router = APIRouter(prefix='/sessions', tags=['Sessions'])
+log = logging.getLogger(__name__)
+
+# multi-turn questions: the first question in a session runs the usual pipeline, follow-ups edit the previous sql with a
+# smaller prompt and can reuse cached results. the rw connection is only held to read / write the session, not across
+# the llm calls
+
+@router.post("", response_model=SessionPublic, status_code=201)
+@limiter.limit("10/minute")
+async def start_session(request: Request, current_user: UserInDB = Depends(get_current_active_user)) -> SessionPublic:
+    try:
+        async with get_async_pool_rw().connection() as conn:
+            session = await create_session(conn, current_user.email)
+    except psycopg.Error as e:
+        log.error(f"PROBLEM CREATING SESSION: {e}")
+        raise HTTPException(status_code=500, detail="DB Error when creating session.")
+    return SessionPublic(session_id=session.id, expires_in=settings.SESSION_TTL_SECONDS)
+
+@router.post("/{session_id}/question", response_model=AnswerBase)
+@limiter.limit("10/minute")
+async def ask_in_session(session_id: str, question: QuestionBase, request: Request, response: Response,
+                         conn: AsyncConnection = Depends(get_async_conn_ro),
+                         current_user: UserInDB = Depends(get_current_active_user)) -> AnswerBase:
+    log.info(f"SESSION QUESTION ENDPOINT HIT BY USER: {current_user.email} QUESTION LENGTH: {len(question.question)}")
+    try:
+        async with get_async_pool_rw().connection() as rw_conn:
+            session = await get_session(rw_conn, session_id, current_user.email)
+    except psycopg.Error as e:
+        log.error(f"PROBLEM LOADING SESSION: {e}")
+        raise HTTPException(status_code=500, detail="DB Error when loading session.")
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+
+    trace = new_trace()
+    trace.record("pool_wait", getattr(request.state, "pool_wait_seconds", 0.0))
+    oracle = Oracle(logger=log, schema=request.app.state.schema, client=request.app.state.openai_client,
+                    analytics=request.app.state.analytics)
+    status = "error"
+    try:
+        textual_answer, sql, result = await oracle.answer_question(question.question, conn=conn, trace=trace, turns=session.turns,
+                                                                   results=result_cache)
+        status = "ok"
+    finally:
+        trace.finish(status)
+        audit_writer.submit(audit_record(current_user.email, question.question, trace, status))
+
+    try:
+        async with get_async_pool_rw().connection() as rw_conn:
+            await save_turn(rw_conn, session, question.question, sql, result)
+    except psycopg.Error as e:
+        # the answer is still good, the next follow-up just won't see this turn
+        log.error(f"PROBLEM SAVING SESSION TURN: {e}")
+    server_timing = trace.server_timing()
+    if server_timing:
+        response.headers["Server-Timing"] = server_timing
+    return AnswerBase(answer=textual_answer)
+
+@router.delete("/{session_id}", status_code=204)
+@limiter.limit("10/minute")
+async def end_session(session_id: str, request: Request, current_user: UserInDB = Depends(get_current_active_user)) -> Response:
+    try:
+        async with get_async_pool_rw().connection() as conn:
+            deleted = await delete_session(conn, session_id, current_user.email)
+    except psycopg.Error as e:
+        log.error(f"PROBLEM ENDING SESSION: {e}")
+        raise HTTPException(status_code=500, detail="DB Error when ending session.")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return Response(status_code=204)
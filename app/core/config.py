@@ -16,6 +16,33 @@ class Settings(BaseSettings):
     DATABASE_URL_MIGRATIONS: str
     OPENAI_API_KEY: str
     SCHEMA_PATH: str
+    # per-stage question timings, /metrics and the Server-Timing header
+    METRICS_ENABLED: bool = True
+    # batched question_audit writes, records are dropped rather than queued past AUDIT_QUEUE_SIZE
+    AUDIT_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 2.0
+    # "duckdb" exports a parquet snapshot after each load and runs analytic generated sql on it in-process (needs the
+    # optional duckdb package), postgres stays the fallback and the system of record
+    ANALYTICS_BACKEND: Literal["postgres", "duckdb"] = "postgres"
+    ANALYTICS_SNAPSHOT_DIR: str = "snapshots"
+    # /export streams whole result sets, so it gets a longer statement timeout than /question and a row cap instead of 200
+    EXPORT_STATEMENT_TIMEOUT_SECONDS: int = 30
+    EXPORT_MAX_ROWS: int = 1_000_000
+    EXPORT_BATCH_ROWS: int = 10_000
+    # every export holds a ro pool connection while it streams: a few per process, each bounded in total time and in how
+    # long a slow client may leave its transaction idle
+    EXPORT_MAX_CONCURRENT: int = 2
+    EXPORT_SLOT_WAIT_SECONDS: float = 5.0
+    EXPORT_IDLE_TIMEOUT_SECONDS: int = 30
+    EXPORT_MAX_SECONDS: int = 300
+    # conversation sessions: sliding ttl, only the last few turns and a few rows of each result are kept for follow-ups
+    SESSION_TTL_SECONDS: int = 1800
+    SESSION_MAX_TURNS: int = 5
+    SESSION_RESULT_ROWS: int = 10
+    # per-process cache of query results for session turns, keyed on the sql and the current data version
+    SESSION_RESULT_CACHE_SIZE: int = 1000
 
     @property
     def server_host(self) -> str:
@@ -1,4 +1,6 @@
+import time
 from functools import lru_cache
+from fastapi import Request
 from psycopg_pool import AsyncConnectionPool
 
 from app.core.config import settings
@@ -21,9 +23,11 @@ def get_async_pool_rw():
 def get_async_pool_ar():
     return AsyncConnectionPool(DB_URL_AR, min_size=1, max_size=5, timeout=30, open=False)
 
-# getting async connection with read only session
-async def get_async_conn_ro():
+# getting async connection with read only session, the time spent waiting on the pool is left on the request for tracing
+async def get_async_conn_ro(request: Request):
+    start = time.perf_counter()
     async with get_async_pool_ro().connection() as conn:
+        request.state.pool_wait_seconds = time.perf_counter() - start
         async with conn.cursor() as cur:
             await cur.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY;")
         yield conn
@@ -4,6 +4,8 @@ GRANT USAGE ON SCHEMA public TO app_rw;
 
 GRANT SELECT ON ALL TABLES IN SCHEMA public TO oracle_ro;
 REVOKE ALL ON TABLE public.users FROM oracle_ro;
+REVOKE ALL ON TABLE public.question_audit FROM oracle_ro;
+REVOKE ALL ON TABLE public.conversation_session FROM oracle_ro;
 
 REVOKE ALL ON ALL TABLES IN SCHEMA public FROM auth_ro;
 GRANT SELECT ON TABLE public.users TO auth_ro;
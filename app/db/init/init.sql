@@ -1,3 +1,5 @@
+-- bootstrap schema for the docker database, kept in line with the alembic head. alembic stays the source of truth for
+-- upgrades, a database created from this file is marked current with `alembic stamp head`
 CREATE EXTENSION IF NOT EXISTS citext;
 
 CREATE TABLE IF NOT EXISTS users (
@@ -81,10 +83,10 @@ CREATE TABLE IF NOT EXISTS game_team_performance
     FOREIGN KEY (team_id, team_abrev) REFERENCES modern_team_index (id, abrev)
 );
 
+-- partitioned by season, the partition key has to be part of the primary key
 CREATE TABLE IF NOT EXISTS pbp_raw_event(
-    id SERIAL NOT NULL PRIMARY KEY,
-    game_id BIGINT REFERENCES game(id),
-    season_id INT,
+    game_id BIGINT REFERENCES game(id) NOT NULL,
+    season_id INT NOT NULL,
     season_type TEXT,
     event_num INT NOT NULL,    
     event_type TEXT NOT NULL,  
@@ -93,6 +95,8 @@ CREATE TABLE IF NOT EXISTS pbp_raw_event(
     away_score INT,
     period INT NOT NULL,
     clock INTERVAL, 
+    clock_seconds DOUBLE PRECISION,
+    game_seconds_elapsed DOUBLE PRECISION,
     home_team_id BIGINT,
     away_team_id BIGINT,
     home_team_abrev VARCHAR(3),
@@ -135,46 +139,341 @@ CREATE TABLE IF NOT EXISTS pbp_raw_event(
     shot_y FLOAT,
 
     created_at TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (game_id, event_num, season_id),
     FOREIGN KEY (home_team_id, home_team_abrev) REFERENCES modern_team_index (id, abrev),
     FOREIGN KEY (away_team_id, away_team_abrev) REFERENCES modern_team_index (id, abrev),
     FOREIGN KEY (possession_team_id, possession_team_abrev) REFERENCES modern_team_index (id, abrev),
     FOREIGN KEY (event_team_id, event_team_abrev) REFERENCES modern_team_index (id, abrev)
+) PARTITION BY LIST (season_id);
+
+-- indexes created on the parent cascade to every current and future partition
+CREATE INDEX IF NOT EXISTS ix_pbp_season_shooter_shots ON pbp_raw_event(season_id, shooter_id)
+    INCLUDE (game_id, event_type, shot_made, shot_value, area, event_team_id, home_team_id)
+    WHERE event_type IN ('2pt', '3pt', 'freethrow');
+CREATE INDEX IF NOT EXISTS ix_pbp_season_assister ON pbp_raw_event(season_id, assister_id)
+    INCLUDE (shooter_id, game_id, shot_value) WHERE assister_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_pbp_season_rebounder ON pbp_raw_event(season_id, rebounder_id)
+    INCLUDE (offensive_rebound, game_id) WHERE rebounder_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_pbp_season_event_team_type ON pbp_raw_event(season_id, event_team_id, event_type);
+CREATE INDEX IF NOT EXISTS ix_pbp_season_type_subtype ON pbp_raw_event(season_id, event_type, event_subtype);
+
+-- partition statistics are added by loaders.maintenance as seasons are loaded
+CREATE STATISTICS IF NOT EXISTS pbp_raw_event_type_subtype_stats (ndistinct, dependencies, mcv)
+    ON event_type, event_subtype FROM pbp_raw_event;
+CREATE STATISTICS IF NOT EXISTS pbp_raw_event_season_team_stats (ndistinct, dependencies, mcv)
+    ON season_id, event_team_id FROM pbp_raw_event;
+
+-- creates the list partition for a season on demand, security definer so the loaders' app_rw role can call it
+-- without owning pbp_raw_event
+CREATE OR REPLACE FUNCTION ensure_pbp_partition(p_season_id integer) RETURNS text
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+DECLARE
+    partition_name text := format('pbp_raw_event_%s', p_season_id);
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format('CREATE TABLE %I PARTITION OF pbp_raw_event FOR VALUES IN (%s)', partition_name, p_season_id);
+    END IF;
+    RETURN partition_name;
+END
+$$;
+REVOKE ALL ON FUNCTION ensure_pbp_partition(integer) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION ensure_pbp_partition(integer) TO app_rw;
+
+CREATE TABLE IF NOT EXISTS pbp_event_actor(
+    game_id BIGINT REFERENCES game(id) NOT NULL,
+    event_num INT NOT NULL,
+    season_id INT NOT NULL,
+    player_id BIGINT REFERENCES player(id) NOT NULL,
+    role TEXT NOT NULL,
+    PRIMARY KEY (game_id, event_num, role, player_id)
+);
+CREATE INDEX IF NOT EXISTS ix_pbp_event_actor_player_season_role ON pbp_event_actor(player_id, season_id, role)
+    INCLUDE (game_id, event_num);
+
+CREATE TABLE IF NOT EXISTS load_run(
+    id BIGSERIAL PRIMARY KEY,
+    run_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP NOT NULL DEFAULT now(),
+    elapsed_seconds FLOAT,
+    games INT,
+    events INT,
+    error TEXT,
+    stats JSONB
+);
+CREATE INDEX IF NOT EXISTS ix_load_run_run_name ON load_run(run_name);
+
+CREATE TABLE IF NOT EXISTS load_checkpoint(
+    job TEXT NOT NULL,
+    shard TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    games_loaded INT,
+    events_loaded INT,
+    elapsed_seconds FLOAT,
+    error TEXT,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (job, shard)
 );
 
 -- Creating new tables to help the model in weird scenarios
+CREATE TABLE IF NOT EXISTS game_state(
+    game_id BIGINT REFERENCES game(id) NOT NULL,
+    event_num INT NOT NULL,
+    season_id INT NOT NULL,
+    period INT NOT NULL,
+    clock_seconds DOUBLE PRECISION NOT NULL,
+    game_seconds_elapsed DOUBLE PRECISION NOT NULL,
+    seconds_remaining DOUBLE PRECISION NOT NULL,
+    home_score INT NOT NULL,
+    away_score INT NOT NULL,
+    margin INT NOT NULL,
+    is_clutch BOOLEAN NOT NULL,
+    PRIMARY KEY (game_id, event_num)
+);
+CREATE INDEX IF NOT EXISTS ix_game_state_season_clutch ON game_state(season_id, game_id, event_num) WHERE is_clutch;
+CREATE INDEX IF NOT EXISTS ix_game_state_season_remaining_margin ON game_state(season_id, seconds_remaining, margin);
+
 CREATE TABLE IF NOT EXISTS possessions(
-    game_id BIGINT REFERENCES game(id),
-    possession_id SERIAL PRIMARY KEY,
-    offense_team_id BIGINT,
-    defense_team_id BIGINT,
-    start_pbp_event INT REFERENCES pbp_raw_event(id),
-    end_pbp_event INT REFERENCES pbp_raw_event(id),
-    possession_period INT,
+    game_id BIGINT REFERENCES game(id) NOT NULL,
+    season_id INT NOT NULL,
+    possession_num INT NOT NULL,
+    period INT NOT NULL,
+    offense_team_id BIGINT NOT NULL,
+    defense_team_id BIGINT NOT NULL,
+    start_event_num INT NOT NULL,
+    end_event_num INT NOT NULL,
     start_clock INTERVAL,
     end_clock INTERVAL,
-    points INT,
-    result VARCHAR(256)
+    points INT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (game_id, possession_num)
 );
+CREATE INDEX IF NOT EXISTS ix_possessions_season_offense ON possessions(season_id, offense_team_id);
+CREATE INDEX IF NOT EXISTS ix_possessions_season_defense ON possessions(season_id, defense_team_id);
 
 CREATE TABLE IF NOT EXISTS player_stints(
-    id SERIAL PRIMARY KEY,
     game_id BIGINT REFERENCES game(id) NOT NULL,
+    season_id INT NOT NULL,
     player_id BIGINT REFERENCES player(id) NOT NULL,
-    team_id BIGINT,
-    start_pbp_event INT REFERENCES pbp_raw_event(id),
-    end_pbp_event INT REFERENCES pbp_raw_event(id),
+    team_id BIGINT NOT NULL,
+    stint_num INT NOT NULL,
+    period INT NOT NULL,
+    start_event_num INT NOT NULL,
+    end_event_num INT NOT NULL,
+    start_clock INTERVAL,
+    end_clock INTERVAL,
+    seconds_played INT NOT NULL,
+    points_for INT NOT NULL,
+    points_against INT NOT NULL,
+    PRIMARY KEY (game_id, player_id, stint_num)
+);
+CREATE INDEX IF NOT EXISTS ix_player_stints_player_season ON player_stints(player_id, season_id)
+    INCLUDE (seconds_played, points_for, points_against);
+
+CREATE TABLE IF NOT EXISTS lineup_stints(
+    game_id BIGINT REFERENCES game(id) NOT NULL,
+    season_id INT NOT NULL,
+    team_id BIGINT NOT NULL,
+    opponent_team_id BIGINT NOT NULL,
+    stint_num INT NOT NULL,
+    lineup_hash TEXT NOT NULL,
+    player_ids BIGINT[] NOT NULL,
+    period INT NOT NULL,
+    start_event_num INT NOT NULL,
+    end_event_num INT NOT NULL,
     start_clock INTERVAL,
     end_clock INTERVAL,
-    possession_period INT,
-    seconds_played INT
-)
+    seconds_played INT NOT NULL,
+    points_for INT NOT NULL,
+    points_against INT NOT NULL,
+    PRIMARY KEY (game_id, team_id, stint_num)
+);
+CREATE INDEX IF NOT EXISTS ix_lineup_stints_season_team_lineup ON lineup_stints(season_id, team_id, lineup_hash);
+CREATE INDEX IF NOT EXISTS ix_lineup_stints_player_ids ON lineup_stints USING gin (player_ids);
+
+CREATE TABLE IF NOT EXISTS player_game_box(
+    game_id BIGINT REFERENCES game(id) NOT NULL,
+    season_id INT NOT NULL,
+    player_id BIGINT REFERENCES player(id) NOT NULL,
+    team_id BIGINT NOT NULL,
+    opponent_team_id BIGINT NOT NULL,
+    is_home BOOLEAN NOT NULL,
+    seconds_played INT NOT NULL,
+    pts INT NOT NULL,
+    field_goals_made INT NOT NULL,
+    field_goals_attempted INT NOT NULL,
+    two_pointers_made INT NOT NULL,
+    two_pointers_attempted INT NOT NULL,
+    three_pointers_made INT NOT NULL,
+    three_pointers_attempted INT NOT NULL,
+    free_throws_made INT NOT NULL,
+    free_throws_attempted INT NOT NULL,
+    offensive_rebounds INT NOT NULL,
+    defensive_rebounds INT NOT NULL,
+    total_rebounds INT NOT NULL,
+    assists INT NOT NULL,
+    steals INT NOT NULL,
+    blocks INT NOT NULL,
+    turnovers INT NOT NULL,
+    personal_fouls INT NOT NULL,
+    plus_minus INT NOT NULL,
+    PRIMARY KEY (game_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS ix_player_game_box_player_season ON player_game_box(player_id, season_id);
+
+CREATE TABLE IF NOT EXISTS team_game_box(
+    game_id BIGINT REFERENCES game(id) NOT NULL,
+    season_id INT NOT NULL,
+    team_id BIGINT NOT NULL,
+    opponent_team_id BIGINT NOT NULL,
+    is_home BOOLEAN NOT NULL,
+    pts INT NOT NULL,
+    field_goals_made INT NOT NULL,
+    field_goals_attempted INT NOT NULL,
+    two_pointers_made INT NOT NULL,
+    two_pointers_attempted INT NOT NULL,
+    three_pointers_made INT NOT NULL,
+    three_pointers_attempted INT NOT NULL,
+    free_throws_made INT NOT NULL,
+    free_throws_attempted INT NOT NULL,
+    offensive_rebounds INT NOT NULL,
+    defensive_rebounds INT NOT NULL,
+    total_rebounds INT NOT NULL,
+    assists INT NOT NULL,
+    steals INT NOT NULL,
+    blocks INT NOT NULL,
+    turnovers INT NOT NULL,
+    personal_fouls INT NOT NULL,
+    plus_minus INT NOT NULL,
+    matches_official BOOLEAN,
+    PRIMARY KEY (game_id, team_id)
+);
+CREATE INDEX IF NOT EXISTS ix_team_game_box_team_season ON team_game_box(team_id, season_id);
 
 CREATE TABLE IF NOT EXISTS shots(
     game_id BIGINT REFERENCES game(id) NOT NULL,
+    event_num INT NOT NULL,
+    season_id INT NOT NULL,
     shooter_id BIGINT REFERENCES player(id) NOT NULL,
     team_id BIGINT,
-    shot_x FLOAT,
-    shot_y FLOAT,
-    zone
-    ....
-)
\ No newline at end of file
+    period INT NOT NULL,
+    clock_seconds DOUBLE PRECISION,
+    shot_value INT NOT NULL,
+    shot_made BOOLEAN,
+    shot_distance FLOAT,
+    area TEXT,
+    area_detail TEXT,
+    descriptor TEXT,
+    x FLOAT,
+    y FLOAT,
+    zone TEXT,
+    bin INT,
+    PRIMARY KEY (game_id, event_num)
+);
+CREATE INDEX IF NOT EXISTS ix_shots_season_shooter_zone ON shots(season_id, shooter_id, zone) INCLUDE (shot_made, shot_value);
+CREATE INDEX IF NOT EXISTS ix_shots_season_bin ON shots(season_id, bin) INCLUDE (shot_made);
+
+-- season rollups, refreshed by the loaders through refresh_rollup after each load
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_player_season_shooting AS
+    SELECT season_id, shooter_id AS player_id, coalesce(area, 'Unknown') AS area, coalesce(descriptor, 'none') AS descriptor,
+           shot_value, count(*) AS attempts, count(*) FILTER (WHERE shot_made) AS makes,
+           coalesce(sum(shot_value) FILTER (WHERE shot_made), 0) AS points
+    FROM pbp_raw_event
+    WHERE event_type IN ('2pt', '3pt') AND shooter_id IS NOT NULL AND shot_value IS NOT NULL
+    GROUP BY season_id, shooter_id, coalesce(area, 'Unknown'), coalesce(descriptor, 'none'), shot_value;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_player_season_shooting ON mv_player_season_shooting(season_id, player_id, area, descriptor, shot_value);
+CREATE INDEX IF NOT EXISTS ix_mv_player_season_shooting_season_area ON mv_player_season_shooting(season_id, area);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_assist_pairs AS
+    SELECT season_id, event_team_id AS team_id, assister_id, shooter_id, count(*) AS assists,
+           count(*) FILTER (WHERE shot_value = 3) AS three_point_assists, coalesce(sum(shot_value), 0) AS points
+    FROM pbp_raw_event
+    WHERE assister_id IS NOT NULL AND shooter_id IS NOT NULL AND event_team_id IS NOT NULL
+    GROUP BY season_id, event_team_id, assister_id, shooter_id;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_assist_pairs ON mv_assist_pairs(season_id, team_id, assister_id, shooter_id);
+CREATE INDEX IF NOT EXISTS ix_mv_assist_pairs_season_shooter ON mv_assist_pairs(season_id, shooter_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_team_season_opponent_scoring AS
+    SELECT season_id, opponent_team_id AS team_id, count(*) AS games, sum(pts) AS opponent_pts,
+           round(avg(pts), 2) AS opponent_pts_per_game, sum(field_goals_made) AS opponent_field_goals_made,
+           sum(field_goals_attempted) AS opponent_field_goals_attempted, sum(three_pointers_made) AS opponent_three_pointers_made,
+           sum(three_pointers_attempted) AS opponent_three_pointers_attempted, sum(free_throws_made) AS opponent_free_throws_made,
+           sum(free_throws_attempted) AS opponent_free_throws_attempted
+    FROM team_game_box
+    GROUP BY season_id, opponent_team_id;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_team_season_opponent_scoring ON mv_team_season_opponent_scoring(season_id, team_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_player_season_home_away AS
+    SELECT season_id, player_id, is_home, count(*) FILTER (WHERE seconds_played > 0) AS games,
+           sum(seconds_played) AS seconds_played, sum(pts) AS pts, sum(total_rebounds) AS total_rebounds,
+           sum(assists) AS assists, sum(steals) AS steals, sum(blocks) AS blocks, sum(turnovers) AS turnovers,
+           sum(field_goals_made) AS field_goals_made, sum(field_goals_attempted) AS field_goals_attempted,
+           sum(three_pointers_made) AS three_pointers_made, sum(three_pointers_attempted) AS three_pointers_attempted,
+           sum(free_throws_made) AS free_throws_made, sum(free_throws_attempted) AS free_throws_attempted,
+           sum(plus_minus) AS plus_minus
+    FROM player_game_box
+    GROUP BY season_id, player_id, is_home;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_player_season_home_away ON mv_player_season_home_away(season_id, player_id, is_home);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_player_season_shot_bins AS
+    SELECT season_id, shooter_id AS player_id, bin, count(*) AS attempts, count(*) FILTER (WHERE shot_made) AS makes,
+           coalesce(sum(shot_value) FILTER (WHERE shot_made), 0) AS points
+    FROM shots
+    WHERE bin IS NOT NULL
+    GROUP BY season_id, shooter_id, bin;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_player_season_shot_bins ON mv_player_season_shot_bins(season_id, player_id, bin);
+
+-- security definer so the loaders' app_rw role can refresh views it doesn't own, limited to the known rollups
+CREATE OR REPLACE FUNCTION refresh_rollup(p_name text) RETURNS void
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    IF p_name NOT IN ('mv_player_season_shooting', 'mv_assist_pairs', 'mv_team_season_opponent_scoring',
+                      'mv_player_season_home_away', 'mv_player_season_shot_bins') THEN
+        RAISE EXCEPTION 'unknown rollup %', p_name;
+    END IF;
+    EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', p_name);
+END
+$$;
+REVOKE ALL ON FUNCTION refresh_rollup(text) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION refresh_rollup(text) TO app_rw;
+
+CREATE SEQUENCE IF NOT EXISTS data_version_seq;
+
+CREATE TABLE IF NOT EXISTS data_version(
+    season_id INT PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+-- season 0 versions the objects spanning every season (rollups)
+INSERT INTO data_version (season_id, version) VALUES (0, nextval('data_version_seq')) ON CONFLICT (season_id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS question_audit(
+    id BIGSERIAL PRIMARY KEY,
+    asked_at TIMESTAMP NOT NULL DEFAULT now(),
+    user_email TEXT,
+    question TEXT NOT NULL,
+    normalized_question TEXT NOT NULL,
+    sql_hash TEXT,
+    generated_sql TEXT,
+    status TEXT NOT NULL,
+    result_rows INT,
+    total_ms FLOAT,
+    stage_ms JSONB,
+    llm_tokens JSONB
+);
+CREATE INDEX IF NOT EXISTS ix_question_audit_asked_at ON question_audit(asked_at);
+CREATE INDEX IF NOT EXISTS ix_question_audit_sql_hash ON question_audit(sql_hash);
+CREATE INDEX IF NOT EXISTS ix_question_audit_normalized_question ON question_audit(normalized_question);
+
+CREATE TABLE IF NOT EXISTS conversation_session(
+    id TEXT PRIMARY KEY,
+    user_email TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    expires_at TIMESTAMP NOT NULL,
+    turns JSONB NOT NULL DEFAULT '[]'::jsonb
+);
+CREATE INDEX IF NOT EXISTS ix_conversation_session_expires_at ON conversation_session(expires_at);
+CREATE INDEX IF NOT EXISTS ix_conversation_session_user_email ON conversation_session(user_email);
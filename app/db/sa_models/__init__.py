@@ -6,4 +6,17 @@ from .historical_team_index import HistoricalTeamIndex
 from .modern_team_index import ModernTeamIndex
 from .game import Game
 from .game_team_performance import GameTeamPerformance
-from .pbp_raw_event import PbpRawEvent
\ No newline at end of file
+from .pbp_raw_event import PbpRawEvent
+from .load_checkpoint import LoadCheckpoint
+from .load_run import LoadRun
+from .pbp_event_actor import PbpEventActor
+from .possession import Possession
+from .player_stint import PlayerStint
+from .lineup_stint import LineupStint
+from .game_state import GameState
+from .player_game_box import PlayerGameBox
+from .team_game_box import TeamGameBox
+from .shot import Shot
+from .data_version import DataVersion
+from .question_audit import QuestionAudit
+from .conversation_session import ConversationSession
\ No newline at end of file
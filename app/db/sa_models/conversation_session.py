@@ -0,0 +1,17 @@
+from __future__ import annotations
+from sqlalchemy import Index, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class ConversationSession(Base):
+    __tablename__ = "conversation_session"
+    __table_args__ = (
+        Index("ix_conversation_session_expires_at", "expires_at"),
+        Index("ix_conversation_session_user_email", "user_email"),
+    )
+    id: Mapped[str] = mapped_column(Text, primary_key=True)
+    user_email: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[object] = mapped_column(TIMESTAMP(timezone=False), server_default=text("now()"), nullable=False)
+    expires_at: Mapped[object] = mapped_column(TIMESTAMP(timezone=False), nullable=False)
+    turns: Mapped[list] = mapped_column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)
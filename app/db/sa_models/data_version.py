@@ -0,0 +1,14 @@
+from __future__ import annotations
+from sqlalchemy import BigInteger, Integer, PrimaryKeyConstraint, text
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+    __table_args__ = (
+        PrimaryKeyConstraint("season_id"),
+    )
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[object] = mapped_column(TIMESTAMP(timezone=False), server_default=text("now()"), nullable=False)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+from sqlalchemy import BigInteger, Boolean, Float, ForeignKey, Index, Integer, PrimaryKeyConstraint, text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class GameState(Base):
+    __tablename__ = "game_state"
+    __table_args__ = (
+        PrimaryKeyConstraint("game_id", "event_num"),
+        Index("ix_game_state_season_clutch", "season_id", "game_id", "event_num", postgresql_where=text("is_clutch")),
+        Index("ix_game_state_season_remaining_margin", "season_id", "seconds_remaining", "margin"),
+    )
+    game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
+    event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    period: Mapped[int] = mapped_column(Integer, nullable=False)
+    clock_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    game_seconds_elapsed: Mapped[float] = mapped_column(Float, nullable=False)
+    seconds_remaining: Mapped[float] = mapped_column(Float, nullable=False)
+    home_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    away_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    margin: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_clutch: Mapped[bool] = mapped_column(Boolean, nullable=False)
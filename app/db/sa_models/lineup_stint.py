@@ -0,0 +1,29 @@
+from __future__ import annotations
+from datetime import timedelta
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, Interval, PrimaryKeyConstraint, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class LineupStint(Base):
+    __tablename__ = "lineup_stints"
+    __table_args__ = (
+        PrimaryKeyConstraint("game_id", "team_id", "stint_num"),
+        Index("ix_lineup_stints_season_team_lineup", "season_id", "team_id", "lineup_hash"),
+        Index("ix_lineup_stints_player_ids", "player_ids", postgresql_using="gin"),
+    )
+    game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    opponent_team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    stint_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    lineup_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    player_ids: Mapped[list[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    period: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_clock: Mapped[timedelta | None] = mapped_column(Interval)
+    end_clock: Mapped[timedelta | None] = mapped_column(Interval)
+    seconds_played: Mapped[int] = mapped_column(Integer, nullable=False)
+    points_for: Mapped[int] = mapped_column(Integer, nullable=False)
+    points_against: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,21 @@
+from __future__ import annotations
+from sqlalchemy import Float, Integer, PrimaryKeyConstraint, Text, text
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class LoadCheckpoint(Base):
+    __tablename__ = "load_checkpoint"
+    __table_args__ = (
+        PrimaryKeyConstraint("job", "shard"),
+    )
+    job: Mapped[str] = mapped_column(Text, nullable=False)
+    shard: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, server_default=text("'pending'"))
+    games_loaded: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    events_loaded: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    elapsed_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[object | None] = mapped_column(TIMESTAMP(timezone=False), nullable=True)
+    finished_at: Mapped[object | None] = mapped_column(TIMESTAMP(timezone=False), nullable=True)
+    updated_at: Mapped[object] = mapped_column(TIMESTAMP(timezone=False), server_default=text("now()"), nullable=False)
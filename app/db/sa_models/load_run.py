@@ -0,0 +1,18 @@
+from __future__ import annotations
+from sqlalchemy import BigInteger, Float, Integer, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class LoadRun(Base):
+    __tablename__ = "load_run"
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    run_name: Mapped[str] = mapped_column(Text, nullable=False, index=True)
+    status: Mapped[str] = mapped_column(Text, nullable=False)
+    started_at: Mapped[object] = mapped_column(TIMESTAMP(timezone=False), nullable=False)
+    finished_at: Mapped[object] = mapped_column(TIMESTAMP(timezone=False), server_default=text("now()"), nullable=False)
+    elapsed_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    games: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    events: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    stats: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
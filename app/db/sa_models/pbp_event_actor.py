@@ -0,0 +1,16 @@
+from __future__ import annotations
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, PrimaryKeyConstraint, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class PbpEventActor(Base):
+    __tablename__ = "pbp_event_actor"
+    __table_args__ = (
+        PrimaryKeyConstraint("game_id", "event_num", "role", "player_id"),
+        Index("ix_pbp_event_actor_player_season_role", "player_id", "season_id", "role", postgresql_include=["game_id", "event_num"]),
+    )
+    game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
+    event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    player_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("player.id"), nullable=False)
+    role: Mapped[str] = mapped_column(Text, nullable=False)
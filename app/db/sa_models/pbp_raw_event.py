@@ -1,5 +1,5 @@
 from __future__ import annotations
-from sqlalchemy import BigInteger, Boolean, Float, ForeignKey, ForeignKeyConstraint, Integer, PrimaryKeyConstraint, String, Text, text
+from sqlalchemy import BigInteger, Boolean, Float, ForeignKey, ForeignKeyConstraint, Index, Integer, PrimaryKeyConstraint, String, Text, text
 from sqlalchemy.dialects.postgresql import INTERVAL, TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.sa_base import Base
@@ -7,7 +7,7 @@ from app.db.sa_base import Base
 class PbpRawEvent(Base):
     __tablename__ = "pbp_raw_event"
     __table_args__ = (
-        PrimaryKeyConstraint("game_id", "event_num"),
+        PrimaryKeyConstraint("game_id", "event_num", "season_id"),
         ForeignKeyConstraint(
             ["home_team_id", "home_team_abrev"],
             ["modern_team_index.id", "modern_team_index.abrev"],
@@ -24,9 +24,21 @@ class PbpRawEvent(Base):
             ["event_team_id", "event_team_abrev"],
             ["modern_team_index.id", "modern_team_index.abrev"],
         ),
+        Index("ix_pbp_season_shooter_shots", "season_id", "shooter_id",
+              postgresql_where=text("event_type IN ('2pt', '3pt', 'freethrow')"),
+              postgresql_include=["game_id", "event_type", "shot_made", "shot_value", "area", "event_team_id", "home_team_id"]),
+        Index("ix_pbp_season_assister", "season_id", "assister_id",
+              postgresql_where=text("assister_id IS NOT NULL"),
+              postgresql_include=["shooter_id", "game_id", "shot_value"]),
+        Index("ix_pbp_season_rebounder", "season_id", "rebounder_id",
+              postgresql_where=text("rebounder_id IS NOT NULL"),
+              postgresql_include=["offensive_rebound", "game_id"]),
+        Index("ix_pbp_season_event_team_type", "season_id", "event_team_id", "event_type"),
+        Index("ix_pbp_season_type_subtype", "season_id", "event_type", "event_subtype"),
+        {"postgresql_partition_by": "LIST (season_id)"},
     )
     game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
-    season_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
     season_type: Mapped[str | None] = mapped_column(Text, nullable=True)
     event_num: Mapped[int] = mapped_column(Integer, nullable=False)
     event_type: Mapped[str] = mapped_column(Text, nullable=False)
@@ -35,6 +47,8 @@ class PbpRawEvent(Base):
     away_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
     period: Mapped[int] = mapped_column(Integer, nullable=False)
     clock: Mapped[object | None] = mapped_column(INTERVAL, nullable=True)
+    clock_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    game_seconds_elapsed: Mapped[float | None] = mapped_column(Float, nullable=True)
     home_team_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     away_team_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     home_team_abrev: Mapped[str | None] = mapped_column(String(3), nullable=True)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+from sqlalchemy import BigInteger, Boolean, ForeignKey, Index, Integer, PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class PlayerGameBox(Base):
+    __tablename__ = "player_game_box"
+    __table_args__ = (
+        PrimaryKeyConstraint("game_id", "player_id"),
+        Index("ix_player_game_box_player_season", "player_id", "season_id"),
+    )
+    game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    player_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("player.id"), nullable=False)
+    team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    opponent_team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    is_home: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    seconds_played: Mapped[int] = mapped_column(Integer, nullable=False)
+    pts: Mapped[int] = mapped_column(Integer, nullable=False)
+    field_goals_made: Mapped[int] = mapped_column(Integer, nullable=False)
+    field_goals_attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    two_pointers_made: Mapped[int] = mapped_column(Integer, nullable=False)
+    two_pointers_attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    three_pointers_made: Mapped[int] = mapped_column(Integer, nullable=False)
+    three_pointers_attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    free_throws_made: Mapped[int] = mapped_column(Integer, nullable=False)
+    free_throws_attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    offensive_rebounds: Mapped[int] = mapped_column(Integer, nullable=False)
+    defensive_rebounds: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_rebounds: Mapped[int] = mapped_column(Integer, nullable=False)
+    assists: Mapped[int] = mapped_column(Integer, nullable=False)
+    steals: Mapped[int] = mapped_column(Integer, nullable=False)
+    blocks: Mapped[int] = mapped_column(Integer, nullable=False)
+    turnovers: Mapped[int] = mapped_column(Integer, nullable=False)
+    personal_fouls: Mapped[int] = mapped_column(Integer, nullable=False)
+    plus_minus: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from datetime import timedelta
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, Interval, PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class PlayerStint(Base):
+    __tablename__ = "player_stints"
+    __table_args__ = (
+        PrimaryKeyConstraint("game_id", "player_id", "stint_num"),
+        Index("ix_player_stints_player_season", "player_id", "season_id", postgresql_include=["seconds_played", "points_for", "points_against"]),
+    )
+    game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    player_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("player.id"), nullable=False)
+    team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    stint_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    period: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_clock: Mapped[timedelta | None] = mapped_column(Interval)
+    end_clock: Mapped[timedelta | None] = mapped_column(Interval)
+    seconds_played: Mapped[int] = mapped_column(Integer, nullable=False)
+    points_for: Mapped[int] = mapped_column(Integer, nullable=False)
+    points_against: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from datetime import timedelta
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, Interval, PrimaryKeyConstraint, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class Possession(Base):
+    __tablename__ = "possessions"
+    __table_args__ = (
+        PrimaryKeyConstraint("game_id", "possession_num"),
+        Index("ix_possessions_season_offense", "season_id", "offense_team_id"),
+        Index("ix_possessions_season_defense", "season_id", "defense_team_id"),
+    )
+    game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    possession_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    period: Mapped[int] = mapped_column(Integer, nullable=False)
+    offense_team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    defense_team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    start_event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_clock: Mapped[timedelta | None] = mapped_column(Interval)
+    end_clock: Mapped[timedelta | None] = mapped_column(Interval)
+    points: Mapped[int] = mapped_column(Integer, nullable=False)
+    result: Mapped[str] = mapped_column(Text, nullable=False)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from sqlalchemy import BigInteger, Float, Index, Integer, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class QuestionAudit(Base):
+    __tablename__ = "question_audit"
+    __table_args__ = (
+        Index("ix_question_audit_asked_at", "asked_at"),
+        Index("ix_question_audit_sql_hash", "sql_hash"),
+        Index("ix_question_audit_normalized_question", "normalized_question"),
+    )
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    asked_at: Mapped[object] = mapped_column(TIMESTAMP(timezone=False), server_default=text("now()"), nullable=False)
+    user_email: Mapped[str | None] = mapped_column(Text, nullable=True)
+    question: Mapped[str] = mapped_column(Text, nullable=False)
+    normalized_question: Mapped[str] = mapped_column(Text, nullable=False)
+    sql_hash: Mapped[str | None] = mapped_column(Text, nullable=True)
+    generated_sql: Mapped[str | None] = mapped_column(Text, nullable=True)
+    status: Mapped[str] = mapped_column(Text, nullable=False)
+    result_rows: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    total_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    stage_ms: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    llm_tokens: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from sqlalchemy import BigInteger, Boolean, Float, ForeignKey, Index, Integer, PrimaryKeyConstraint, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class Shot(Base):
+    __tablename__ = "shots"
+    __table_args__ = (
+        PrimaryKeyConstraint("game_id", "event_num"),
+        Index("ix_shots_season_shooter_zone", "season_id", "shooter_id", "zone", postgresql_include=["shot_made", "shot_value"]),
+        Index("ix_shots_season_bin", "season_id", "bin", postgresql_include=["shot_made"]),
+    )
+    game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
+    event_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    shooter_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("player.id"), nullable=False)
+    team_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    period: Mapped[int] = mapped_column(Integer, nullable=False)
+    clock_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    shot_value: Mapped[int] = mapped_column(Integer, nullable=False)
+    shot_made: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    shot_distance: Mapped[float | None] = mapped_column(Float, nullable=True)
+    area: Mapped[str | None] = mapped_column(Text, nullable=True)
+    area_detail: Mapped[str | None] = mapped_column(Text, nullable=True)
+    descriptor: Mapped[str | None] = mapped_column(Text, nullable=True)
+    x: Mapped[float | None] = mapped_column(Float, nullable=True)
+    y: Mapped[float | None] = mapped_column(Float, nullable=True)
+    zone: Mapped[str | None] = mapped_column(Text, nullable=True)
+    bin: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+from sqlalchemy import BigInteger, Boolean, ForeignKey, Index, Integer, PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.sa_base import Base
+
+class TeamGameBox(Base):
+    __tablename__ = "team_game_box"
+    __table_args__ = (
+        PrimaryKeyConstraint("game_id", "team_id"),
+        Index("ix_team_game_box_team_season", "team_id", "season_id"),
+    )
+    game_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("game.id"), nullable=False)
+    season_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    opponent_team_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    is_home: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    pts: Mapped[int] = mapped_column(Integer, nullable=False)
+    field_goals_made: Mapped[int] = mapped_column(Integer, nullable=False)
+    field_goals_attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    two_pointers_made: Mapped[int] = mapped_column(Integer, nullable=False)
+    two_pointers_attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    three_pointers_made: Mapped[int] = mapped_column(Integer, nullable=False)
+    three_pointers_attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    free_throws_made: Mapped[int] = mapped_column(Integer, nullable=False)
+    free_throws_attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    offensive_rebounds: Mapped[int] = mapped_column(Integer, nullable=False)
+    defensive_rebounds: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_rebounds: Mapped[int] = mapped_column(Integer, nullable=False)
+    assists: Mapped[int] = mapped_column(Integer, nullable=False)
+    steals: Mapped[int] = mapped_column(Integer, nullable=False)
+    blocks: Mapped[int] = mapped_column(Integer, nullable=False)
+    turnovers: Mapped[int] = mapped_column(Integer, nullable=False)
+    personal_fouls: Mapped[int] = mapped_column(Integer, nullable=False)
+    plus_minus: Mapped[int] = mapped_column(Integer, nullable=False)
+    matches_official: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
@@ -2,15 +2,22 @@ from openai import OpenAI
 from app.core.config import settings
 import logging
 import sys
+import asyncio
 from contextlib import asynccontextmanager
 from app.db.db import get_async_pool_ro, get_async_pool_ar, get_async_pool_rw
 from app.api.questions import router as questions_router
 from app.api.auth import router as auth_router
+from app.api.metrics import router as metrics_router
+from app.api.export import router as export_router
+from app.api.sessions import router as sessions_router
 from fastapi import FastAPI
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from app.services.rate_limiting import limiter
+from app.services.data_version import data_versions, listen_for_data_versions
+from app.services.audit import audit_writer
+from app.services.analytics import load_analytics_engine
 
 # Global logging config for api
 logging.basicConfig(
@@ -46,9 +53,25 @@ async def lifespan(app: FastAPI):
     await get_async_pool_ro().open()
     await get_async_pool_rw().open()
     await get_async_pool_ar().open()
+
+    # process-local data versions, bumped by the loaders' NOTIFY whenever a load commits
+    app.state.data_versions = data_versions
+    data_version_listener = asyncio.create_task(listen_for_data_versions(data_versions))
+    # None unless ANALYTICS_BACKEND=duckdb, in which case analytic questions run on the loaders' parquet snapshot
+    app.state.analytics = await load_analytics_engine(data_versions)
+    # question_audit batches are written off the request path
+    audit_task = asyncio.create_task(audit_writer.run()) if settings.AUDIT_ENABLED else None
     try:
         yield # yield til end of life span
     finally:
+        for task in (data_version_listener, audit_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
         await get_async_pool_rw().close()
         await get_async_pool_ro().close()
         await get_async_pool_ar().close()
@@ -60,4 +83,7 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
 
 app.include_router(questions_router)
-app.include_router(auth_router)
\ No newline at end of file
+app.include_router(auth_router)
+app.include_router(metrics_router)
+app.include_router(export_router)
+app.include_router(sessions_router)
\ No newline at end of file
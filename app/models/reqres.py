@@ -1,4 +1,9 @@
-from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+
+# season rollups /export can stream directly, without a question to generate sql from
+ExportRollup = Literal["mv_player_season_shooting", "mv_assist_pairs", "mv_team_season_opponent_scoring",
+                       "mv_player_season_home_away", "mv_player_season_shot_bins"]
 
 class AnswerBase(BaseModel):
     answer: str = Field(max_length = 500)
@@ -9,3 +14,20 @@ class QuestionBase(BaseModel):
 class AnswerResponse(AnswerBase):
     pass
 
+class ExportRequest(BaseModel):
+    question: Optional[str] = Field(default=None, max_length = 250)
+    rollup: Optional[ExportRollup] = None
+    season_id: Optional[int] = None
+    format: Literal["csv", "arrow"] = "csv"
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.question is None) == (self.rollup is None):
+            raise ValueError("provide exactly one of question or rollup")
+        if self.season_id is not None and self.rollup is None:
+            raise ValueError("season_id only applies to rollup exports")
+        return self
+
+class SessionPublic(BaseModel):
+    session_id: str
+    expires_in: int # *seconds* of inactivity before the session is dropped
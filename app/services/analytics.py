@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import threading
+from app.core.config import settings
+from app.services.data_version import DataVersions
+
+MANIFEST_NAME = "manifest.json"
+# aggregates are where a columnar scan beats the row store, point lookups stay on postgres and its indexes
+ANALYTIC_PATTERN = re.compile(r"\b(count|sum|avg|min|max|stddev|percentile_cont|over)\s*\(|\bgroup\s+by\b")
+TABLE_PATTERN = re.compile(r"\b(?:from|join)\s+([a-z_][\w.]*)")
+CTE_PATTERN = re.compile(r"(?:\bwith(?:\s+recursive)?|,)\s*([a-z_]\w*)\s+as\s*\(")
+
+logger = logging.getLogger(__name__)
+
+# --- in-process duckdb over the parquet snapshot written by loaders/exportSnapshot.py. one in-memory database holds a
+# view per snapshot table, reopened whenever the loaders swap in a new manifest. postgres stays the system of record,
+# anything the snapshot can't answer (stale, missing tables, duckdb errors) goes back to it
+class AnalyticsEngine:
+    def __init__(self, snapshot_dir: str, versions: DataVersions):
+        self.snapshot_dir = os.path.abspath(snapshot_dir)
+        self.versions = versions
+        self.manifest: dict | None = None
+        self._db = None
+        self._manifest_mtime: float | None = None
+        self._lock = threading.Lock()
+
+    def _open(self, manifest: dict):
+        import duckdb
+        directory = os.path.join(self.snapshot_dir, manifest["snapshot"])
+        db = duckdb.connect(":memory:")
+        for table in manifest["tables"]:
+            path = os.path.join(directory, f"{table}.parquet").replace("'", "''")
+            db.execute(f"CREATE VIEW \"{table}\" AS SELECT * FROM read_parquet('{path}')")
+        # postgres semantics where duckdb differs: int / int truncates instead of returning a double. global, so the
+        # per-query cursors (their own duckdb connections) get it too
+        db.execute("SET GLOBAL integer_division = true")
+        # generated sql only ever sees the snapshot: no other files, no extensions, no settings changes
+        db.execute("SET allowed_directories = [?]", [directory])
+        db.execute("SET enable_external_access = false")
+        db.execute("SET lock_configuration = true")
+        return db
+
+    # blocking (stat, manifest read, duckdb setup), call it through asyncio.to_thread from the event loop
+    def refresh(self):
+        path = os.path.join(self.snapshot_dir, MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        with self._lock:
+            if mtime == self._manifest_mtime:
+                return
+            try:
+                with open(path, "r") as file:
+                    manifest = json.load(file)
+                self._db = self._open(manifest)
+            except Exception as e:
+                logger.error(f"PROBLEM OPENING ANALYTICS SNAPSHOT {path}: {e}")
+                self._db, self.manifest = None, None
+            else:
+                self.manifest = manifest
+                logger.info(f"ANALYTICS SNAPSHOT {manifest['snapshot']} OPENED AT DATA VERSION {manifest['data_version']}")
+            self._manifest_mtime = mtime
+
+    def referenced_tables(self, query: str) -> set[str]:
+        lower = query.lower()
+        ctes = set(CTE_PATTERN.findall(lower))
+        return {name.removeprefix("public.") for name in TABLE_PATTERN.findall(lower)} - ctes
+
+    # the snapshot has to be at least as new as the data the api has been told about, and hold every table referenced
+    async def can_serve(self, query: str) -> bool:
+        await asyncio.to_thread(self.refresh)
+        manifest = self.manifest
+        if self._db is None or manifest is None:
+            return False
+        if manifest["data_version"] < self.versions.current:
+            return False
+        tables = self.referenced_tables(query)
+        if not tables or not tables.issubset(manifest["tables"]):
+            return False
+        return bool(ANALYTIC_PATTERN.search(query.lower()))
+
+    def _execute(self, cur, query: str, limit: int) -> dict:
+        try:
+            cur.execute(query)
+            cols = [desc[0] for desc in cur.description]
+            rows = cur.fetchmany(limit)
+        finally:
+            cur.close()
+        # duckdb returns NaN / Infinity where postgres raises (division by zero, ...), those go back to postgres
+        if any(isinstance(value, float) and not math.isfinite(value) for row in rows for value in row):
+            raise ValueError("non-finite value in analytics result")
+        return {"columns": cols, "rows": rows}
+
+    # duckdb blocks, so each query runs on a worker thread with its own cursor; on timeout the query is interrupted
+    async def run(self, query: str, limit: int = 200, timeout: float = 2.0) -> dict:
+        cur = self._db.cursor()
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(self._execute, cur, query, limit), timeout)
+        except asyncio.TimeoutError:
+            cur.interrupt()
+            logger.error(f"ANALYTICS QUERY TIMED OUT AFTER {timeout}s")
+            return {}
+
+async def load_analytics_engine(versions: DataVersions) -> AnalyticsEngine | None:
+    if settings.ANALYTICS_BACKEND != "duckdb":
+        return None
+    try:
+        import duckdb # noqa: F401, optional, only needed for the duckdb backend
+    except ImportError:
+        logger.error("ANALYTICS_BACKEND=duckdb BUT THE duckdb PACKAGE IS NOT INSTALLED, USING POSTGRES")
+        return None
+    engine = AnalyticsEngine(settings.ANALYTICS_SNAPSHOT_DIR, versions)
+    await asyncio.to_thread(engine.refresh)
+    return engine
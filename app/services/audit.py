@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.db.db import get_async_pool_rw
+from app.services.metrics import registry
+
+AUDIT_COLUMNS = ["asked_at", "user_email", "question", "normalized_question", "sql_hash", "generated_sql", "status",
+                 "result_rows", "total_ms", "stage_ms", "llm_tokens"]
+
+logger = logging.getLogger(__name__)
+
+# lowercased, whitespace collapsed and trailing punctuation dropped so rephrasings of the same question group together
+def normalize_question(question: str) -> str:
+    return re.sub(r"\s+", " ", question).strip().rstrip("?!. ").lower()
+
+def sql_hash(sql: str | None) -> str | None:
+    if not sql:
+        return None
+    return hashlib.md5(re.sub(r"\s+", " ", sql).strip().lower().encode()).hexdigest()
+
+# --- one question_audit row from a finished QuestionTrace
+def audit_record(user_email: str, question: str, trace, status: str) -> tuple:
+    return (
+        datetime.now(timezone.utc).replace(tzinfo=None),
+        user_email,
+        question,
+        normalize_question(question),
+        sql_hash(trace.sql),
+        trace.sql or None,
+        status,
+        trace.rows,
+        round(trace.total * 1000, 1) if trace.total is not None else None,
+        json.dumps({name: round(seconds * 1000, 1) for name, seconds in trace.stages.items()}),
+        json.dumps({f"{call}_{kind}": count for (call, kind), count in trace.tokens.items()}),
+    )
+
+# question_audit writer: the request path only does a put_nowait, a background task drains the queue and
+# writes batches with COPY through the rw pool. a full queue drops the record instead of slowing the request down
+class AuditWriter:
+    def __init__(self, queue_size: int | None = None, batch_size: int | None = None, flush_seconds: float | None = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or settings.AUDIT_QUEUE_SIZE)
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_seconds = flush_seconds or settings.AUDIT_FLUSH_SECONDS
+
+    def submit(self, record: tuple):
+        if not settings.AUDIT_ENABLED:
+            return
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            registry.inc("oracle_audit_dropped_total", 1, "Audit records dropped, queue full or write failed")
+
+    # --- waits for the first record, then keeps collecting until the batch is full or flush_seconds have passed
+    async def next_batch(self) -> list[tuple]:
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def drain(self) -> list[tuple]:
+        batch = []
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def write(self, batch: list[tuple]):
+        if not batch:
+            return
+        try:
+            async with get_async_pool_rw().connection() as conn:
+                async with conn.cursor() as cur:
+                    async with cur.copy(f"COPY question_audit ({', '.join(AUDIT_COLUMNS)}) FROM STDIN") as copy:
+                        for record in batch:
+                            await copy.write_row(record)
+            registry.inc("oracle_audit_written_total", len(batch), "Audit records written to question_audit")
+        except Exception as e:
+            # the audit log is best effort, a failed batch is logged and dropped rather than retried into a growing backlog.
+            # anything, not just database errors (a pool timeout, a record COPY can't encode), or the writer task would
+            # die and every later record would sit in the queue until it fills
+            logger.error(f"PROBLEM WRITING {len(batch)} AUDIT RECORDS: {e!r}")
+            registry.inc("oracle_audit_dropped_total", len(batch), "Audit records dropped, queue full or write failed")
+            registry.inc("oracle_audit_failed_batches_total", 1, "Audit batches that failed to write")
+
+    async def run(self):
+        try:
+            while True:
+                await self.write(await self.next_batch())
+        except asyncio.CancelledError:
+            # flush whatever is still queued on shutdown before the rw pool closes
+            await self.write(self.drain())
+            raise
+
+audit_writer = AuditWriter()
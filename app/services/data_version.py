@@ -0,0 +1,63 @@
+import asyncio
+import json
+import logging
+import psycopg
+from app.core.config import settings
+
+CHANNEL = "data_version"
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+logger = logging.getLogger(__name__)
+
+# process-local copy of the data_version table, kept current by the LISTEN task started in the lifespan.
+# caches key on these versions so they stay valid until a load actually commits new data
+class DataVersions:
+    def __init__(self):
+        self.seasons: dict[int, int] = {}
+
+    @property
+    def current(self) -> int:
+        return max(self.seasons.values(), default=0)
+
+    def for_seasons(self, season_ids) -> int:
+        return max((self.seasons.get(int(s), 0) for s in season_ids), default=0)
+
+    def apply(self, season_id: int, version: int):
+        # notifications can arrive after the snapshot already saw a newer version
+        if version > self.seasons.get(season_id, 0):
+            self.seasons[season_id] = version
+
+data_versions = DataVersions()
+
+async def load_snapshot(conn: psycopg.AsyncConnection, versions: DataVersions):
+    async with conn.cursor() as cur:
+        await cur.execute("SELECT season_id, version FROM data_version;")
+        for season_id, version in await cur.fetchall():
+            versions.apply(season_id, version)
+
+# --- dedicated autocommit connection (not from a pool, it's held for the process lifetime). the snapshot is re-read
+# after every reconnect so notifications missed while disconnected aren't lost
+async def listen_for_data_versions(versions: DataVersions = data_versions):
+    delay = RECONNECT_DELAY_SECONDS
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(settings.DATABASE_URL, autocommit=True) as conn:
+                await conn.execute(f"LISTEN {CHANNEL};")
+                await load_snapshot(conn, versions)
+                logger.info(f"LISTENING FOR DATA VERSION CHANGES, CURRENT VERSION {versions.current}")
+                delay = RECONNECT_DELAY_SECONDS
+                async for notify in conn.notifies():
+                    try:
+                        payload = json.loads(notify.payload)
+                        versions.apply(int(payload["season_id"]), int(payload["version"]))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.error(f"BAD DATA VERSION NOTIFICATION {notify.payload!r}: {e}")
+                        continue
+                    logger.info(f"DATA VERSION FOR SEASON {payload['season_id']} IS NOW {payload['version']}")
+        except asyncio.CancelledError:
+            raise
+        except psycopg.Error as e:
+            logger.error(f"DATA VERSION LISTENER DISCONNECTED, RETRYING IN {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
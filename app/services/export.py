@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from psycopg import sql
+from app.core.config import settings
+from app.db.db import get_async_pool_ro
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "arrow": "application/vnd.apache.arrow.stream"}
+# copy hands back roughly a row per chunk, they're regrouped so the response isn't millions of tiny writes
+CSV_CHUNK_BYTES = 64 * 1024
+# arrow ipc end-of-stream marker: continuation token followed by a zero length message
+ARROW_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+# postgres type name -> pyarrow type, anything else is exported as text
+ARROW_TYPES = {
+    "int2": lambda pa: pa.int16(),
+    "int4": lambda pa: pa.int32(),
+    "int8": lambda pa: pa.int64(),
+    "float4": lambda pa: pa.float32(),
+    "float8": lambda pa: pa.float64(),
+    "numeric": lambda pa: pa.float64(),
+    "bool": lambda pa: pa.bool_(),
+    "date": lambda pa: pa.date32(),
+    "timestamp": lambda pa: pa.timestamp("us"),
+    "timestamptz": lambda pa: pa.timestamp("us", tz="UTC"),
+    "interval": lambda pa: pa.duration("us"),
+}
+
+logger = logging.getLogger(__name__)
+
+# exports share the ro pool with /question, so only EXPORT_MAX_CONCURRENT of them hold a connection at once per process
+export_slots = asyncio.Semaphore(settings.EXPORT_MAX_CONCURRENT)
+
+class ExportBusy(Exception):
+    pass
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow # noqa: F401, optional, only needed for format=arrow
+    except ImportError:
+        return False
+    return True
+
+def rollup_query(rollup: str, season_id: int | None = None) -> sql.Composable:
+    query = sql.SQL("SELECT * FROM {}").format(sql.Identifier(rollup))
+    if season_id is not None:
+        query = sql.SQL("{} WHERE season_id = {}").format(query, sql.Literal(season_id))
+    return query
+
+# sanitized generated sql and rollup queries alike are capped at EXPORT_MAX_ROWS
+def bounded(query: str | sql.Composable) -> sql.Composable:
+    if isinstance(query, str):
+        query = sql.SQL(query)
+    return sql.SQL("SELECT * FROM ({}) AS export LIMIT {}").format(query, sql.Literal(settings.EXPORT_MAX_ROWS))
+
+async def _begin_export(conn):
+    async with conn.cursor() as cur:
+        await cur.execute("SET TRANSACTION READ ONLY;")
+        await cur.execute(sql.SQL("SET LOCAL statement_timeout = {}").format(sql.Literal(f"{settings.EXPORT_STATEMENT_TIMEOUT_SECONDS}s")))
+        await cur.execute("SET LOCAL lock_timeout = '1s'")
+        # a client that stops reading leaves the transaction idle between batches, postgres ends it after this long
+        await cur.execute(sql.SQL("SET LOCAL idle_in_transaction_session_timeout = {}").format(sql.Literal(f"{settings.EXPORT_IDLE_TIMEOUT_SECONDS}s")))
+
+# --- a connection for one export: waits briefly for a free export slot (ExportBusy if none frees up), then holds a ro
+# pool connection until the stream finishes, fails or the client disconnects
+@asynccontextmanager
+async def export_connection():
+    try:
+        await asyncio.wait_for(export_slots.acquire(), settings.EXPORT_SLOT_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        raise ExportBusy() from None
+    try:
+        async with get_async_pool_ro().connection() as conn:
+            yield conn
+    finally:
+        export_slots.release()
+
+# the whole stream, however fast the client reads, ends after EXPORT_MAX_SECONDS
+def _deadline() -> float:
+    return asyncio.get_running_loop().time() + settings.EXPORT_MAX_SECONDS
+
+def _check_deadline(deadline: float):
+    if asyncio.get_running_loop().time() > deadline:
+        raise TimeoutError(f"export ran past {settings.EXPORT_MAX_SECONDS}s")
+
+# --- the pool connection is taken inside the generator, so it's held exactly as long as the response streams and goes
+# back to the pool when the client finishes or disconnects
+async def stream_csv(query: sql.Composable):
+    sent = 0
+    deadline = _deadline()
+    async with export_connection() as conn:
+        async with conn.transaction():
+            await _begin_export(conn)
+            async with conn.cursor() as cur:
+                async with cur.copy(sql.SQL("COPY ({}) TO STDOUT (FORMAT csv, HEADER)").format(query)) as copy:
+                    buffer = bytearray()
+                    async for data in copy:
+                        buffer += data
+                        if len(buffer) >= CSV_CHUNK_BYTES:
+                            _check_deadline(deadline)
+                            sent += len(buffer)
+                            yield bytes(buffer)
+                            buffer.clear()
+                    if buffer:
+                        sent += len(buffer)
+                        yield bytes(buffer)
+    logger.info(f"CSV EXPORT FINISHED: {sent} BYTES")
+
+def _arrow_field(pa, conn, name: str, oid: int):
+    info = conn.adapters.types.get(oid)
+    base = ARROW_TYPES.get(info.name, lambda pa: pa.string())(pa) if info is not None else pa.string()
+    if info is not None and oid == info.array_oid:
+        return pa.field(name, pa.list_(base))
+    return pa.field(name, base)
+
+# numerics arrive as Decimal and unmapped types as python objects, pyarrow wants floats and strings for them
+def _arrow_converter(pa, type_):
+    if pa.types.is_string(type_):
+        return str
+    if pa.types.is_floating(type_):
+        return float
+    if pa.types.is_list(type_):
+        inner = _arrow_converter(pa, type_.value_type)
+        if inner is not None:
+            return lambda values: [None if v is None else inner(v) for v in values]
+    return None
+
+def _arrow_array(pa, field, values):
+    convert = _arrow_converter(pa, field.type)
+    if convert is not None:
+        values = [None if v is None else convert(v) for v in values]
+    return pa.array(values, type=field.type)
+
+# --- arrow ipc stream: the schema message, then one record batch message per EXPORT_BATCH_ROWS rows fetched through a
+# named (server side) cursor, then the end-of-stream marker. only one batch is ever in memory
+async def stream_arrow(query: sql.Composable):
+    import pyarrow as pa
+    batches = rows_sent = 0
+    deadline = _deadline()
+    async with export_connection() as conn:
+        async with conn.transaction():
+            await _begin_export(conn)
+            async with conn.cursor(name="export") as cur:
+                await cur.execute(query)
+                schema = pa.schema([_arrow_field(pa, conn, desc.name, desc.type_code) for desc in cur.description])
+                yield schema.serialize().to_pybytes()
+                while rows := await cur.fetchmany(settings.EXPORT_BATCH_ROWS):
+                    _check_deadline(deadline)
+                    columns = list(zip(*rows))
+                    arrays = [_arrow_array(pa, field, values) for field, values in zip(schema, columns)]
+                    yield pa.RecordBatch.from_arrays(arrays, schema=schema).serialize().to_pybytes()
+                    batches += 1
+                    rows_sent += len(rows)
+    yield ARROW_EOS
+    logger.info(f"ARROW EXPORT FINISHED: {rows_sent} ROWS IN {batches} BATCHES")
+
+# runs the stream up to its first chunk, so query errors (bad sql, timeouts before any output) surface as a normal
+# error response instead of a truncated 200
+async def start_stream(chunks):
+    first = await anext(chunks)
+
+    async def body():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+    return body()
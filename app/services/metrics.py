@@ -0,0 +1,164 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from app.core.config import settings
+
+# upper bounds (seconds) for the latency histograms, the question pipeline spans ~10ms db calls to multi second llm calls
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf")]
+ROW_BUCKETS = [0, 1, 5, 10, 25, 50, 100, 200, float("inf")]
+
+class Histogram:
+    def __init__(self, buckets: list[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+# in-process metrics, exposed in prometheus text format on /metrics. one registry per api process
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms: dict[tuple, Histogram] = {}
+        self.histogram_help: dict[str, str] = {}
+        self.counters: dict[tuple, float] = defaultdict(float)
+        self.counter_help: dict[str, str] = {}
+
+    def observe(self, name: str, value: float, buckets: list[float], help: str = "", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(buckets)
+            self.histogram_help.setdefault(name, help)
+        self.histograms[key].observe(value)
+
+    def inc(self, name: str, amount: float = 1, help: str = "", **labels):
+        self.counters[(name, tuple(sorted(labels.items())))] += amount
+        self.counter_help.setdefault(name, help)
+
+    def render(self) -> str:
+        lines = []
+        for name in sorted(self.counter_help):
+            lines.append(f"# HELP {name} {self.counter_help[name]}")
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(self.counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for name in sorted(self.histogram_help):
+            lines.append(f"# HELP {name} {self.histogram_help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:g}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+registry = MetricsRegistry()
+
+# --- per-question timings, token usage and row counts, folded into the registry when the request finishes
+class QuestionTrace:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.tokens: dict[tuple[str, str], int] = defaultdict(int)
+        self.rows: int | None = None
+        self.sql: str | None = None
+        self.total: float | None = None
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    # usage is the openai responses api usage object (input_tokens / output_tokens)
+    def record_tokens(self, call: str, usage):
+        if usage is None:
+            return
+        self.tokens[(call, "input")] += getattr(usage, "input_tokens", 0) or 0
+        self.tokens[(call, "output")] += getattr(usage, "output_tokens", 0) or 0
+
+    def record_rows(self, rows: int):
+        self.rows = rows
+
+    def record_sql(self, sql: str):
+        self.sql = sql
+
+    def finish(self, status: str):
+        total = self.total = time.perf_counter() - self.start
+        # the trace also feeds the audit log, which can be on while metrics are off
+        if not settings.METRICS_ENABLED:
+            return
+        registry.observe("oracle_question_seconds", total, LATENCY_BUCKETS, "End to end /question latency", status=status)
+        for name, seconds in self.stages.items():
+            registry.observe("oracle_stage_seconds", seconds, LATENCY_BUCKETS, "Latency of each question pipeline stage", stage=name)
+        for (call, kind), count in self.tokens.items():
+            registry.inc("oracle_llm_tokens_total", count, "LLM tokens used by the question pipeline", call=call, kind=kind)
+        if self.rows is not None:
+            registry.observe("oracle_result_rows", self.rows, ROW_BUCKETS, "Rows returned by generated sql")
+        registry.inc("oracle_questions_total", 1, "Questions answered by status", status=status)
+
+    def server_timing(self) -> str:
+        if not settings.METRICS_ENABLED:
+            return ""
+        stages = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        stages.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(stages)
+
+# --- stand-in used when METRICS_ENABLED and AUDIT_ENABLED are off, every call is a no-op so the pipeline pays nothing for tracing
+class NullTrace:
+    stages: dict = {}
+    tokens: dict = {}
+    rows = None
+    sql = None
+    total = None
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def record(self, name: str, seconds: float):
+        pass
+
+    def record_tokens(self, call: str, usage):
+        pass
+
+    def record_rows(self, rows: int):
+        pass
+
+    def record_sql(self, sql: str):
+        pass
+
+    def finish(self, status: str):
+        pass
+
+    def server_timing(self) -> str:
+        return ""
+
+NULL_TRACE = NullTrace()
+
+def new_trace() -> QuestionTrace | NullTrace:
+    return QuestionTrace() if settings.METRICS_ENABLED or settings.AUDIT_ENABLED else NULL_TRACE
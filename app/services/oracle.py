@@ -2,12 +2,23 @@ import psycopg
 from openai import OpenAI
 from fastapi import HTTPException
 import re
+from app.services.metrics import NULL_TRACE
+
+# what the follow-up prompt answers with when editing the previous sql isn't enough
+FOLLOWUP_NEEDS_SCHEMA = "NEW_QUESTION"
+
+# the model doesn't always answer with exactly the marker: code fences, backticks, a trailing period, lowercase
+def asks_for_schema(reply: str) -> bool:
+    words = [word.upper() for word in re.findall(r"[A-Za-z_]+", reply) if word.lower() != "sql"]
+    return words == [FOLLOWUP_NEEDS_SCHEMA]
 
 class Oracle:
-    def __init__(self, logger, schema: str, client: OpenAI):
+    def __init__(self, logger, schema: str, client: OpenAI, analytics=None):
         self.client = client
         self.logger = logger
         self.schema = schema
+        # optional AnalyticsEngine (ANALYTICS_BACKEND=duckdb), analytic queries it can serve skip postgres
+        self.analytics = analytics
 
     def sanitize_sql(self, query: str) -> str:
         if not query or not query.strip():
@@ -45,30 +56,45 @@ class Oracle:
         return query
 
     # Async database operation returns empty dict if the query has sanitization issues or if there's a problem running against the databse
-    async def execute_sql(self, query: str, conn: psycopg.AsyncConnection):
+    async def execute_sql(self, query: str, conn: psycopg.AsyncConnection, trace=NULL_TRACE):
         self.logger.info("EXECUTING SQL QUERY")
         # QUERY VALIDATION
 
-        sanitizedQuery = self.sanitize_sql(query)
+        with trace.stage("sanitize"):
+            sanitizedQuery = self.sanitize_sql(query)
         if not sanitizedQuery:
             return {}
+
+        # a duckdb timeout is final (postgres would hit its own 2s cap too), anything else it can't run (or answers with
+        # NaN / Infinity) falls back
+        if self.analytics is not None and await self.analytics.can_serve(sanitizedQuery):
+            try:
+                with trace.stage("execute_duckdb"):
+                    result = await self.analytics.run(sanitizedQuery)
+                if result:
+                    trace.record_rows(len(result["rows"]))
+                return result
+            except Exception as e:
+                self.logger.error(f"PROBLEM RUNNING QUERY ON ANALYTICS SNAPSHOT, FALLING BACK TO POSTGRES: {e}")
         
         async with conn.cursor() as cur:
             try:
-                async with conn.transaction():
-                    await cur.execute("SET LOCAL statement_timeout = '2s'")
-                    await cur.execute("SET LOCAL lock_timeout = '1s'")
-                    await cur.execute(sanitizedQuery)
-                cols = [desc[0] for desc in cur.description]
-                rows = await cur.fetchmany(200) # hard-coded safeguard for now
+                with trace.stage("execute"):
+                    async with conn.transaction():
+                        await cur.execute("SET LOCAL statement_timeout = '2s'")
+                        await cur.execute("SET LOCAL lock_timeout = '1s'")
+                        await cur.execute(sanitizedQuery)
+                with trace.stage("fetch"):
+                    cols = [desc[0] for desc in cur.description]
+                    rows = await cur.fetchmany(200) # hard-coded safeguard for now
+                trace.record_rows(len(rows))
                 return {"columns": cols, "rows": rows}
             except psycopg.Error as e:
                 self.logger.error(f"PROBLEM RUNNING QUERY ON PBP DATA: {e}")
                 return {}
 
-    def get_sql_from_question(self, question: str):
-        self.logger.info("GETTING SQL FROM USER QUESTION")
-        prompt = f"""
+    def build_sql_prompt(self, question: str) -> str:
+        return f"""
         You are a PostgreSQL query planner for NBA statistical data. You generate SQL to query the NBA database to answer natural language questions about
         player/team statistics. Do NOT explain results in prose. Return valid SQL ONLY. Remember that you cannot round() with double precision.
 
@@ -86,12 +112,19 @@ class Oracle:
         User Question: "{question}"
         
         """
+
+    def get_sql_from_question(self, question: str, trace=NULL_TRACE):
+        self.logger.info("GETTING SQL FROM USER QUESTION")
+        with trace.stage("prompt_build"):
+            prompt = self.build_sql_prompt(question)
         sql = ""
         try:
-            response = self.client.responses.create(
-                model="gpt-5.2",
-                input=prompt
-            )
+            with trace.stage("generate_sql"):
+                response = self.client.responses.create(
+                    model="gpt-5.2",
+                    input=prompt
+                )
+            trace.record_tokens("generate_sql", getattr(response, "usage", None))
             sql = response.output_text.strip()
             sql = sql.split("```")[0].strip() # Remove markdown delimiters
         except Exception as e:
@@ -99,7 +132,52 @@ class Oracle:
         finally:
             return sql
 
-    def interpret_sql_response(self, response: str, query: str, question: str):
+    # follow-ups in a session edit the previous turns' sql, so the prompt carries that sql and a sample of the last result
+    # instead of the full schema
+    def build_followup_prompt(self, question: str, turns: list[dict]) -> str:
+        history = "\n\n        ".join(f'Question: "{turn["question"]}"\n        SQL: {turn["sql"]}' for turn in turns)
+        last = turns[-1]["result"]
+        return f"""
+        You are a PostgreSQL query editor for NBA statistical data. A user is asking a follow-up question in an ongoing conversation. Below are their earlier
+        questions with the SQL that answered each, and a sample of the most recent result. Edit the most recent SQL so that it answers the follow-up, keeping
+        every player, team, season and filter the follow-up doesn't change. Do NOT explain results in prose. Return valid SQL ONLY. Remember that you cannot round() with double precision.
+
+        NEVER GENERATE SQL THAT ATTEMPTS TO ACCESS SENSITIVE DATABASE INFO (i.e. users table), NEVER ALTER THE DATABASE, AND NEVER INCLUDE COMMENTS IN YOUR SQL.
+
+        If the follow-up needs tables or columns that none of the SQL below uses, or it isn't a follow-up at all, respond with exactly {FOLLOWUP_NEEDS_SCHEMA}
+
+        The current season is the 2025-26 season, which has season id: 22025. Last season (2024-25) has season id: 22024.
+
+        {history}
+
+        Most recent result (columns {last["columns"]}, first rows of {last["row_count"]}): {last["rows"]}
+
+        Follow-up Question: "{question}"
+        
+        """
+
+    def get_followup_sql(self, question: str, turns: list[dict], trace=NULL_TRACE):
+        self.logger.info("GETTING SQL FROM FOLLOW-UP QUESTION")
+        with trace.stage("prompt_build"):
+            prompt = self.build_followup_prompt(question, turns)
+        sql = ""
+        try:
+            with trace.stage("generate_sql"):
+                response = self.client.responses.create(
+                    model="gpt-5.2",
+                    input=prompt
+                )
+            trace.record_tokens("generate_followup_sql", getattr(response, "usage", None))
+            sql = response.output_text.strip()
+        except Exception as e:
+            self.logger.error(f"PROBLEM GETTING FOLLOW-UP SQL FROM OPENAI {e}")
+        if asks_for_schema(sql):
+            # back to the full schema prompt, with the previous question for context
+            self.logger.info("FOLLOW-UP NEEDS THE FULL SCHEMA")
+            return self.get_sql_from_question(f'{question} (following up on: "{turns[-1]["question"]}")', trace=trace)
+        return sql.split("```")[0].strip()
+
+    def interpret_sql_response(self, response: str, query: str, question: str, trace=NULL_TRACE):
         self.logger.info("INTERPRETING SQL RESPONSE")
         prompt = f"""
         You are an SQL output interpreter for an NBA statistical data natural language querying tool. Given a user question, sql query, and output, you provide a concise, friendly, 
@@ -113,10 +191,12 @@ class Oracle:
         """
         answer = ""
         try:
-            completion = self.client.responses.create(
-                model="gpt-5.2",
-                input=prompt
-            )
+            with trace.stage("interpret"):
+                completion = self.client.responses.create(
+                    model="gpt-5.2",
+                    input=prompt
+                )
+            trace.record_tokens("interpret", getattr(completion, "usage", None))
             answer = completion.output_text.strip()
             answer = answer.split("```")[0].strip()
         except Exception as e:
@@ -124,19 +204,38 @@ class Oracle:
         finally:
             return answer
         
-    async def ask_oracle(self, question: str, conn: psycopg.AsyncConnection):
+    # trace collects per-stage timings / token usage, the default no-op trace keeps this free when metrics are off
+    async def ask_oracle(self, question: str, conn: psycopg.AsyncConnection, trace=NULL_TRACE):
+        answer, _, _ = await self.answer_question(question, conn=conn, trace=trace)
+        return answer
+
+    # turns are a session's earlier {question, sql, result} turns, with any the sql is generated as an edit of theirs.
+    # results is an optional ResultCache checked before going to the database. returns the answer, sql and raw result
+    async def answer_question(self, question: str, conn: psycopg.AsyncConnection, trace=NULL_TRACE, turns: list[dict] | None = None,
+                              results=None):
         self.logger.info('GET /query')
 
-        sql = self.get_sql_from_question(question)
+        if turns:
+            sql = self.get_followup_sql(question, turns, trace=trace)
+        else:
+            sql = self.get_sql_from_question(question, trace=trace)
+        trace.record_sql(sql)
         if not sql:
             raise HTTPException(status_code=500, detail="Problem generating query")
-    
-        database_answer = await self.execute_sql(query=sql, conn=conn)
-        if not database_answer:
-            raise HTTPException(status_code=500, detail="Problem querying database")
 
-        formatted_response = self.interpret_sql_response(response=database_answer, query=sql, question=question)
+        database_answer = results.get(sql) if results is not None else None
+        if database_answer is not None:
+            self.logger.info("REUSING CACHED RESULT")
+            trace.record_rows(len(database_answer["rows"]))
+        else:
+            database_answer = await self.execute_sql(query=sql, conn=conn, trace=trace)
+            if not database_answer:
+                raise HTTPException(status_code=500, detail="Problem querying database")
+            if results is not None:
+                results.put(sql, database_answer)
+
+        formatted_response = self.interpret_sql_response(response=database_answer, query=sql, question=question, trace=trace)
         if not formatted_response:
             raise HTTPException(status_code=500, detail="Problem interpreting query output")
 
-        return formatted_response
\ No newline at end of file
+        return formatted_response, sql, database_answer
\ No newline at end of file
@@ -0,0 +1,108 @@
+import re
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from psycopg import AsyncConnection
+from psycopg.types.json import Jsonb
+from app.core.config import settings
+from app.services.data_version import DataVersions, data_versions
+
+# longest text kept per result value in a stored turn, results only go back into follow-up prompts as a sample
+SESSION_VALUE_CHARS = 64
+
+@dataclass
+class ConversationSession:
+    id: str
+    user_email: str
+    turns: list[dict] = field(default_factory=list)
+
+# first SESSION_RESULT_ROWS rows, values json friendly and length capped
+def compact_result(result: dict) -> dict:
+    def compact(value):
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        return str(value)[:SESSION_VALUE_CHARS]
+    rows = result.get("rows", [])
+    return {
+        "columns": list(result.get("columns", [])),
+        "rows": [[compact(value) for value in row] for row in rows[:settings.SESSION_RESULT_ROWS]],
+        "row_count": len(rows),
+    }
+
+# --- sessions live in postgres (through the rw pool) so every api worker sees them. reads slide the ttl forward, expired
+# sessions are cleared when new ones are created
+async def create_session(conn: AsyncConnection, user_email: str) -> ConversationSession:
+    session = ConversationSession(id=secrets.token_urlsafe(24), user_email=user_email)
+    async with conn.transaction():
+        async with conn.cursor() as cur:
+            await cur.execute("DELETE FROM conversation_session WHERE expires_at < now();")
+            await cur.execute(
+                "INSERT INTO conversation_session (id, user_email, expires_at) VALUES (%s, %s, now() + make_interval(secs => %s))",
+                (session.id, user_email, settings.SESSION_TTL_SECONDS)
+            )
+    return session
+
+async def get_session(conn: AsyncConnection, session_id: str, user_email: str) -> ConversationSession | None:
+    async with conn.transaction():
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "UPDATE conversation_session SET expires_at = now() + make_interval(secs => %s) "
+                "WHERE id = %s AND user_email = %s AND expires_at > now() RETURNING turns",
+                (settings.SESSION_TTL_SECONDS, session_id, user_email)
+            )
+            row = await cur.fetchone()
+    if not row:
+        return None
+    return ConversationSession(id=session_id, user_email=user_email, turns=row[0])
+
+# --- appended and trimmed in one statement, so concurrent questions in the same session can't overwrite each other's
+# turns the way a read-modify-write from the session loaded at the start of the request would
+async def save_turn(conn: AsyncConnection, session: ConversationSession, question: str, sql: str, result: dict):
+    turn = {"question": question, "sql": sql, "result": compact_result(result)}
+    async with conn.transaction():
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "UPDATE conversation_session SET turns = ("
+                "SELECT coalesce(jsonb_agg(kept.turn ORDER BY kept.n), '[]'::jsonb) FROM ("
+                "SELECT turn, n FROM jsonb_array_elements(turns || %s::jsonb) WITH ORDINALITY AS appended(turn, n) "
+                "ORDER BY n DESC LIMIT %s) AS kept"
+                ") WHERE id = %s AND user_email = %s RETURNING turns",
+                (Jsonb([turn]), settings.SESSION_MAX_TURNS, session.id, session.user_email)
+            )
+            row = await cur.fetchone()
+    if row:
+        session.turns = row[0]
+
+async def delete_session(conn: AsyncConnection, session_id: str, user_email: str) -> bool:
+    async with conn.transaction():
+        async with conn.cursor() as cur:
+            await cur.execute("DELETE FROM conversation_session WHERE id = %s AND user_email = %s", (session_id, user_email))
+            return cur.rowcount > 0
+
+# --- follow-ups often land on sql an earlier turn (or another session) already ran, e.g. going back to a previous season.
+# results are keyed on the whitespace-normalized sql and the current data version, so a load invalidates them all.
+# per process and lru bounded, older versions age out on their own
+class ResultCache:
+    def __init__(self, versions: DataVersions, max_entries: int | None = None):
+        self.versions = versions
+        self.max_entries = max_entries or settings.SESSION_RESULT_CACHE_SIZE
+        self.entries: OrderedDict[tuple[str, int], dict] = OrderedDict()
+
+    def key(self, sql: str) -> tuple[str, int]:
+        return re.sub(r"\s+", " ", sql).strip().rstrip(";").rstrip(), self.versions.current
+
+    def get(self, sql: str) -> dict | None:
+        key = self.key(sql)
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, sql: str, result: dict):
+        key = self.key(sql)
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+result_cache = ResultCache(data_versions)
@@ -0,0 +1,284 @@
+# offline workload analysis of the sql the oracle generates: groups logged queries from question_audit by shape, enriches
+# them with pg_stat_statements timings, EXPLAINs one example per shape against the current schema and ranks missing
+# index and rollup candidates by estimated time saved. optionally writes alembic migration stubs for the top indexes
+#   python -m benchmarks.analyze_workload --days 14 --out workload.json
+#   python -m benchmarks.analyze_workload --stubs-dir alembic/versions --top 3
+import argparse
+import json
+import os
+import re
+import uuid
+from collections import defaultdict
+from datetime import datetime
+import psycopg
+from app.core.config import settings
+
+STATEMENT_TIMEOUT = "2s" # same cap the oracle applies to generated sql
+# a seq scan only becomes an index candidate when it keeps at most this share of the relation's rows
+MAX_INDEX_SELECTIVITY = 0.2
+# aggregates reading more rows than this per call are reported as rollup candidates
+ROLLUP_MIN_INPUT_ROWS = 100000
+PARTITION_PATTERN = re.compile(r"^(pbp_raw_event)_\d+$")
+COMPARISON_PATTERN = re.compile(r"\(?(?:\w+\.)?(\w+)\)?(?:::\w+)?\s*(=|<>|<=|>=|<|>|~~|= ANY)\s")
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic")
+
+# --- query shape: literals and parameters replaced, whitespace and case folded, IN lists collapsed
+def query_shape(query: str) -> str:
+    shape = re.sub(r"'(?:[^']|'')*'", "?", query)
+    shape = re.sub(r"\$\d+", "?", shape)
+    shape = re.sub(r"\b\d+(?:\.\d+)?\b", "?", shape)
+    shape = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?)", shape)
+    return re.sub(r"\s+", " ", shape).strip().rstrip(";").lower()
+
+def fetch_audit_queries(cur, days: int) -> list[tuple]:
+    cur.execute(
+        """
+        SELECT generated_sql, count(*), avg((stage_ms->>'execute')::float)
+        FROM question_audit
+        WHERE status = 'ok' AND generated_sql IS NOT NULL AND asked_at > now() - make_interval(days => %s)
+        GROUP BY generated_sql;
+        """,
+        (days,)
+    )
+    return cur.fetchall()
+
+# --- oracle_ro's statements only, so loader and migration traffic doesn't drown out the question workload.
+# empty when the extension isn't installed, the audit log's own execute timings are used then
+def fetch_statement_stats(conn) -> list[tuple]:
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT s.query, s.calls, s.total_exec_time
+                FROM pg_stat_statements s JOIN pg_roles r ON r.oid = s.userid
+                WHERE r.rolname = 'oracle_ro';
+                """
+            )
+            rows = cur.fetchall()
+        conn.commit()
+        return rows
+    except psycopg.Error as e:
+        conn.rollback()
+        print(f"pg_stat_statements unavailable, using audit timings only ({e.sqlstate})")
+        return []
+
+def group_by_shape(audit_rows: list[tuple], statement_rows: list[tuple]) -> dict[str, dict]:
+    shapes = {}
+    for query, calls, execute_ms in audit_rows:
+        shape = shapes.setdefault(query_shape(query), {"example": query, "calls": 0, "total_ms": 0.0, "source": "audit"})
+        shape["calls"] += calls
+        shape["total_ms"] += calls * (execute_ms or 0.0)
+    # pg_stat_statements times every call server side, it replaces the audit estimate for shapes it has seen
+    statements = defaultdict(lambda: [0, 0.0])
+    for query, calls, total_ms in statement_rows:
+        totals = statements[query_shape(query)]
+        totals[0] += calls
+        totals[1] += total_ms
+    for key, (calls, total_ms) in statements.items():
+        if key in shapes:
+            shapes[key].update(calls=calls, total_ms=total_ms, source="pg_stat_statements")
+    return shapes
+
+def explain(conn, query: str) -> dict | None:
+    try:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                # read only even though EXPLAIN without ANALYZE doesn't execute, this runs as the migrations role
+                cur.execute("SET TRANSACTION READ ONLY")
+                cur.execute(f"SET LOCAL statement_timeout = '{STATEMENT_TIMEOUT}'")
+                cur.execute(f"EXPLAIN (FORMAT JSON) {query}")
+                return cur.fetchone()[0][0]["Plan"]
+    except psycopg.Error as e:
+        print(f"EXPLAIN failed ({e.sqlstate}): {query[:80]}")
+        return None
+
+def walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+def parent_relation(name: str) -> str:
+    match = PARTITION_PATTERN.match(name)
+    return match.group(1) if match else name
+
+# --- equality columns first (they lead the index), then range columns
+def filter_columns(condition: str) -> list[str]:
+    equality, ranges = [], []
+    for column, operator in COMPARISON_PATTERN.findall(condition):
+        target = equality if operator in ("=", "= ANY") else ranges
+        if column not in equality + ranges and not column.isdigit():
+            target.append(column)
+    return equality + ranges
+
+def relation_sizes(cur) -> dict[str, float]:
+    cur.execute("SELECT c.relname, c.reltuples FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'm');")
+    return {name: float(tuples) for name, tuples in cur.fetchall()}
+
+def existing_indexes(cur) -> dict[str, list[list[str]]]:
+    cur.execute(
+        """
+        SELECT t.relname, array_agg(a.attname ORDER BY k.ord)
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+        WHERE n.nspname = 'public'
+        GROUP BY t.relname, i.indexrelid;
+        """
+    )
+    indexes = defaultdict(list)
+    for table, columns in cur.fetchall():
+        indexes[parent_relation(table)].append(columns)
+    return indexes
+
+def is_covered(columns: list[str], indexes: list[list[str]]) -> bool:
+    return any(index[:len(columns)] == columns for index in indexes)
+
+# --- the share of a shape's time spent in a filtering seq scan is what an index on the filter could save, scaled by
+# how much of the relation the filter throws away
+def index_candidates(plan: dict, shape: dict, sizes: dict, indexes: dict) -> list[dict]:
+    candidates = []
+    root_cost = plan.get("Total Cost") or 0.0
+    for node in walk(plan):
+        if node["Node Type"] not in ("Seq Scan", "Parallel Seq Scan") or not node.get("Filter") or not root_cost:
+            continue
+        table = parent_relation(node["Relation Name"])
+        columns = filter_columns(node["Filter"])
+        relation_rows = sizes.get(node["Relation Name"]) or sizes.get(table) or 0.0
+        if not columns or relation_rows <= 0 or is_covered(columns, indexes.get(table, [])):
+            continue
+        selectivity = min(1.0, node["Plan Rows"] / relation_rows)
+        if selectivity > MAX_INDEX_SELECTIVITY:
+            continue
+        share = node["Total Cost"] / root_cost
+        candidates.append({"table": table, "columns": columns,
+                           "saved_ms": shape["total_ms"] * share * (1 - selectivity)})
+    return candidates
+
+def rollup_candidate(plan: dict, shape: dict) -> dict | None:
+    aggregates = [node for node in walk(plan) if node["Node Type"] == "Aggregate"]
+    scanned = {parent_relation(node["Relation Name"]) for node in walk(plan) if node.get("Relation Name")}
+    input_rows = max((sum(child["Plan Rows"] for child in node.get("Plans", [])) for node in aggregates), default=0)
+    # shapes already served by a rollup are not candidates again
+    if input_rows < ROLLUP_MIN_INPUT_ROWS or any(name.startswith("mv_") for name in scanned):
+        return None
+    return {"tables": sorted(scanned), "input_rows": input_rows, "calls": shape["calls"], "saved_ms": shape["total_ms"]}
+
+def analyze(conn, days: int) -> dict:
+    with conn.cursor() as cur:
+        audit_rows = fetch_audit_queries(cur, days)
+        sizes = relation_sizes(cur)
+        indexes = existing_indexes(cur)
+    conn.commit()
+    shapes = group_by_shape(audit_rows, fetch_statement_stats(conn))
+    ranked_indexes = {}
+    rollups = []
+    for key, shape in shapes.items():
+        plan = explain(conn, shape["example"])
+        if plan is None:
+            continue
+        for candidate in index_candidates(plan, shape, sizes, indexes):
+            entry = ranked_indexes.setdefault((candidate["table"], tuple(candidate["columns"])),
+                                              {"table": candidate["table"], "columns": candidate["columns"], "saved_ms": 0.0, "shapes": 0})
+            entry["saved_ms"] += candidate["saved_ms"]
+            entry["shapes"] += 1
+        rollup = rollup_candidate(plan, shape)
+        if rollup:
+            rollups.append({"shape": key, **rollup})
+    return {
+        "shapes": len(shapes),
+        "index_candidates": sorted(ranked_indexes.values(), key=lambda c: c["saved_ms"], reverse=True),
+        "rollup_candidates": sorted(rollups, key=lambda c: c["saved_ms"], reverse=True),
+    }
+
+def current_head() -> str | None:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    return ScriptDirectory.from_config(config).get_current_head()
+
+def index_name(table: str, columns: list[str]) -> str:
+    return f"ix_{'pbp' if table == 'pbp_raw_event' else table}_{'_'.join(columns)}"[:63]
+
+# --- one reviewable migration per candidate, chained onto the current head in rank order
+def write_migration_stubs(candidates: list[dict], stubs_dir: str) -> list[str]:
+    paths = []
+    down_revision = current_head()
+    for candidate in candidates:
+        revision = uuid.uuid4().hex[:12]
+        name = index_name(candidate["table"], candidate["columns"])
+        # partitioned parents can't be indexed concurrently, the index is built per partition inside the migration lock
+        concurrently = candidate["table"] != "pbp_raw_event"
+        create = (f"    op.create_index('{name}', '{candidate['table']}', {candidate['columns']!r}, unique=False, "
+                  f"postgresql_concurrently={concurrently}, if_not_exists=True)\n")
+        drop = f"    op.drop_index('{name}', table_name='{candidate['table']}', postgresql_concurrently={concurrently}, if_exists=True)\n"
+        if concurrently:
+            create = "    with op.get_context().autocommit_block():\n    " + create
+            drop = "    with op.get_context().autocommit_block():\n    " + drop
+        body = f'''"""add {name}
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {datetime.now()}
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '{revision}'
+down_revision: Union[str, None] = {down_revision!r}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# suggested by benchmarks.analyze_workload: ~{candidate['saved_ms'] / 1000:.1f}s of execution time saved over {candidate['shapes']} query shapes
+# review the column order and consider a partial index / INCLUDE columns before applying
+
+
+def upgrade() -> None:
+{create}
+
+def downgrade() -> None:
+{drop}'''
+        path = os.path.join(stubs_dir, f"{revision}_add_{name}.py")
+        with open(path, "w") as file:
+            file.write(body)
+        paths.append(path)
+        down_revision = revision
+    return paths
+
+def report(results: dict, top: int):
+    print(f"\n{results['shapes']} query shapes analyzed")
+    print(f"\n{'index candidate':<60} {'saved s':>10} {'shapes':>8}")
+    for candidate in results["index_candidates"][:top]:
+        print(f"{candidate['table'] + ' (' + ', '.join(candidate['columns']) + ')':<60} {candidate['saved_ms'] / 1000:>10.1f} {candidate['shapes']:>8}")
+    print(f"\n{'rollup candidate':<60} {'saved s':>10} {'calls':>8}")
+    for candidate in results["rollup_candidates"][:top]:
+        print(f"{candidate['shape'][:60]:<60} {candidate['saved_ms'] / 1000:>10.1f} {candidate['calls']:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank index and rollup candidates from the logged generated SQL")
+    parser.add_argument("--days", type=int, default=30, help="how far back to read question_audit")
+    parser.add_argument("--top", type=int, default=10, help="candidates to report / write stubs for")
+    parser.add_argument("--out", default=None, help="write results as json to this path")
+    parser.add_argument("--stubs-dir", default=None, help="write alembic migration stubs for the top index candidates here")
+    args = parser.parse_args()
+
+    # question_audit is revoked from oracle_ro, the migrations role reads it and EXPLAINs the generated sql
+    with psycopg.connect(settings.DATABASE_URL_MIGRATIONS) as conn:
+        results = analyze(conn, args.days)
+    report(results, args.top)
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.stubs_dir:
+        for path in write_migration_stubs(results["index_candidates"][:args.top], args.stubs_dir):
+            print(f"wrote {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# loader throughput against recorded nba_api payloads (see benchmarks/nba_api_fixtures.py), so ingest changes can be
+# compared run to run without the live api's latency and rate limits in the numbers:
+#   python -m benchmarks.bench_loaders record --max-games 100            (once, needs network)
+#   python -m benchmarks.bench_loaders run --out before.json
+#   python -m benchmarks.bench_loaders run --out after.json --compare before.json
+#   python -m benchmarks.bench_loaders run --latency 0.2 --error-rate 0.05   (exercise _with_retry)
+# runs the current season loaders against DATABASE_URL_RW, point it at a scratch database
+import argparse
+import time
+import psycopg
+from app.core.config import settings
+from loaders.instrumentation import LoadMetrics
+from loaders.loadGame import GameLoader
+from loaders.loadPBP import PBPDataLoader
+from loaders.loadPlayer import PlayerLoader
+from loaders.loadTeam import TeamLoader
+from benchmarks.bench_queries import git_commit, save_results
+from benchmarks.nba_api_fixtures import FIXTURE_DIR, FixtureAPI, patched_nba_api, record_fixtures
+
+CURRENT_SEASON = "2025-26"
+
+def _teams(conn, metrics):
+    with conn.transaction():
+        loader = TeamLoader(conn, metrics=metrics)
+        with conn.cursor() as cur:
+            loader.load_historical_teams(cur, refresh=True)
+            loader.load_modern_teams(cur)
+    return {}
+
+def _players(conn, metrics):
+    with conn.transaction():
+        with conn.cursor() as cur:
+            result = PlayerLoader(conn, metrics=metrics).load_player_index(cur)
+    return {"rows": result.staged}
+
+def _games(conn, metrics):
+    with conn.transaction():
+        GameLoader(conn, update=False, whole_current_season=True, metrics=metrics).load_games()
+    # one game_team_performance row per team per game, the game rows themselves are staged once per perspective
+    return {"games": metrics.rows_staged.get("game_team_performance", 0) // 2}
+
+def _pbp(conn, metrics):
+    before_games, before_events = metrics.counters["games"], metrics.counters["events"]
+    PBPDataLoader(conn, update=False, whole_current_season=True, metrics=metrics).load_pbp_data()
+    return {"games": metrics.counters["games"] - before_games, "events": metrics.counters["events"] - before_events}
+
+STAGES = {"teams": _teams, "players": _players, "games": _games, "pbp": _pbp}
+
+# --- each stage on its own connection like the real loaders, games / events per second from the stage's wall time
+def run(args) -> dict:
+    api = FixtureAPI(args.fixtures, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    metrics = LoadMetrics("bench_loaders")
+    results = {}
+    with patched_nba_api(api, sleep_scale=args.sleep_scale):
+        for name in args.stages:
+            start = time.perf_counter()
+            with metrics.stage(name):
+                with psycopg.connect(settings.DATABASE_URL_RW) as conn:
+                    counts = STAGES[name](conn, metrics)
+            seconds = time.perf_counter() - start
+            results[name] = {"seconds": round(seconds, 3), **counts}
+            for counter in ("games", "events", "rows"):
+                if counter in counts:
+                    results[name][f"{counter}_per_second"] = round(counts[counter] / seconds, 1) if seconds else None
+            print(f"{name:<10} {seconds:>8.2f}s " + " ".join(f"{k}={v}" for k, v in results[name].items() if k != "seconds"))
+    summary = metrics.summary()
+    return {
+        "stages": results,
+        "transform_seconds": summary["transform_seconds"],
+        "tables": summary["tables"],
+        "api": {endpoint: {"calls": calls, "injected_errors": api.errors[endpoint], "missing_fixtures": api.missing[endpoint],
+                           "retries": metrics.retries.get(endpoint, 0)} for endpoint, calls in api.calls.items()},
+    }
+
+def compare(before: dict, after: dict):
+    print(f"\n{'stage':<10} {'before s':>10} {'after s':>10} {'before games/s':>15} {'after games/s':>15} {'before events/s':>16} {'after events/s':>16}")
+    for name, new in after["results"]["stages"].items():
+        old = before["results"]["stages"].get(name, {})
+        print(f"{name:<10} {str(old.get('seconds')):>10} {str(new.get('seconds')):>10} {str(old.get('games_per_second')):>15} "
+              f"{str(new.get('games_per_second')):>15} {str(old.get('events_per_second')):>16} {str(new.get('events_per_second')):>16}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loader throughput against recorded nba_api fixtures")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="fixture directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="record fixtures from the live api")
+    record.add_argument("--season", default=CURRENT_SEASON)
+    record.add_argument("--max-games", type=int, default=100, help="games to record play by play for")
+
+    bench = commands.add_parser("run", help="run the loaders against the fixtures")
+    bench.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    bench.add_argument("--latency", type=float, default=0.0, help="seconds added to every fixture call")
+    bench.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of uniform noise on the latency")
+    bench.add_argument("--error-rate", type=float, default=0.0, help="share of calls that raise, retried by _with_retry")
+    bench.add_argument("--sleep-scale", type=float, default=0.0, help="scale for the loaders' rate limit / backoff sleeps (0 skips them)")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--out", default=None, help="write results as json to this path")
+    bench.add_argument("--compare", default=None, help="json results from an earlier run to compare against")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        team_ids = list(TeamLoader(None).team_ids)
+        games = record_fixtures(args.fixtures, team_ids, args.season, args.max_games)
+        print(f"recorded {len(team_ids)} teams and {games} games to {args.fixtures}")
+        return
+
+    results = {
+        "commit": git_commit(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "command")},
+        "results": run(args),
+    }
+    save_results(results, args.out, args.compare, compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# drives concurrent load through the whole /question pipeline in-process (auth, pool, oracle, interpretation) with a
+# deterministic stub in place of the openai client, so app-side regressions show up without spending credits.
+# needs the usual .env (DATABASE_URL* etc.) pointing at a local postgres, OPENAI_API_KEY can be any placeholder:
+#   python -m benchmarks.bench_pipeline --requests 500 --concurrency 20 --out before.json
+#   python -m benchmarks.bench_pipeline --requests 500 --concurrency 20 --out after.json --compare before.json
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+import httpx # installed with openai
+from app.core.config import settings
+from app.main import app
+from app.models.user import UserInDB
+from app.services.auth_service import get_current_active_user
+from app.services.rate_limiting import limiter
+from benchmarks.bench_queries import git_commit, load_corpus, save_results
+
+QUESTION_PATTERN = re.compile(r'User Question: "(.*)"')
+STUB_ANSWER = "Stub answer."
+BENCH_USER = UserInDB(email="bench@example.com", full_name="bench", password_hash="-")
+
+# --- stands in for OpenAI(): replays the corpus sql for its questions and a canned interpretation, after a seeded
+# artificial latency. it sleeps synchronously on purpose, the oracle calls the real client synchronously too
+class StubOpenAI:
+    def __init__(self, corpus: list[dict], sql_latency: float, interpret_latency: float, jitter: float, seed: int = 0):
+        self.sql_by_question = {entry["question"]: entry["sql"] for entry in corpus}
+        self.sql_latency = sql_latency
+        self.interpret_latency = interpret_latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.responses = SimpleNamespace(create=self.create)
+
+    def _sleep(self, latency: float):
+        if latency > 0:
+            time.sleep(max(0.0, latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    def create(self, model: str, input: str):
+        match = QUESTION_PATTERN.search(input)
+        # only the sql prompt quotes the question, the interpretation prompt is everything else
+        if match:
+            self._sleep(self.sql_latency)
+            output = self.sql_by_question.get(match.group(1).strip(), "")
+        else:
+            self._sleep(self.interpret_latency)
+            output = STUB_ANSWER
+        usage = SimpleNamespace(input_tokens=len(input) // 4, output_tokens=len(output) // 4)
+        return SimpleNamespace(output_text=output, usage=usage)
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(round(q * (len(values) - 1))))], 3)
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    stages = {}
+    for part in header.split(","):
+        name, _, duration = part.strip().partition(";dur=")
+        if name and duration:
+            stages[name] = float(duration)
+    return stages
+
+def summarize(samples: list[float]) -> dict:
+    return {"p50_ms": percentile(samples, 0.50), "p95_ms": percentile(samples, 0.95), "p99_ms": percentile(samples, 0.99),
+            "count": len(samples)}
+
+async def drive(client: httpx.AsyncClient, questions: list[str], total: int, concurrency: int) -> dict:
+    latencies, stages, statuses = [], {}, {}
+    next_request = iter(range(total))
+
+    async def worker():
+        for i in next_request:
+            start = time.perf_counter()
+            response = await client.post("/question", json={"question": questions[i % len(questions)]})
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            for name, duration in parse_server_timing(response.headers.get("server-timing", "")).items():
+                stages.setdefault(name, []).append(duration)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "client": summarize(latencies),
+        "stages": {name: summarize(samples) for name, samples in sorted(stages.items())},
+    }
+
+# --- runs the real lifespan (pools, data version listener, audit writer) and swaps in the stub client afterwards
+async def run(args) -> dict:
+    corpus = load_corpus()
+    app.dependency_overrides[get_current_active_user] = lambda: BENCH_USER
+    limiter.enabled = False
+    async with app.router.lifespan_context(app):
+        app.state.openai_client = StubOpenAI(corpus, args.sql_latency, args.interpret_latency, args.jitter, args.seed)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+            questions = [entry["question"] for entry in corpus]
+            if args.warmup:
+                await drive(client, questions, args.warmup, args.concurrency)
+            return await drive(client, questions, args.requests, args.concurrency)
+
+def compare(before: dict, after: dict):
+    print(f"\n{'stage':<16} {'before p50':>11} {'after p50':>11} {'before p95':>11} {'after p95':>11}")
+    for name in ["client"] + sorted(after["results"]["stages"]):
+        old = before["results"]["stages"].get(name, {}) if name != "client" else before["results"]["client"]
+        new = after["results"]["stages"].get(name, {}) if name != "client" else after["results"]["client"]
+        print(f"{name:<16} {str(old.get('p50_ms')):>11} {str(new.get('p50_ms')):>11} {str(old.get('p95_ms')):>11} {str(new.get('p95_ms')):>11}")
+    print(f"{'throughput rps':<16} {before['results']['throughput_rps']:>11} {after['results']['throughput_rps']:>11}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the /question pipeline with a stub LLM")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20, help="requests sent before measuring")
+    parser.add_argument("--sql-latency", type=float, default=0.0, help="seconds the stub takes to generate sql")
+    parser.add_argument("--interpret-latency", type=float, default=0.0, help="seconds the stub takes to interpret output")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of uniform noise on the stub latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--audit", action="store_true",
+                        help="write benchmark questions to question_audit like real traffic (off by default, so runs don't skew the audit data)")
+    parser.add_argument("--out", default=None, help="write results as json to this path")
+    parser.add_argument("--compare", default=None, help="json results from an earlier run to compare against")
+    args = parser.parse_args()
+
+    # the audit writer still runs (it's part of the lifespan), it just gets nothing to write
+    settings.AUDIT_ENABLED = settings.AUDIT_ENABLED and args.audit
+    if not settings.METRICS_ENABLED:
+        print("METRICS_ENABLED is off, only client side latencies will be reported")
+    results = {
+        "commit": git_commit(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "results": asyncio.run(run(args)),
+    }
+    print(json.dumps(results["results"], indent=2))
+    save_results(results, args.out, args.compare, compare)
+
+if __name__ == "__main__":
+    main()
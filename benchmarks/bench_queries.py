@@ -0,0 +1,100 @@
+# replays the question corpus SQL against the database and records server-side execution time per query
+# run once before and once after a schema change (e.g. alembic upgrade) and compare:
+#   python -m benchmarks.bench_queries --out before.json
+#   alembic upgrade head
+#   python -m benchmarks.bench_queries --out after.json --compare before.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import psycopg
+from app.core.config import settings
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "question_corpus.json")
+STATEMENT_TIMEOUT = "2s" # same cap the oracle applies to generated sql
+
+def load_corpus(path: str = CORPUS_PATH) -> list[dict]:
+    with open(path, "r") as file:
+        return json.load(file)
+
+# --- shared by the benchmark scripts: the commit a run was measured at, and the --out / --compare handling
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def save_results(results: dict, out: str | None, compare_path: str | None, compare):
+    if out:
+        with open(out, "w") as file:
+            json.dump(results, file, indent=2)
+    if compare_path:
+        with open(compare_path, "r") as file:
+            compare(json.load(file), results)
+
+# --- EXPLAIN ANALYZE gives execution time without network / fetch noise, the plan's root node tells us what was scanned
+def time_query(cur, query: str, repeats: int) -> dict:
+    timings = []
+    plan = None
+    for _ in range(repeats):
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}")
+        plan = cur.fetchone()[0][0]
+        timings.append(plan["Execution Time"])
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))], 3),
+        "min_ms": round(timings[0], 3),
+        "shared_hit_blocks": plan["Plan"].get("Shared Hit Blocks"),
+        "shared_read_blocks": plan["Plan"].get("Shared Read Blocks"),
+        "scan_nodes": sorted(set(collect_scan_nodes(plan["Plan"]))),
+    }
+
+def collect_scan_nodes(node: dict):
+    if "Scan" in node["Node Type"] and node.get("Relation Name"):
+        yield f"{node['Node Type']} on {node['Relation Name']}" + (f" using {node['Index Name']}" if node.get("Index Name") else "")
+    for child in node.get("Plans", []):
+        yield from collect_scan_nodes(child)
+
+def run(db_url: str, repeats: int, warmup: int) -> dict:
+    results = {}
+    with psycopg.connect(db_url) as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"SET statement_timeout = '{STATEMENT_TIMEOUT}'")
+            for entry in load_corpus():
+                # a timeout in the warmup counts the same as one in the timed runs. the cancel aborts the transaction,
+                # which also drops the statement_timeout set in it, so it's rolled back and the timeout reapplied
+                try:
+                    for _ in range(warmup):
+                        cur.execute(entry["sql"])
+                        cur.fetchall()
+                    results[entry["name"]] = time_query(cur, entry["sql"], repeats)
+                except psycopg.errors.QueryCanceled:
+                    conn.rollback()
+                    cur.execute(f"SET statement_timeout = '{STATEMENT_TIMEOUT}'")
+                    results[entry["name"]] = {"median_ms": None, "timed_out": True}
+                print(f"{entry['name']:<30} {results[entry['name']].get('median_ms')} ms")
+    return results
+
+def compare(before: dict, after: dict):
+    print(f"\n{'query':<30} {'before ms':>12} {'after ms':>12} {'speedup':>10}")
+    for name, result in after.items():
+        old = before.get(name, {}).get("median_ms")
+        new = result.get("median_ms")
+        speedup = f"{old / new:.1f}x" if old and new else "-"
+        print(f"{name:<30} {str(old):>12} {str(new):>12} {speedup:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the question corpus SQL against the current schema")
+    parser.add_argument("--out", default=None, help="write results as json to this path")
+    parser.add_argument("--compare", default=None, help="json results from an earlier run to compare against")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    args = parser.parse_args()
+
+    results = run(settings.DATABASE_URL, args.repeats, args.warmup)
+    save_results(results, args.out, args.compare, compare)
+
+if __name__ == "__main__":
+    main()
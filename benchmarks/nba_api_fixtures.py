@@ -0,0 +1,116 @@
+# recorded nba_api payloads served in place of the live endpoints, so the loaders can run offline against a fixed
+# workload. latency and error rate are injectable so _with_retry and the rate limit pauses behave like they do live
+#   fixtures/nba_api/playbyplay/<game id>.json          PlayByPlay(...).actions.get_dict()
+#   fixtures/nba_api/leaguegamefinder/<team>_<type>.json LeagueGameFinder(...).get_data_frames()[0] records
+#   fixtures/nba_api/teamdetails/<team id>.json          TeamDetails(...).get_data_frames(), one record list per frame
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+import pandas as pd
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "nba_api")
+
+def _path(fixture_dir: str, endpoint: str, key: str) -> str:
+    return os.path.join(fixture_dir, endpoint, f"{key}.json")
+
+def _season_type_key(season_type: str) -> str:
+    return season_type.lower().replace(" ", "_")
+
+def write_fixture(fixture_dir: str, endpoint: str, key: str, payload):
+    os.makedirs(os.path.join(fixture_dir, endpoint), exist_ok=True)
+    with open(_path(fixture_dir, endpoint, key), "w") as file:
+        json.dump(payload, file, default=str)
+
+def frame_records(df: pd.DataFrame) -> list[dict]:
+    return json.loads(df.to_json(orient="records"))
+
+class InjectedAPIError(ConnectionError):
+    pass
+
+# --- stand-ins with the constructor / accessor shape the loaders use, every construction counts as one api call
+class FixtureAPI:
+    def __init__(self, fixture_dir: str = FIXTURE_DIR, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 0):
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls = {"PlayByPlay": 0, "LeagueGameFinder": 0, "TeamDetails": 0}
+        self.errors = dict.fromkeys(self.calls, 0)
+        self.missing = dict.fromkeys(self.calls, 0)
+
+    def _call(self, endpoint: str, key: str):
+        self.calls[endpoint] += 1
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+        if self.random.random() < self.error_rate:
+            self.errors[endpoint] += 1
+            raise InjectedAPIError(f"injected {endpoint} failure for {key}")
+        path = _path(self.fixture_dir, endpoint.lower(), key)
+        if not os.path.exists(path):
+            # an unrecorded request answers like an empty endpoint, the loaders already handle that
+            self.missing[endpoint] += 1
+            return None
+        with open(path, "r") as file:
+            return json.load(file)
+
+    def PlayByPlay(self, game_id: str):
+        actions = self._call("PlayByPlay", str(int(game_id))) or []
+        return SimpleNamespace(actions=SimpleNamespace(get_dict=lambda: actions))
+
+    def LeagueGameFinder(self, team_id_nullable=None, season_type_nullable: str = "Regular Season", **kwargs):
+        records = self._call("LeagueGameFinder", f"{team_id_nullable}_{_season_type_key(season_type_nullable)}") or []
+        return SimpleNamespace(get_data_frames=lambda: [pd.DataFrame(records)])
+
+    def TeamDetails(self, team_id):
+        frames = self._call("TeamDetails", str(team_id)) or []
+        return SimpleNamespace(get_data_frames=lambda: [pd.DataFrame(records) for records in frames])
+
+# --- swaps the endpoints the loader modules imported for the fixture stand-ins, and scales their rate limit sleeps
+# (sleep_scale=0 skips them, 1 keeps the live pacing)
+@contextmanager
+def patched_nba_api(api: FixtureAPI, sleep_scale: float = 0.0):
+    import loaders.loadGame as loadGame
+    import loaders.loadPBP as loadPBP
+    import loaders.loadTeam as loadTeam
+    scaled_sleep = lambda seconds: time.sleep(seconds * sleep_scale) if sleep_scale else None
+    patches = [
+        (loadPBP, "PlayByPlay", api.PlayByPlay),
+        (loadPBP, "sleep", scaled_sleep),
+        (loadGame, "leaguegamefinder", SimpleNamespace(LeagueGameFinder=api.LeagueGameFinder)),
+        (loadGame, "sleep", scaled_sleep),
+        (loadTeam, "TeamDetails", api.TeamDetails),
+        (loadTeam, "time", SimpleNamespace(sleep=scaled_sleep, perf_counter=time.perf_counter)),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+    try:
+        yield api
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+
+# --- records the live endpoints the current season loaders call: every team's details and game finder results, and the
+# play by play of up to max_games of those games
+def record_fixtures(fixture_dir: str, team_ids: list[int], season: str, max_games: int, pause: float = 1.0):
+    from nba_api.live.nba.endpoints import PlayByPlay
+    from nba_api.stats.endpoints import TeamDetails, leaguegamefinder
+    game_ids = []
+    for team_id in team_ids:
+        write_fixture(fixture_dir, "teamdetails", str(team_id), [frame_records(df) for df in TeamDetails(team_id=team_id).get_data_frames()])
+        time.sleep(pause)
+        for season_type in ("Regular Season", "Playoffs"):
+            games = leaguegamefinder.LeagueGameFinder(team_id_nullable=team_id, season_type_nullable=season_type,
+                                                      season_nullable=season).get_data_frames()[0]
+            write_fixture(fixture_dir, "leaguegamefinder", f"{team_id}_{_season_type_key(season_type)}", frame_records(games))
+            game_ids.extend(g for g in games["GAME_ID"].tolist() if g not in game_ids)
+            time.sleep(pause)
+    for game_id in game_ids[:max_games]:
+        write_fixture(fixture_dir, "playbyplay", str(int(game_id)), PlayByPlay(game_id=str(game_id).zfill(10)).actions.get_dict())
+        time.sleep(pause)
+    return len(game_ids[:max_games])
@@ -0,0 +1,172 @@
+# resumable, parallel historical backfill (replaces the serial initLoader pass for fresh environments)
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import psycopg
+from app.core.config import settings
+from loaders.loadPlayer import PlayerLoader
+from loaders.loadPBP import PBPDataLoader, PBP_ERA_SEASON_IDS
+from loaders.loadGame import GameLoader
+from loaders.loadTeam import TeamLoader
+from loaders.instrumentation import LoadMetrics
+from loaders.refreshRollups import refresh_rollups, ROLLUP_SOURCES
+
+JOB_NAME = "pbp_backfill"
+# --rebuild-derived re-derives the derived tables from stored events, checkpointed separately from the backfill
+REBUILD_JOB_NAME = "derived_rebuild"
+DEFAULT_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+if not logger.handlers:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    log_formatter = logging.Formatter("%(asctime)s [%(processName)s: %(process)d] [%(threadName)s: %(thread)d] [%(levelname)s] %(name)s: %(message)s")
+    stream_handler.setFormatter(log_formatter)
+    logger.addHandler(stream_handler)
+
+# --- checkpoint helpers, every shard (setup stages and seasons) gets one row in load_checkpoint
+def get_completed_shards(conn, job: str = JOB_NAME) -> set[str]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT shard FROM load_checkpoint WHERE job = %s AND status = 'done';", (job,))
+        return {row[0] for row in cur.fetchall()}
+
+def mark_shard_running(conn, shard: str, job: str = JOB_NAME):
+    with conn.transaction():
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO load_checkpoint (job, shard, status, started_at, updated_at) VALUES (%s, %s, 'running', now(), now()) "
+                "ON CONFLICT (job, shard) DO UPDATE SET status = 'running', error = NULL, started_at = now(), finished_at = NULL, updated_at = now();",
+                (job, shard)
+            )
+
+def mark_shard_finished(conn, shard: str, status: str, games: int | None = None, events: int | None = None,
+                        elapsed: float | None = None, error: str | None = None, job: str = JOB_NAME):
+    with conn.transaction():
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE load_checkpoint SET status = %s, games_loaded = %s, events_loaded = %s, elapsed_seconds = %s, error = %s, "
+                "finished_at = now(), updated_at = now() WHERE job = %s AND shard = %s;",
+                (status, games, events, elapsed, error, job, shard)
+            )
+
+def reset_checkpoints(conn, job: str = JOB_NAME):
+    with conn.transaction():
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM load_checkpoint WHERE job = %s;", (job,))
+
+# --- serial setup stages, pbp shards depend on teams, players and games being present
+def run_setup_stage(conn, shard: str, completed: set[str]):
+    if shard in completed:
+        logger.info(f"SKIPPING COMPLETED BACKFILL STAGE: {shard}")
+        return
+    mark_shard_running(conn, shard)
+    metrics = LoadMetrics(f"{JOB_NAME}:{shard}")
+    start = time.perf_counter()
+    try:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                if shard == "teams":
+                    loader = TeamLoader(conn, metrics=metrics)
+                    loader.load_historical_teams(cur)
+                    loader.load_modern_teams(cur)
+                elif shard == "players":
+                    PlayerLoader(conn, metrics=metrics).load_player_index(cur)
+                elif shard == "games":
+                    GameLoader(conn, update=False, whole_current_season=False, metrics=metrics).load_games()
+    except Exception as e:
+        mark_shard_finished(conn, shard, "failed", elapsed=time.perf_counter() - start, error=str(e))
+        metrics.finish(conn, "failed", error=str(e))
+        raise
+    mark_shard_finished(conn, shard, "done", elapsed=time.perf_counter() - start)
+    metrics.finish(conn, "succeeded")
+
+# --- runs in a worker process with its own connection, one season id per shard. rebuild_derived re-derives the
+# season's derived tables from its stored events instead of loading games that have none yet
+def run_season_shard(season_id: int, rebuild_derived: bool = False) -> dict:
+    shard = str(season_id)
+    job = REBUILD_JOB_NAME if rebuild_derived else JOB_NAME
+    with psycopg.connect(settings.DATABASE_URL_RW) as conn:
+        mark_shard_running(conn, shard, job=job)
+        metrics = LoadMetrics(f"{job}:{shard}")
+        start = time.perf_counter()
+        try:
+            data_loader = PBPDataLoader(conn, update=False, whole_current_season=False, season_ids=[season_id], skip_loaded=True, metrics=metrics)
+            counts = data_loader.rebuild_derived() if rebuild_derived else data_loader.load_pbp_data()
+        except Exception as e:
+            conn.rollback()
+            mark_shard_finished(conn, shard, "failed", elapsed=time.perf_counter() - start, error=str(e), job=job)
+            metrics.finish(conn, "failed", error=str(e))
+            raise
+        elapsed = time.perf_counter() - start
+        mark_shard_finished(conn, shard, "done", games=counts["games"], events=counts["events"], elapsed=elapsed, job=job)
+        metrics.finish(conn, "succeeded")
+    return {"season_id": season_id, "games": counts["games"], "events": counts["events"], "elapsed": elapsed}
+
+def report_shard(result: dict):
+    elapsed = max(result["elapsed"], 1e-9)
+    logger.info(f"SHARD {result['season_id']} DONE: {result['games']} GAMES, {result['events']} EVENTS IN {elapsed:.1f}s "
+                f"({result['games'] / elapsed:.2f} GAMES/S, {result['events'] / elapsed:.1f} EVENTS/S)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable, season-sharded historical backfill")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="number of season shards loaded in parallel")
+    parser.add_argument("--seasons", type=int, nargs="*", default=None, help="restrict the backfill to these season ids")
+    parser.add_argument("--restart", action="store_true", help="discard checkpoints and start from scratch")
+    parser.add_argument("--rebuild-derived", action="store_true",
+                        help="re-derive possessions, stints, box scores, shots and the other derived tables from the stored pbp events, "
+                             "no api calls (fills tables added after the events were loaded)")
+    args = parser.parse_args()
+    job = REBUILD_JOB_NAME if args.rebuild_derived else JOB_NAME
+
+    DB_URL = settings.DATABASE_URL_RW
+    with psycopg.connect(DB_URL) as conn:
+        if args.restart:
+            logger.info(f"DISCARDING {job.upper()} CHECKPOINTS")
+            reset_checkpoints(conn, job=job)
+        completed = get_completed_shards(conn, job=job)
+        # a rebuild only reads events that are already stored, so the setup stages have nothing to add
+        if not args.rebuild_derived:
+            for stage in ("teams", "players", "games"):
+                run_setup_stage(conn, stage, completed)
+
+    season_ids = args.seasons if args.seasons else PBP_ERA_SEASON_IDS
+    pending = [season_id for season_id in season_ids if str(season_id) not in completed]
+    logger.info(f"{'REBUILDING' if args.rebuild_derived else 'BACKFILLING'} {len(pending)} OF {len(season_ids)} SEASON SHARDS "
+                f"WITH {args.workers} WORKERS")
+
+    run_start = time.perf_counter()
+    failed = []
+    total_games = 0
+    total_events = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_season_shard, season_id, args.rebuild_derived): season_id for season_id in pending}
+        for future in as_completed(futures):
+            season_id = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"SHARD {season_id} FAILED, IT WILL RESUME ON THE NEXT RUN: {e}")
+                failed.append(season_id)
+                continue
+            total_games += result["games"]
+            total_events += result["events"]
+            report_shard(result)
+
+    elapsed = max(time.perf_counter() - run_start, 1e-9)
+    logger.info(f"{job.upper()} FINISHED IN {elapsed:.1f}s: {total_games} GAMES, {total_events} EVENTS "
+                f"({total_events / elapsed:.1f} EVENTS/S), {len(failed)} FAILED SHARDS")
+
+    # shard metrics live in the worker processes, so rollups are refreshed once here whenever any shard loaded games
+    if total_games:
+        metrics = LoadMetrics(f"{job}:rollups")
+        with psycopg.connect(DB_URL) as conn:
+            with metrics.stage("rollups"):
+                refresh_rollups(conn, metrics, list(ROLLUP_SOURCES))
+            metrics.finish(conn, "succeeded")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# pbp_event_actor: one narrow row per (event, player, role) so "everything player X did" is a single index range scan
+import pandas as pd
+from loaders.derived import DerivedTableBuilder
+
+# actor column on pbp_raw_event -> role stored in pbp_event_actor
+ACTOR_ROLES = {
+    "shooter_id": "shooter",
+    "assister_id": "assister",
+    "jump_ball_winner_id": "jump_ball_winner",
+    "jump_ball_loser_id": "jump_ball_loser",
+    "jump_ball_recovered_id": "jump_ball_recovered",
+    "rebounder_id": "rebounder",
+    "turnover_id": "turnover",
+    "foul_drawn_id": "foul_drawn",
+    "fouler_id": "fouler",
+    "stealer_id": "stealer",
+    "blocker_id": "blocker",
+    "sub_in_id": "sub_in",
+    "sub_out_id": "sub_out",
+}
+
+class EventActorBuilder(DerivedTableBuilder):
+    table = "pbp_event_actor"
+    columns = ["game_id", "event_num", "season_id", "player_id", "role"]
+    key_columns = ["game_id", "event_num", "role", "player_id"]
+    incremental = True
+
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        actors = events.melt(id_vars=["game_id", "event_num", "season_id"], value_vars=list(ACTOR_ROLES.keys()),
+                             var_name="role", value_name="player_id")
+        actors = actors.dropna(subset=["player_id"])
+        actors["player_id"] = actors["player_id"].astype("int64")
+        actors["role"] = actors["role"].map(ACTOR_ROLES)
+        return actors[self.columns]
@@ -0,0 +1,163 @@
+# player_game_box / team_game_box: per-game box scores counted from pbp once at load time, so per-game and
+# per-season averages read a handful of rows per game instead of re-aggregating every event of the season
+import logging
+import numpy as np
+import pandas as pd
+from loaders.derived import DerivedTableBuilder, ordered_events
+from loaders.buildStints import lineup_segments
+
+COUNTED_STATS = ["two_pointers_made", "two_pointers_attempted", "three_pointers_made", "three_pointers_attempted",
+                 "free_throws_made", "free_throws_attempted", "offensive_rebounds", "defensive_rebounds", "assists",
+                 "steals", "blocks", "turnovers", "personal_fouls"]
+BOX_STATS = ["pts", "field_goals_made", "field_goals_attempted", "two_pointers_made", "two_pointers_attempted",
+             "three_pointers_made", "three_pointers_attempted", "free_throws_made", "free_throws_attempted",
+             "offensive_rebounds", "defensive_rebounds", "total_rebounds", "assists", "steals", "blocks", "turnovers",
+             "personal_fouls", "plus_minus"]
+# columns compared with the official game_team_performance row
+RECONCILED_STATS = ["pts", "field_goals_made", "field_goals_attempted", "three_pointers_made", "three_pointers_attempted",
+                    "free_throws_made", "free_throws_attempted"]
+
+logger = logging.getLogger(__name__)
+
+# --- (stat, actor column, column holding the actor's team, event mask) for every counted stat
+def _stat_definitions(ev: pd.DataFrame) -> list[tuple]:
+    made = ev["shot_made"] == True
+    player_rebound = (ev["event_type"] == "rebound") & (ev["team_rebound"] != True)
+    return [
+        ("two_pointers_attempted", "shooter_id", "event_team_id", ev["event_type"] == "2pt"),
+        ("two_pointers_made", "shooter_id", "event_team_id", (ev["event_type"] == "2pt") & made),
+        ("three_pointers_attempted", "shooter_id", "event_team_id", ev["event_type"] == "3pt"),
+        ("three_pointers_made", "shooter_id", "event_team_id", (ev["event_type"] == "3pt") & made),
+        ("free_throws_attempted", "shooter_id", "event_team_id", ev["event_type"] == "freethrow"),
+        ("free_throws_made", "shooter_id", "event_team_id", (ev["event_type"] == "freethrow") & made),
+        ("assists", "assister_id", "event_team_id", ev["assister_id"].notna()),
+        ("offensive_rebounds", "rebounder_id", "event_team_id", player_rebound & (ev["offensive_rebound"] == True)),
+        ("defensive_rebounds", "rebounder_id", "event_team_id", player_rebound & (ev["offensive_rebound"] != True)),
+        ("steals", "stealer_id", "opponent_team_id", ev["stealer_id"].notna()),
+        ("blocks", "blocker_id", "opponent_team_id", ev["blocker_id"].notna()),
+        ("turnovers", "turnover_id", "event_team_id", ev["event_type"] == "turnover"),
+        ("personal_fouls", "fouler_id", "event_team_id", (ev["event_type"] == "foul") & (ev["foul_is_technical"] != True)),
+    ]
+
+def _box_events(events: pd.DataFrame) -> pd.DataFrame:
+    ev = ordered_events(events)
+    ev["opponent_team_id"] = np.where(ev["event_team_id"] == ev["home_team_id"], ev["away_team_id"], ev["home_team_id"])
+    ev.loc[ev["event_team_id"].isna(), "opponent_team_id"] = np.nan
+    return ev
+
+# --- actions the feed left without a team go to the team the player has elsewhere in the game (other actions, or the
+# lineup replay), the few that still can't be placed are dropped and logged
+def _fill_player_teams(long: pd.DataFrame, ev: pd.DataFrame, player_teams: pd.Series | None) -> pd.DataFrame:
+    missing = long["team_id"].isna()
+    if not missing.any():
+        return long
+    known = long[~missing].groupby("player_id")["team_id"].first()
+    if player_teams is not None:
+        known = known.combine_first(player_teams)
+    long.loc[missing, "team_id"] = long.loc[missing, "player_id"].map(known)
+    unresolved = long["team_id"].isna()
+    if unresolved.any():
+        logger.warning(f"DROPPING {int(unresolved.sum())} PLAYER BOX SCORE ACTIONS WITH NO TEAM FOR GAME {ev.iloc[0]['game_id']}")
+    return long[~unresolved]
+
+# --- one count per (keys, stat); with by_player the stat needs a known actor, otherwise team events (team turnovers) count too
+def _count_stats(ev: pd.DataFrame, by_player: bool, player_teams: pd.Series | None = None) -> pd.DataFrame:
+    counts = []
+    for stat, actor, team, mask in _stat_definitions(ev):
+        if by_player:
+            rows = ev.loc[mask & ev[actor].notna(), [actor, team]].set_axis(["player_id", "team_id"], axis=1)
+        else:
+            rows = ev.loc[mask & ev[team].notna(), [team]].set_axis(["team_id"], axis=1)
+        counts.append(rows.assign(stat=stat))
+    keys = ["player_id", "team_id"] if by_player else ["team_id"]
+    long = pd.concat(counts, ignore_index=True)
+    if by_player:
+        long = _fill_player_teams(long, ev, player_teams)
+    if long.empty:
+        return pd.DataFrame(columns=keys + COUNTED_STATS)
+    box = long.groupby(keys + ["stat"]).size().unstack("stat", fill_value=0)
+    return box.reindex(columns=COUNTED_STATS, fill_value=0).reset_index()
+
+def _add_totals(box: pd.DataFrame) -> pd.DataFrame:
+    box["field_goals_made"] = box["two_pointers_made"] + box["three_pointers_made"]
+    box["field_goals_attempted"] = box["two_pointers_attempted"] + box["three_pointers_attempted"]
+    box["total_rebounds"] = box["offensive_rebounds"] + box["defensive_rebounds"]
+    box["pts"] = 2 * box["two_pointers_made"] + 3 * box["three_pointers_made"] + box["free_throws_made"]
+    return box
+
+def _with_game_columns(box: pd.DataFrame, ev: pd.DataFrame) -> pd.DataFrame:
+    game = ev.iloc[0]
+    box["game_id"] = int(game["game_id"])
+    box["season_id"] = int(game["season_id"])
+    box["team_id"] = box["team_id"].astype("int64")
+    box["is_home"] = box["team_id"] == game["home_team_id"]
+    box["opponent_team_id"] = np.where(box["is_home"], game["away_team_id"], game["home_team_id"]).astype("int64")
+    return box
+
+class PlayerBoxScoreBuilder(DerivedTableBuilder):
+    table = "player_game_box"
+    columns = ["game_id", "season_id", "player_id", "team_id", "opponent_team_id", "is_home", "seconds_played"] + BOX_STATS
+    key_columns = ["game_id", "player_id"]
+
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        ev = _box_events(events)
+        if ev.empty:
+            return pd.DataFrame(columns=self.columns)
+        # minutes and plus-minus come from the substitution replay, players who only checked in still get a row
+        segments = lineup_segments(events)
+        on_court = pd.DataFrame(segments).explode("player_ids").rename(columns={"player_ids": "player_id"}) if segments else None
+        player_teams = on_court.groupby("player_id")["team_id"].first() if on_court is not None else None
+        box = _add_totals(_count_stats(ev, by_player=True, player_teams=player_teams))
+        if on_court is not None:
+            on_court["seconds"] = (on_court["start_seconds"] - on_court["end_seconds"]).fillna(0).clip(lower=0)
+            on_court["plus_minus"] = on_court["points_for"] - on_court["points_against"]
+            court = on_court.groupby(["player_id", "team_id"]).agg(seconds_played=("seconds", "sum"), plus_minus=("plus_minus", "sum")).reset_index()
+            court["player_id"] = court["player_id"].astype("int64")
+            box["player_id"] = box["player_id"].astype("int64")
+            box["team_id"] = box["team_id"].astype("int64")
+            box = box.merge(court, on=["player_id", "team_id"], how="outer")
+        else:
+            box["seconds_played"] = 0
+            box["plus_minus"] = 0
+        if box.empty:
+            return pd.DataFrame(columns=self.columns)
+        stat_columns = [c for c in BOX_STATS if c != "plus_minus"] + ["seconds_played", "plus_minus"]
+        box[stat_columns] = box[stat_columns].fillna(0)
+        box["seconds_played"] = box["seconds_played"].round()
+        box[stat_columns] = box[stat_columns].astype("int64")
+        box["player_id"] = box["player_id"].astype("int64")
+        return _with_game_columns(box, ev)[self.columns]
+
+class TeamBoxScoreBuilder(DerivedTableBuilder):
+    table = "team_game_box"
+    columns = ["game_id", "season_id", "team_id", "opponent_team_id", "is_home"] + BOX_STATS
+    key_columns = ["game_id", "team_id"]
+
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        ev = _box_events(events)
+        if ev.empty:
+            return pd.DataFrame(columns=self.columns)
+        # counted straight from the events rather than summed from player rows, so team turnovers and actions of
+        # players missing from the player index still count
+        box = _add_totals(_count_stats(ev, by_player=False))
+        box = box[box["team_id"].isin([ev.iloc[0]["home_team_id"], ev.iloc[0]["away_team_id"]])].copy()
+        if box.empty:
+            return pd.DataFrame(columns=self.columns)
+        # from the running score rather than the two rows' points, so it holds when only one team has counted actions
+        final = ev.iloc[-1]
+        margin = int(final["home_score"]) - int(final["away_score"])
+        box["plus_minus"] = np.where(box["team_id"] == final["home_team_id"], margin, -margin)
+        return _with_game_columns(box, ev)[self.columns]
+
+    # --- flags whether the pbp-derived totals agree with the official box score loaded from the game finder, rows
+    # whose flag is already right are left alone so reloads don't rewrite them
+    def after_write(self, cur, game_id: int):
+        derived = ", ".join(f"t.{c}" for c in RECONCILED_STATS)
+        official = ", ".join(f"g.{c}" for c in RECONCILED_STATS)
+        matches = f"({derived}) IS NOT DISTINCT FROM ({official})"
+        cur.execute(
+            f"UPDATE team_game_box t SET matches_official = {matches} "
+            "FROM game_team_performance g WHERE g.game_id = t.game_id AND g.team_id = t.team_id AND t.game_id = %s "
+            f"AND t.matches_official IS DISTINCT FROM ({matches});",
+            (int(game_id),)
+        )
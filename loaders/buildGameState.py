@@ -0,0 +1,33 @@
+# game_state: score situation at every event, so clutch / late-game / margin questions are range scans instead of
+# interval arithmetic and window functions over pbp_raw_event
+import numpy as np
+import pandas as pd
+from loaders.derived import DerivedTableBuilder, ordered_events, REGULATION_PERIODS, REGULATION_PERIOD_SECONDS
+
+# the league's clutch definition: last five minutes of the fourth quarter or overtime, margin of five or less
+CLUTCH_SECONDS = 300
+CLUTCH_MARGIN = 5
+
+class GameStateBuilder(DerivedTableBuilder):
+    table = "game_state"
+    columns = ["game_id", "event_num", "season_id", "period", "clock_seconds", "game_seconds_elapsed",
+               "seconds_remaining", "home_score", "away_score", "margin", "is_clutch"]
+    key_columns = ["game_id", "event_num"]
+    # each event carries its own score, so live polls can append just the new actions
+    incremental = True
+
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        ev = ordered_events(events)
+        ev = ev[ev["clock_seconds"].notna()].copy()
+        if ev.empty:
+            return pd.DataFrame(columns=self.columns)
+        ev["game_seconds_elapsed"] = pd.to_numeric(ev["game_seconds_elapsed"], errors="coerce")
+        # seconds left in regulation, or in the current overtime once regulation is over
+        ev["seconds_remaining"] = np.where(
+            ev["period"] <= REGULATION_PERIODS,
+            (REGULATION_PERIODS - ev["period"]) * REGULATION_PERIOD_SECONDS + ev["clock_seconds"],
+            ev["clock_seconds"],
+        )
+        ev["margin"] = ev["home_score"] - ev["away_score"]
+        ev["is_clutch"] = (ev["period"] >= REGULATION_PERIODS) & (ev["clock_seconds"] <= CLUTCH_SECONDS) & (ev["margin"].abs() <= CLUTCH_MARGIN)
+        return ev[self.columns]
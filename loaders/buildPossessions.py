@@ -0,0 +1,88 @@
+# possessions: one row per offensive possession, cut in a single vectorized pass over a game's ordered events
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from loaders.derived import DerivedTableBuilder, ordered_events
+
+LAST_FREE_THROWS = ["1 of 1", "2 of 2", "3 of 3"]
+
+class PossessionBuilder(DerivedTableBuilder):
+    table = "possessions"
+    columns = ["game_id", "season_id", "possession_num", "period", "offense_team_id", "defense_team_id",
+               "start_event_num", "end_event_num", "start_clock", "end_clock", "points", "result"]
+    key_columns = ["game_id", "possession_num"]
+
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        ev = ordered_events(events)
+        if ev.empty:
+            return pd.DataFrame(columns=self.columns)
+
+        is_fg = ev["event_type"].isin(["2pt", "3pt"])
+        made_fg = is_fg & (ev["shot_made"] == True)
+        made_last_ft = (ev["event_type"] == "freethrow") & ev["event_subtype"].isin(LAST_FREE_THROWS) & (ev["shot_made"] == True)
+        defensive_rebound = (ev["event_type"] == "rebound") & (ev["offensive_rebound"] != True)
+        turnover = ev["event_type"] == "turnover"
+        period_end = (ev["event_type"] == "period") & (ev["event_subtype"] == "end")
+
+        # an and-one free throw (1 of 1 by the shooting team at the same clock) keeps the made shot's possession alive
+        and_one_keys = ev.loc[(ev["event_type"] == "freethrow") & (ev["event_subtype"] == "1 of 1"), ["period", "clock_seconds", "event_team_id"]]
+        and_one_keys = set(map(tuple, and_one_keys.itertuples(index=False, name=None)))
+        has_and_one = pd.Series([key in and_one_keys for key in zip(ev["period"], ev["clock_seconds"], ev["event_team_id"])], index=ev.index)
+        ends = (made_fg & ~has_and_one) | made_last_ft | defensive_rebound | turnover | period_end
+
+        # possession_team_id flips catch what the explicit rules miss (violations, jump balls, ...). the feed flips it on
+        # the event that ends a possession, so a flip ends the possession there and the next event starts a new one. a
+        # made shot flips even when an and-one free throw follows, those are left to the explicit rules
+        team = ev["possession_team_id"].ffill()
+        period_change = ev["period"].ne(ev["period"].shift())
+        # a period starting with the other team's ball isn't a flip, the period change already starts a possession
+        team_change = team.ne(team.shift()) & team.notna() & team.shift().notna() & ~period_change
+        possession_ends = ends | (team_change & ~made_fg)
+        starts = possession_ends.shift(fill_value=False) | period_change
+        ev["possession_num"] = starts.cumsum()
+        # for the same reason the offense isn't the start event's possession_team_id, a possession that's over in one event
+        # (a turnover or a quick make) already carries the defense's id there. it's the team the previous event handed
+        # the ball to, except at a period start, where that event says who has the ball
+        ev["offense_team_id"] = team.shift().where(~period_change, team).fillna(team)
+
+        grouped = ev.groupby("possession_num", sort=True)
+        possessions = grouped.agg(
+            game_id=("game_id", "first"),
+            season_id=("season_id", "first"),
+            period=("period", "first"),
+            offense_team_id=("offense_team_id", "first"),
+            start_event_num=("event_num", "first"),
+            end_event_num=("event_num", "last"),
+            start_clock=("clock_seconds", "first"),
+            end_clock=("clock_seconds", "last"),
+            home_team_id=("home_team_id", "first"),
+            away_team_id=("away_team_id", "first"),
+            home_score=("home_score", "last"),
+            away_score=("away_score", "last"),
+        ).reset_index()
+        last = ev.loc[grouped["event_num"].idxmax()].set_index("possession_num")
+        possessions = possessions[possessions["offense_team_id"].notna()].copy()
+        if possessions.empty:
+            return pd.DataFrame(columns=self.columns)
+
+        # points scored by the offense = its score change since the end of the previous possession
+        offense_is_home = possessions["offense_team_id"] == possessions["home_team_id"]
+        prev_home = possessions["home_score"].shift(fill_value=0)
+        prev_away = possessions["away_score"].shift(fill_value=0)
+        possessions["points"] = np.where(offense_is_home, possessions["home_score"] - prev_home, possessions["away_score"] - prev_away)
+        possessions["defense_team_id"] = np.where(offense_is_home, possessions["away_team_id"], possessions["home_team_id"])
+
+        reasons = pd.Series("other", index=last.index)
+        reasons[(last["event_type"] == "period") & (last["event_subtype"] == "end")] = "end_of_period"
+        reasons[last["event_type"] == "turnover"] = "turnover"
+        reasons[last["event_type"] == "rebound"] = "missed_shot"
+        reasons[last["event_type"] == "freethrow"] = "free_throws"
+        reasons[last["event_type"].isin(["2pt", "3pt"]) & (last["shot_made"] == True)] = "made_shot"
+        possessions["result"] = possessions["possession_num"].map(reasons)
+
+        # renumber so possession_num is dense within the game after dropping team-less groups
+        possessions["possession_num"] = np.arange(1, len(possessions) + 1)
+        possessions["start_clock"] = possessions["start_clock"].map(lambda s: timedelta(seconds=s) if pd.notna(s) else None)
+        possessions["end_clock"] = possessions["end_clock"].map(lambda s: timedelta(seconds=s) if pd.notna(s) else None)
+        possessions["offense_team_id"] = possessions["offense_team_id"].astype("int64")
+        return possessions[self.columns]
@@ -0,0 +1,69 @@
+# shots: one row per field goal attempt with court coordinates normalized to the attacking basket, a canonical zone and
+# a grid bin, so spatial / shot chart questions read an indexed narrow table instead of every wide event row
+import numpy as np
+import pandas as pd
+from loaders.derived import DerivedTableBuilder
+
+# court geometry in feet, the live feed reports x / y as percentages of the court's length / width
+COURT_LENGTH = 94.0
+COURT_WIDTH = 50.0
+BASKET_FROM_BASELINE = 5.25
+CORNER_THREE_LATERAL = 22.0
+CORNER_THREE_MAX_DEPTH = 14.0 - BASKET_FROM_BASELINE # the corner three line runs 14ft out from the baseline
+RESTRICTED_AREA_RADIUS = 4.0
+PAINT_HALF_WIDTH = 8.0
+PAINT_MAX_DEPTH = 19.0 - BASKET_FROM_BASELINE
+HALF_COURT_DEPTH = COURT_LENGTH / 2 - BASKET_FROM_BASELINE
+BIN_FEET = 3.0
+BIN_COLUMNS = int(np.ceil(COURT_WIDTH / BIN_FEET))
+
+class ShotBuilder(DerivedTableBuilder):
+    table = "shots"
+    columns = ["game_id", "event_num", "season_id", "shooter_id", "team_id", "period", "clock_seconds", "shot_value",
+               "shot_made", "shot_distance", "area", "area_detail", "descriptor", "x", "y", "zone", "bin"]
+    key_columns = ["game_id", "event_num"]
+    # one row per shot event, live polls can append just the new actions
+    incremental = True
+
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        shots = events[events["event_type"].isin(["2pt", "3pt"]) & events["shooter_id"].notna()].copy()
+        if shots.empty:
+            return pd.DataFrame(columns=self.columns)
+        shots["team_id"] = shots["event_team_id"]
+        raw_x = pd.to_numeric(shots["shot_x"], errors="coerce")
+        raw_y = pd.to_numeric(shots["shot_y"], errors="coerce")
+        right = shots["side"] == "right"
+        # without a side there's no telling which basket was attacked, so x / y / bin stay NULL and the zone is the feed's
+        known_side = right | (shots["side"] == "left")
+
+        # x = feet left (-) / right (+) of the basket seen from half court, y = feet out from the basket
+        lateral = raw_y / 100 * COURT_WIDTH - COURT_WIDTH / 2
+        from_baseline = raw_x / 100 * COURT_LENGTH
+        shots["x"] = pd.Series(np.where(right, -lateral, lateral), index=shots.index).where(known_side)
+        shots["y"] = pd.Series(np.where(right, COURT_LENGTH - from_baseline, from_baseline) - BASKET_FROM_BASELINE, index=shots.index).where(known_side)
+        shots["zone"] = self.classify_zones(shots)
+
+        bin_x = np.floor((shots["x"] + COURT_WIDTH / 2) / BIN_FEET).clip(0, BIN_COLUMNS - 1)
+        bin_y = np.floor((shots["y"] + BASKET_FROM_BASELINE) / BIN_FEET).clip(lower=0)
+        shots["bin"] = bin_y * BIN_COLUMNS + bin_x
+        # event frames hold None in integer columns, so they arrive as floats
+        shots["shooter_id"] = shots["shooter_id"].astype("int64")
+        shots[["team_id", "shot_value", "bin"]] = shots[["team_id", "shot_value", "bin"]].astype("Int64")
+        return shots[self.columns]
+
+    # --- canonical zones (same labels as pbp_raw_event.area), falling back to the feed's area when coordinates are missing
+    def classify_zones(self, shots: pd.DataFrame) -> pd.Series:
+        x, y = shots["x"], shots["y"]
+        distance = np.sqrt(x ** 2 + y ** 2)
+        three = shots["shot_value"] == 3
+        conditions = [
+            x.isna() | y.isna(),
+            three & (y > HALF_COURT_DEPTH),
+            three & (y <= CORNER_THREE_MAX_DEPTH) & (x <= -CORNER_THREE_LATERAL),
+            three & (y <= CORNER_THREE_MAX_DEPTH) & (x >= CORNER_THREE_LATERAL),
+            three,
+            distance <= RESTRICTED_AREA_RADIUS,
+            (x.abs() <= PAINT_HALF_WIDTH) & (y <= PAINT_MAX_DEPTH),
+        ]
+        choices = [shots["area"], "Backcourt", "Left Corner 3", "Right Corner 3", "Above the Break 3", "Restricted Area", "In The Paint (Non-RA)"]
+        return pd.Series(np.select(conditions, choices, default="Mid-Range"), index=shots.index).where(lambda z: z.notna(), None)
@@ -0,0 +1,121 @@
+# player_stints / lineup_stints: replays a game's substitutions once so on-court, on/off and lineup questions become
+# indexed lookups instead of sub_in_id / sub_out_id replays in sql
+import hashlib
+from datetime import timedelta
+import pandas as pd
+from loaders.derived import DerivedTableBuilder, ordered_events
+
+# actor columns credited to the event team / to its opponent, used to spot who was on court before their first substitution
+OWN_TEAM_ACTORS = ["shooter_id", "assister_id", "rebounder_id", "turnover_id", "fouler_id"]
+OPPONENT_ACTORS = ["stealer_id", "blocker_id", "foul_drawn_id"]
+
+def lineup_hash(player_ids) -> str:
+    return hashlib.md5("-".join(str(p) for p in sorted(player_ids)).encode()).hexdigest()
+
+def _seconds_to_interval(seconds):
+    return timedelta(seconds=float(seconds)) if pd.notna(seconds) else None
+
+# --- players on court at the start of a period: anyone who acts or is subbed out before they are subbed in
+def period_starters(period_events: pd.DataFrame, team_id) -> list[int]:
+    live = period_events[period_events["foul_is_technical"] != True]
+    own = live[live["event_team_id"] == team_id]
+    opponent = live[live["event_team_id"].notna() & (live["event_team_id"] != team_id)]
+    appearances = pd.concat(
+        [own.melt(id_vars=["event_num"], value_vars=OWN_TEAM_ACTORS + ["sub_out_id"], value_name="player_id"),
+         opponent.melt(id_vars=["event_num"], value_vars=OPPONENT_ACTORS, value_name="player_id")]
+    ).dropna(subset=["player_id"])
+    first_seen = appearances.groupby("player_id")["event_num"].min()
+    subbed_in = own.dropna(subset=["sub_in_id"]).groupby("sub_in_id")["event_num"].min()
+    # a player counts as a starter when they show up before (or without) ever being subbed in this period
+    subbed_in = subbed_in.reindex(first_seen.index)
+    starters = first_seen[subbed_in.isna() | (first_seen < subbed_in)]
+    return [int(p) for p in starters.sort_values().index[:5]]
+
+# --- one segment per (team, period, stretch with an unchanged lineup); substitutions at the same clock are applied together
+# so dead-ball swaps don't produce zero-second four or six man lineups
+def lineup_segments(events: pd.DataFrame) -> list[dict]:
+    ev = ordered_events(events)
+    if ev.empty:
+        return []
+    game = ev.iloc[0]
+    segments = []
+    for period, pev in ev.groupby("period", sort=True):
+        pev = pev.reset_index(drop=True)
+        last = pev.iloc[-1]
+        for team_id, opponent_id in ((game["home_team_id"], game["away_team_id"]), (game["away_team_id"], game["home_team_id"])):
+            score_column, opponent_score_column = ("home_score", "away_score") if team_id == game["home_team_id"] else ("away_score", "home_score")
+            on_court = set(period_starters(pev, team_id))
+            subs = pev[(pev["event_type"] == "substitution") & (pev["event_team_id"] == team_id)]
+            start = pev.iloc[0]
+            for _, changes in subs.groupby("clock_seconds", sort=False):
+                boundary = changes.iloc[0]
+                segments.append(_segment(game, team_id, opponent_id, period, on_court, start, boundary, score_column, opponent_score_column))
+                on_court -= set(changes["sub_out_id"].dropna().astype("int64"))
+                on_court |= set(changes["sub_in_id"].dropna().astype("int64"))
+                start = boundary
+            segments.append(_segment(game, team_id, opponent_id, period, on_court, start, last, score_column, opponent_score_column))
+    return [s for s in segments if s["player_ids"]]
+
+def _segment(game, team_id, opponent_id, period, on_court, start, end, score_column, opponent_score_column) -> dict:
+    return {
+        "game_id": int(game["game_id"]),
+        "season_id": int(game["season_id"]),
+        "team_id": int(team_id),
+        "opponent_team_id": int(opponent_id),
+        "period": int(period),
+        "player_ids": sorted(int(p) for p in on_court),
+        "start_event_num": int(start["event_num"]),
+        "end_event_num": int(end["event_num"]),
+        "start_seconds": start["clock_seconds"],
+        "end_seconds": end["clock_seconds"],
+        "points_for": int(end[score_column] - start[score_column]),
+        "points_against": int(end[opponent_score_column] - start[opponent_score_column]),
+    }
+
+def _finish_stints(stints: pd.DataFrame, group_columns: list[str]) -> pd.DataFrame:
+    stints["seconds_played"] = (stints["start_seconds"] - stints["end_seconds"]).fillna(0).clip(lower=0).round().astype("int64")
+    stints["start_clock"] = stints["start_seconds"].map(_seconds_to_interval)
+    stints["end_clock"] = stints["end_seconds"].map(_seconds_to_interval)
+    stints["stint_num"] = stints.groupby(group_columns).cumcount() + 1
+    return stints
+
+class LineupStintBuilder(DerivedTableBuilder):
+    table = "lineup_stints"
+    columns = ["game_id", "season_id", "team_id", "opponent_team_id", "stint_num", "lineup_hash", "player_ids", "period",
+               "start_event_num", "end_event_num", "start_clock", "end_clock", "seconds_played", "points_for", "points_against"]
+    key_columns = ["game_id", "team_id", "stint_num"]
+
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        # only complete five man lineups are written, a period whose starters couldn't all be inferred is left out
+        segments = [s for s in lineup_segments(events) if len(s["player_ids"]) == 5]
+        if not segments:
+            return pd.DataFrame(columns=self.columns)
+        stints = pd.DataFrame(segments)
+        stints["lineup_hash"] = stints["player_ids"].map(lineup_hash)
+        return _finish_stints(stints, ["game_id", "team_id"])[self.columns]
+
+class PlayerStintBuilder(DerivedTableBuilder):
+    table = "player_stints"
+    columns = ["game_id", "season_id", "player_id", "team_id", "stint_num", "period", "start_event_num", "end_event_num",
+               "start_clock", "end_clock", "seconds_played", "points_for", "points_against"]
+    key_columns = ["game_id", "player_id", "stint_num"]
+
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        segments = lineup_segments(events)
+        if not segments:
+            return pd.DataFrame(columns=self.columns)
+        on_court = pd.DataFrame(segments).reset_index(names="segment").explode("player_ids").rename(columns={"player_ids": "player_id"})
+        on_court["player_id"] = on_court["player_id"].astype("int64")
+        on_court = on_court.sort_values(["player_id", "segment"])
+        # consecutive segments of the same team and period form one stint for the player
+        segment_rank = on_court.groupby(["team_id", "period"])["segment"].rank(method="dense")
+        on_court["run"] = (segment_rank - on_court.groupby(["player_id", "team_id", "period"]).cumcount()).astype("int64")
+        stints = on_court.groupby(["game_id", "season_id", "player_id", "team_id", "period", "run"], sort=False).agg(
+            start_event_num=("start_event_num", "first"),
+            end_event_num=("end_event_num", "last"),
+            start_seconds=("start_seconds", "first"),
+            end_seconds=("end_seconds", "last"),
+            points_for=("points_for", "sum"),
+            points_against=("points_against", "sum"),
+        ).reset_index().sort_values(["player_id", "period", "start_event_num"])
+        return _finish_stints(stints, ["game_id", "player_id"])[self.columns]
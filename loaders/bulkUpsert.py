@@ -0,0 +1,97 @@
+# shared bulk write path for the loaders: COPY a batch into a session-local staging table, then apply it
+# with one INSERT ... ON CONFLICT DO UPDATE that only rewrites rows whose values actually changed
+from dataclasses import dataclass
+import math
+import psycopg
+from psycopg import sql
+
+@dataclass
+class UpsertResult:
+    table: str
+    staged: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+# --- numpy / pandas scalars and NaN come back from the nba_api dataframes, normalize them before COPY
+def _to_python(value):
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def _staging_name(table: str) -> str:
+    return f"_stage_{table}"
+
+# --- stage rows for a table, staging tables live for the session and are emptied on commit
+def stage_rows(cur, table: str, columns: list[str], rows) -> int:
+    stage = _staging_name(table)
+    cur.execute(sql.SQL("CREATE TEMP TABLE IF NOT EXISTS {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;").format(
+        sql.Identifier(stage), sql.Identifier(table)))
+    cur.execute(sql.SQL("TRUNCATE {};").format(sql.Identifier(stage)))
+    staged = 0
+    with cur.copy(sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(stage), sql.SQL(", ").join(map(sql.Identifier, columns)))) as copy:
+        for row in rows:
+            copy.write_row([_to_python(v) for v in row])
+            staged += 1
+    return staged
+
+def _upsert_statement(table: str, columns: list[str], key_columns: list[str], update_columns: list[str] | None):
+    stage = _staging_name(table)
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in key_columns]
+    cols = sql.SQL(", ").join(map(sql.Identifier, columns))
+    keys = sql.SQL(", ").join(map(sql.Identifier, key_columns))
+    # DISTINCT ON keeps one row per key so a batch with duplicates can't hit the same target row twice
+    select = sql.SQL("SELECT DISTINCT ON ({keys}) {cols} FROM {stage}").format(keys=keys, cols=cols, stage=sql.Identifier(stage))
+    if update_columns:
+        conflict = sql.SQL("DO UPDATE SET {assign} WHERE ({current}) IS DISTINCT FROM ({incoming})").format(
+            assign=sql.SQL(", ").join(sql.SQL("{c} = EXCLUDED.{c}").format(c=sql.Identifier(c)) for c in update_columns),
+            current=sql.SQL(", ").join(sql.SQL("{t}.{c}").format(t=sql.Identifier(table), c=sql.Identifier(c)) for c in update_columns),
+            incoming=sql.SQL(", ").join(sql.SQL("EXCLUDED.{c}").format(c=sql.Identifier(c)) for c in update_columns),
+        )
+    else:
+        conflict = sql.SQL("DO NOTHING")
+    return sql.SQL(
+        "WITH upserted AS ("
+        "INSERT INTO {table} ({cols}) {select} ON CONFLICT ({keys}) {conflict} RETURNING (xmax = 0) AS inserted"
+        ") SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted;"
+    ).format(table=sql.Identifier(table), cols=cols, select=select, keys=keys, conflict=conflict)
+
+# --- stage + upsert a batch of rows, returns how many rows were inserted vs. changed in place
+def bulk_upsert(cur, table: str, columns: list[str], key_columns: list[str], rows,
+                update_columns: list[str] | None = None) -> UpsertResult:
+    result = UpsertResult(table=table)
+    result.staged = stage_rows(cur, table, columns, rows)
+    if not result.staged:
+        return result
+    cur.execute(_upsert_statement(table, columns, key_columns, update_columns))
+    result.inserted, result.updated = cur.fetchone()
+    return result
+
+# --- replaces the rows of one scope (e.g. a single game) with the staged batch: rows missing from the batch are deleted,
+# changed rows are updated and new rows inserted. run it inside the caller's transaction so readers never see a partial scope
+def merge_rows(cur, table: str, columns: list[str], key_columns: list[str], scope: dict, rows,
+               update_columns: list[str] | None = None) -> UpsertResult:
+    result = UpsertResult(table=table)
+    result.staged = stage_rows(cur, table, columns, rows)
+    stage = _staging_name(table)
+    scope_filter = sql.SQL(" AND ").join(
+        sql.SQL("{t}.{c} = {v}").format(t=sql.Identifier(table), c=sql.Identifier(c), v=sql.Literal(v)) for c, v in scope.items())
+    key_match = sql.SQL(" AND ").join(
+        sql.SQL("s.{c} = {t}.{c}").format(t=sql.Identifier(table), c=sql.Identifier(c)) for c in key_columns)
+    cur.execute(sql.SQL("DELETE FROM {table} WHERE {scope} AND NOT EXISTS (SELECT 1 FROM {stage} s WHERE {match});").format(
+        table=sql.Identifier(table), scope=scope_filter, stage=sql.Identifier(stage), match=key_match))
+    result.deleted = cur.rowcount
+    if result.staged:
+        cur.execute(_upsert_statement(table, columns, key_columns, update_columns))
+        result.inserted, result.updated = cur.fetchone()
+    return result
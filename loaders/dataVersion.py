@@ -0,0 +1,19 @@
+# data_version: one monotonically increasing version per season, bumped in the same transaction as the writes it covers.
+# the NOTIFY is only delivered once that transaction commits, so the api never sees a version before its data
+import json
+
+CHANNEL = "data_version"
+# rows for objects spanning every season (the rollups) are versioned under this pseudo season
+ALL_SEASONS = 0
+
+def bump_data_version(cur, season_ids) -> dict[int, int]:
+    versions = {}
+    for season_id in sorted({int(s) for s in season_ids}):
+        cur.execute(
+            "INSERT INTO data_version (season_id, version, updated_at) VALUES (%s, nextval('data_version_seq'), now()) "
+            "ON CONFLICT (season_id) DO UPDATE SET version = EXCLUDED.version, updated_at = EXCLUDED.updated_at RETURNING version;",
+            (season_id,)
+        )
+        versions[season_id] = cur.fetchone()[0]
+        cur.execute("SELECT pg_notify(%s, %s);", (CHANNEL, json.dumps({"season_id": season_id, "version": versions[season_id]})))
+    return versions
@@ -0,0 +1,53 @@
+# derived tables rebuilt from a game's pbp events inside the same transaction that merges the events, so they
+# never disagree with pbp_raw_event. each builder turns the game's event frame (PBP_COLUMNS) into its own rows
+from abc import ABC, abstractmethod
+import pandas as pd
+from loaders.bulkUpsert import bulk_upsert, merge_rows, UpsertResult
+
+REGULATION_PERIODS = 4
+REGULATION_PERIOD_SECONDS = 720
+OVERTIME_PERIOD_SECONDS = 300
+
+class DerivedTableBuilder(ABC):
+    table: str = ""
+    columns: list[str] = []
+    key_columns: list[str] = []
+    # incremental builders only need the events themselves, so the live loader can feed them just the new actions
+    incremental: bool = False
+
+    @abstractmethod
+    def build(self, events: pd.DataFrame) -> pd.DataFrame:
+        ...
+
+    # runs in the same transaction right after the builder's rows are written, for checks against other tables
+    def after_write(self, cur, game_id: int):
+        pass
+
+# --- NaN / NA / numpy scalars become plain python values (or None) before they hit COPY
+def frame_rows(df: pd.DataFrame, columns: list[str]) -> list[tuple]:
+    if df.empty:
+        return []
+    df = df[columns].astype(object)
+    df = df.where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+def write_derived(cur, builder: DerivedTableBuilder, game_id: int, events: pd.DataFrame, metrics, append: bool = False) -> UpsertResult:
+    with metrics.transform():
+        rows = frame_rows(builder.build(events), builder.columns)
+    if append:
+        # live polls only add events, so their derived rows are upserted without deleting the rest of the game
+        result = metrics.timed_write(lambda: bulk_upsert(cur, builder.table, builder.columns, builder.key_columns, rows))
+    else:
+        result = metrics.timed_write(lambda: merge_rows(cur, builder.table, builder.columns, builder.key_columns, {"game_id": game_id}, rows))
+    builder.after_write(cur, game_id)
+    return result
+
+# --- events in feed order with numeric scores carried forward, the starting point for the sequential builders
+def ordered_events(events: pd.DataFrame) -> pd.DataFrame:
+    ev = events.sort_values("event_num").reset_index(drop=True)
+    ev = ev[ev["event_type"] != "game"].reset_index(drop=True)
+    ev["home_score"] = pd.to_numeric(ev["home_score"], errors="coerce").ffill().fillna(0).astype("int64")
+    ev["away_score"] = pd.to_numeric(ev["away_score"], errors="coerce").ffill().fillna(0).astype("int64")
+    ev["period"] = pd.to_numeric(ev["period"], errors="coerce").astype("int64")
+    ev["clock_seconds"] = pd.to_numeric(ev["clock_seconds"], errors="coerce")
+    return ev
@@ -0,0 +1,162 @@
+# post-load stage for the optional duckdb analytics backend: exports pbp_raw_event, the reference tables, the derived
+# tables and the rollups to a parquet snapshot (sorted, zstd compressed) that the api queries in-process.
+# only runs with ANALYTICS_BACKEND=duckdb, needs the duckdb package on the loader host
+#   python -m loaders.exportSnapshot
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+import psycopg
+from psycopg import sql
+from app.core.config import settings
+from loaders.instrumentation import LoadMetrics
+from loaders.refreshRollups import ROLLUP_SOURCES
+
+# table -> sort order of its parquet file, leading with the columns generated sql filters on so row group min / max
+# statistics let duckdb skip most of a file
+SNAPSHOT_TABLES = {
+    "pbp_raw_event": ["season_id", "game_id", "event_num"],
+    "game": ["season_id", "id"],
+    "game_team_performance": ["game_id", "team_id"],
+    "player": ["id"],
+    "modern_team_index": ["id", "abrev"],
+    "historical_team_index": ["id", "year_active_til"],
+    "pbp_event_actor": ["season_id", "player_id", "game_id"],
+    "game_state": ["season_id", "game_id", "event_num"],
+    "possessions": ["season_id", "game_id", "possession_num"],
+    "player_stints": ["season_id", "player_id", "game_id"],
+    "lineup_stints": ["season_id", "team_id", "game_id"],
+    "player_game_box": ["season_id", "player_id", "game_id"],
+    "team_game_box": ["season_id", "team_id", "game_id"],
+    "shots": ["season_id", "shooter_id", "game_id"],
+    **{name: [] for name in ROLLUP_SOURCES},
+}
+MANIFEST_NAME = "manifest.json"
+# the previous snapshot is kept so api workers still reading it aren't pulled out from under
+KEEP_SNAPSHOTS = 2
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+if not logger.handlers:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    log_formatter = logging.Formatter("%(asctime)s [%(processName)s: %(process)d] [%(threadName)s: %(thread)d] [%(levelname)s] %(name)s: %(message)s")
+    stream_handler.setFormatter(log_formatter)
+    logger.addHandler(stream_handler)
+
+def duckdb_type(pg_type: str) -> str:
+    if pg_type.endswith("[]"):
+        return duckdb_type(pg_type[:-2]) + "[]"
+    for prefix, mapped in (("bigint", "BIGINT"), ("integer", "INTEGER"), ("smallint", "SMALLINT"), ("boolean", "BOOLEAN"),
+                           ("double precision", "DOUBLE"), ("real", "DOUBLE"), ("numeric", "DOUBLE"), ("date", "DATE"),
+                           ("timestamp with time zone", "TIMESTAMPTZ"), ("timestamp", "TIMESTAMP"), ("interval", "INTERVAL")):
+        if pg_type.startswith(prefix):
+            return mapped
+    return "VARCHAR"
+
+# --- pg_attribute rather than information_schema, which doesn't list materialized views
+def relation_columns(cur, table: str) -> list[tuple[str, str]]:
+    cur.execute(
+        "SELECT a.attname, format_type(a.atttypid, a.atttypmod) FROM pg_attribute a "
+        "WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped ORDER BY a.attnum;",
+        (table,)
+    )
+    return cur.fetchall()
+
+# --- postgres streams the table as csv into a scratch file, duckdb rewrites it as typed, sorted parquet. arrays travel
+# as json text and are cast back on the duckdb side
+def export_table(cur, duck, table: str, sort_columns: list[str], directory: str) -> int | None:
+    columns = relation_columns(cur, table)
+    if not columns:
+        logger.warning(f"SNAPSHOT TABLE {table} DOES NOT EXIST, SKIPPING")
+        return None
+    select = sql.SQL(", ").join(
+        sql.SQL("array_to_json({})::text").format(sql.Identifier(name)) if pg_type.endswith("[]") else sql.Identifier(name)
+        for name, pg_type in columns
+    )
+    order = sql.SQL(" ORDER BY {}").format(sql.SQL(", ").join(map(sql.Identifier, sort_columns))) if sort_columns else sql.SQL("")
+    csv_path = os.path.join(directory, f"{table}.csv")
+    with open(csv_path, "wb") as file:
+        with cur.copy(sql.SQL("COPY (SELECT {} FROM {}{}) TO STDOUT (FORMAT csv)").format(select, sql.Identifier(table), order)) as copy:
+            for chunk in copy:
+                file.write(chunk)
+
+    read_types = {name: "VARCHAR" if pg_type.endswith("[]") else duckdb_type(pg_type) for name, pg_type in columns}
+    casts = ", ".join(f'CAST("{name}" AS {duckdb_type(pg_type)}) AS "{name}"' if pg_type.endswith("[]") else f'"{name}"'
+                      for name, pg_type in columns)
+    parquet_path = os.path.join(directory, f"{table}.parquet")
+    duck.execute(
+        f"COPY (SELECT {casts} FROM read_csv(?, header = false, columns = {read_types!r}, nullstr = '')) "
+        f"TO '{parquet_path}' (FORMAT parquet, COMPRESSION zstd)",
+        [csv_path]
+    )
+    os.remove(csv_path)
+    return duck.execute("SELECT count(*) FROM read_parquet(?)", [parquet_path]).fetchone()[0]
+
+def _prune(snapshot_dir: str, current: str):
+    snapshots = sorted(name for name in os.listdir(snapshot_dir) if os.path.isdir(os.path.join(snapshot_dir, name)))
+    for name in snapshots[:-KEEP_SNAPSHOTS]:
+        if name != current:
+            shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+
+# --- every table is read in one repeatable read transaction, so the snapshot is a single point in time, and it is tagged
+# with the data version it reflects. the manifest is swapped in last, readers never see a half written snapshot
+def export_snapshot(conn, metrics: LoadMetrics, snapshot_dir: str | None = None) -> str | None:
+    if settings.ANALYTICS_BACKEND != "duckdb":
+        logger.info("ANALYTICS BACKEND IS POSTGRES, SKIPPING SNAPSHOT EXPORT")
+        return None
+    try:
+        import duckdb
+    except ImportError:
+        logger.error("ANALYTICS_BACKEND=duckdb BUT THE duckdb PACKAGE IS NOT INSTALLED, SKIPPING SNAPSHOT EXPORT")
+        return None
+
+    snapshot_dir = snapshot_dir or settings.ANALYTICS_SNAPSHOT_DIR
+    snapshot_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    directory = os.path.join(snapshot_dir, snapshot_id)
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+    conn.commit()
+    conn.isolation_level = psycopg.IsolationLevel.REPEATABLE_READ
+    try:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION READ ONLY;")
+                cur.execute("SELECT coalesce(max(version), 0) FROM data_version;")
+                data_version = cur.fetchone()[0]
+                with duckdb.connect() as duck:
+                    for table, sort_columns in SNAPSHOT_TABLES.items():
+                        start = time.perf_counter()
+                        rows = export_table(cur, duck, table, sort_columns, directory)
+                        if rows is None:
+                            continue
+                        tables[table] = rows
+                        logger.info(f"SNAPSHOT {table}: {rows} ROWS IN {time.perf_counter() - start:.1f}s")
+    except Exception:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    finally:
+        conn.isolation_level = None
+
+    manifest = {"snapshot": snapshot_id, "data_version": data_version, "created_at": datetime.now().isoformat(), "tables": tables}
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    _prune(snapshot_dir, snapshot_id)
+    metrics.increment("snapshot_rows", sum(tables.values()))
+    logger.info(f"ANALYTICS SNAPSHOT {snapshot_id} WRITTEN AT DATA VERSION {data_version}")
+    return snapshot_id
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the parquet snapshot used by the duckdb analytics backend")
+    parser.add_argument("--snapshot-dir", default=None, help="defaults to ANALYTICS_SNAPSHOT_DIR")
+    args = parser.parse_args()
+    with psycopg.connect(settings.DATABASE_URL_RW) as conn:
+        export_snapshot(conn, LoadMetrics("snapshot"), args.snapshot_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# per-run loader instrumentation: stage timings, nba_api latency histograms, retries, transform / db write time and
+# rows per second per table. one LoadMetrics is shared by every loader in a run and summarized into load_run at the end
+import cProfile
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+import psycopg
+from psycopg.types.json import Jsonb
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+if not logger.handlers:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    log_formatter = logging.Formatter("%(asctime)s [%(processName)s: %(process)d] [%(threadName)s: %(thread)d] [%(levelname)s] %(name)s: %(message)s")
+    stream_handler.setFormatter(log_formatter)
+    logger.addHandler(stream_handler)
+
+# upper bounds (seconds) for the api latency histogram buckets
+API_LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf")]
+
+class LoadMetrics:
+    # profile turns on cProfile around the transform stage, it can also be switched on with LOADER_PROFILE=1
+    def __init__(self, run_name: str, profile: bool | None = None, profile_dir: str | None = None):
+        self.run_name = run_name
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.stage_seconds = defaultdict(float)
+        self.api_calls = defaultdict(int)
+        self.api_seconds = defaultdict(float)
+        self.api_histograms = defaultdict(lambda: [0] * len(API_LATENCY_BUCKETS))
+        self.retries = defaultdict(int)
+        self.transform_seconds = 0.0
+        self.write_seconds = defaultdict(float)
+        self.rows_written = defaultdict(int)
+        self.rows_staged = defaultdict(int)
+        self.counters = defaultdict(int)
+        if profile is None:
+            profile = os.getenv("LOADER_PROFILE", "") == "1"
+        self.profile_dir = profile_dir or os.getenv("LOADER_PROFILE_DIR", "profiles")
+        self.profiler = cProfile.Profile() if profile else None
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - start
+
+    # --- called by the loaders' _with_retry for every attempt against nba_api
+    def observe_api(self, endpoint: str, seconds: float):
+        self.api_calls[endpoint] += 1
+        self.api_seconds[endpoint] += seconds
+        histogram = self.api_histograms[endpoint]
+        for i, bound in enumerate(API_LATENCY_BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+                break
+
+    def record_retry(self, endpoint: str):
+        self.retries[endpoint] += 1
+
+    @contextmanager
+    def transform(self):
+        start = time.perf_counter()
+        if self.profiler:
+            self.profiler.enable()
+        try:
+            yield
+        finally:
+            if self.profiler:
+                self.profiler.disable()
+            self.transform_seconds += time.perf_counter() - start
+
+    # --- times a bulk write and records rows per table from the UpsertResult it returns
+    def timed_write(self, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.write_seconds[result.table] += time.perf_counter() - start
+        self.rows_staged[result.table] += result.staged
+        self.rows_written[result.table] += result.changed
+        return result
+
+    def increment(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    # --- tables this run actually changed, merges that rewrote identical rows don't count
+    def changed_tables(self) -> set[str]:
+        return {table for table, rows in self.rows_written.items() if rows}
+
+    def summary(self) -> dict:
+        tables = {}
+        for table, seconds in self.write_seconds.items():
+            tables[table] = {
+                "rows_staged": self.rows_staged[table],
+                "rows_written": self.rows_written[table],
+                "write_seconds": round(seconds, 3),
+                "rows_per_second": round(self.rows_staged[table] / seconds, 1) if seconds else None,
+            }
+        api = {}
+        for endpoint, calls in self.api_calls.items():
+            api[endpoint] = {
+                "calls": calls,
+                "retries": self.retries[endpoint],
+                "mean_seconds": round(self.api_seconds[endpoint] / calls, 3),
+                "histogram": {("+Inf" if bound == float("inf") else str(bound)): count
+                              for bound, count in zip(API_LATENCY_BUCKETS, self.api_histograms[endpoint])},
+            }
+        return {
+            "elapsed_seconds": round(time.perf_counter() - self._start, 3),
+            "stages": {name: round(seconds, 3) for name, seconds in self.stage_seconds.items()},
+            "api": api,
+            "transform_seconds": round(self.transform_seconds, 3),
+            "tables": tables,
+            "counters": dict(self.counters),
+        }
+
+    def log_summary(self):
+        summary = self.summary()
+        logger.info(f"LOAD RUN {self.run_name} FINISHED IN {summary['elapsed_seconds']}s, TRANSFORM {summary['transform_seconds']}s")
+        for name, seconds in summary["stages"].items():
+            logger.info(f"  STAGE {name}: {seconds}s")
+        for endpoint, stats in summary["api"].items():
+            logger.info(f"  API {endpoint}: {stats['calls']} CALLS, {stats['retries']} RETRIES, MEAN {stats['mean_seconds']}s")
+        for table, stats in summary["tables"].items():
+            logger.info(f"  TABLE {table}: {stats['rows_written']} OF {stats['rows_staged']} ROWS WRITTEN IN {stats['write_seconds']}s ({stats['rows_per_second']} ROWS/S)")
+
+    def dump_profile(self) -> str | None:
+        if not self.profiler:
+            return None
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{self.run_name.replace(':', '_')}_{self.started_at:%Y%m%dT%H%M%S}.prof")
+        self.profiler.dump_stats(path)
+        return path
+
+    # --- writes the summary row for this run, pass a connection with no open transaction so the row survives a failed load
+    def finish(self, conn, status: str, error: str | None = None):
+        summary = self.summary()
+        profile_path = self.dump_profile()
+        self.log_summary()
+        if profile_path:
+            logger.info(f"TRANSFORM PROFILE WRITTEN TO {profile_path}")
+        try:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "INSERT INTO load_run (run_name, status, started_at, finished_at, elapsed_seconds, games, events, error, stats) "
+                        "VALUES (%s, %s, %s, now(), %s, %s, %s, %s, %s);",
+                        (self.run_name, status, self.started_at, summary["elapsed_seconds"], self.counters.get("games"),
+                         self.counters.get("events"), error, Jsonb(summary))
+                    )
+        except psycopg.Error as e:
+            logger.error(f"PROBLEM RECORDING LOAD RUN {self.run_name}: {e}")
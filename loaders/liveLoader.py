@@ -0,0 +1,195 @@
+# live in-game ingestion, polls today's games and appends only actions that haven't been stored yet
+# the nightly loader still merges the final feed afterwards so in-game corrections get applied
+import argparse
+import logging
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+import psycopg
+import pandas as pd
+from nba_api.live.nba.endpoints.scoreboard import ScoreBoard
+from app.core.config import settings
+from loaders.loadPBP import PBPDataLoader, PBP_COLUMNS, PBP_KEY_COLUMNS
+from loaders.loadGame import GAME_COLUMNS
+from loaders.bulkUpsert import bulk_upsert
+from loaders.dataVersion import bump_data_version
+from loaders.instrumentation import LoadMetrics
+
+MIN_POLL_SECONDS = 15.0
+MAX_POLL_SECONDS = 120.0
+PREGAME_POLL_SECONDS = 300.0
+# a game that hasn't reached its game / end action this long after tip off (postponed, suspended, feed stuck) is dropped,
+# the nightly loader picks up whatever it did produce
+GIVE_UP_AFTER = timedelta(hours=6)
+# third digit of a game id, the only season types the loaders store
+SEASON_TYPES = {"2": "regular", "4": "playoff"}
+
+class LiveGameState:
+    def __init__(self, game: tuple, last_action_number: int, starts_at: datetime | None = None):
+        self.game = game
+        self.game_id = int(game[0])
+        self.last_action_number = last_action_number
+        self.interval = MIN_POLL_SECONDS if last_action_number else PREGAME_POLL_SECONDS
+        self.next_poll_at = 0.0
+        self.is_final = False
+        self.give_up_at = (starts_at or datetime.now(timezone.utc)) + GIVE_UP_AFTER
+        self.gave_up = False
+
+    @property
+    def done(self) -> bool:
+        return self.is_final or self.gave_up
+
+# --- a live scoreboard entry as a game tuple (the column order load_pbp_data reads from the game table), None for games
+# the loaders don't store or that won't be played today
+def scoreboard_game(entry: dict, game_date: date) -> tuple | None:
+    nba_game_id = str(entry["gameId"]).zfill(10)
+    season_type = SEASON_TYPES.get(nba_game_id[2])
+    if season_type is None or "ppd" in str(entry.get("gameStatusText", "")).lower():
+        return None
+    season_id = int(f"{nba_game_id[2]}20{nba_game_id[3:5]}")
+    home, away = entry["homeTeam"], entry["awayTeam"]
+    return (int(nba_game_id), season_type, season_id, int(home["teamId"]), int(away["teamId"]), home["teamTricode"],
+            away["teamTricode"], game_date)
+
+def _tip_off(entry: dict) -> datetime | None:
+    try:
+        return datetime.fromisoformat(str(entry["gameTimeUTC"]).replace("Z", "+00:00"))
+    except (KeyError, ValueError):
+        return None
+
+class LiveGameLoader:
+    def __init__(self, db_connection, metrics: LoadMetrics | None = None):
+        self.conn = db_connection
+        self.metrics = metrics or LoadMetrics("live")
+        self.game_date = date.today()
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.DEBUG)
+        if not self.logger.handlers:
+            stream_handler = logging.StreamHandler(sys.stdout)
+            log_formatter = logging.Formatter("%(asctime)s [%(processName)s: %(process)d] [%(threadName)s: %(thread)d] [%(levelname)s] %(name)s: %(message)s")
+            stream_handler.setFormatter(log_formatter)
+            self.logger.addHandler(stream_handler)
+        # reuse the nightly transform so live rows are identical to what the batch path would write
+        self.pbp_loader = PBPDataLoader(db_connection, update=True, whole_current_season=False, metrics=self.metrics)
+        self.games: dict[int, LiveGameState] = {}
+
+    def fetch_scoreboard(self) -> tuple[date, list[dict]]:
+        board = self.pbp_loader._with_retry(lambda: ScoreBoard(), desc="today's scoreboard", endpoint="ScoreBoard")
+        return date.fromisoformat(board.score_board_date), board.games.get_dict()
+
+    # --- today's slate comes from the live scoreboard: the game table only holds games LeagueGameFinder has seen, i.e.
+    # already played ones. scheduled games get a placeholder game row (winner unknown, the nightly GameLoader fills it in)
+    # so the derived tables' foreign keys hold, and the last action already stored, so a restarted daemon picks up where it was
+    def track_scheduled_games(self):
+        self.game_date, entries = self.fetch_scoreboard()
+        scheduled = [(scoreboard_game(entry, self.game_date), _tip_off(entry)) for entry in entries]
+        scheduled = [(game, starts_at) for game, starts_at in scheduled if game is not None]
+        game_rows = [(g[0], g[2], g[3], g[5], g[4], g[6], g[7], g[1], None) for g, _ in scheduled]
+        try:
+            with self.conn.transaction():
+                with self.conn.cursor() as cur:
+                    bulk_upsert(cur, "game", GAME_COLUMNS, ["id"], game_rows, update_columns=[])
+                    cur.execute('SELECT game_id, max(event_num) FROM pbp_raw_event WHERE game_id = ANY(%s) GROUP BY game_id;',
+                                ([g[0] for g, _ in scheduled],))
+                    last_seen = {row[0]: row[1] for row in cur.fetchall()}
+        except psycopg.Error as e:
+            self.logger.error(f"ERROR FETCHING SCHEDULED GAMES: {e}")
+            raise
+        for game, starts_at in scheduled:
+            if game[0] not in self.games:
+                self.games[game[0]] = LiveGameState(game, last_seen.get(game[0], 0), starts_at)
+        self.logger.info(f"TRACKING {len(self.games)} GAMES FOR {self.game_date}")
+
+    # --- one poll of one game, returns the number of new actions appended
+    def poll_game(self, state: LiveGameState) -> int:
+        df = self.pbp_loader.fetch_game_actions(state.game_id)
+        if df.empty:
+            return 0
+        final = bool(((df['actionType'] == 'game') & (df['subType'] == 'end')).any())
+        new_actions = df[pd.to_numeric(df['actionNumber']) > state.last_action_number]
+        # a final feed with nothing new still gets its rebuild, the last poll may have stored game / end and then failed
+        if new_actions.empty and not final:
+            return 0
+        with self.metrics.transform():
+            rows = self.pbp_loader.build_event_rows(new_actions, state.game)
+        builders = self.pbp_loader.derived_builders
+        with self.conn.transaction():
+            with self.conn.cursor() as cur:
+                try:
+                    self.pbp_loader.ensure_partition(cur, int(state.game[2]))
+                    result = self.metrics.timed_write(lambda: bulk_upsert(cur, "pbp_raw_event", PBP_COLUMNS, PBP_KEY_COLUMNS, rows))
+                    # incremental derived tables follow every poll, the rest are rebuilt once from the full feed when the game ends
+                    self.pbp_loader.store_derived(cur, state.game_id, pd.DataFrame(rows, columns=PBP_COLUMNS),
+                                                  [b for b in builders if b.incremental], append=True)
+                    if final:
+                        with self.metrics.transform():
+                            all_rows = self.pbp_loader.build_event_rows(df, state.game)
+                        self.pbp_loader.store_derived(cur, state.game_id, pd.DataFrame(all_rows, columns=PBP_COLUMNS),
+                                                      [b for b in builders if not b.incremental])
+                    if result.changed or final:
+                        bump_data_version(cur, [state.game[2]])
+                except psycopg.Error as e:
+                    self.logger.error(f"LIVE PBP STORAGE ERROR: {e} FOR GAME {state.game_id}")
+                    raise
+        # only after the commit: if the write fails the game stays active and the next poll retries it
+        state.is_final = final
+        if not new_actions.empty:
+            state.last_action_number = int(pd.to_numeric(new_actions['actionNumber']).max())
+        self.metrics.increment("events", len(new_actions))
+        return len(new_actions)
+
+    # --- poll faster while a game is producing actions, back off while it's idle (timeouts, halftime, not started)
+    def schedule_next_poll(self, state: LiveGameState, new_actions: int):
+        if new_actions:
+            state.interval = max(MIN_POLL_SECONDS, state.interval / 2)
+        elif state.last_action_number:
+            state.interval = min(MAX_POLL_SECONDS, state.interval * 1.5)
+        else:
+            state.interval = PREGAME_POLL_SECONDS
+        state.next_poll_at = time.monotonic() + state.interval
+
+    def run(self):
+        self.track_scheduled_games()
+        while True:
+            now = datetime.now(timezone.utc)
+            for state in self.games.values():
+                if not state.done and now >= state.give_up_at:
+                    state.gave_up = True
+                    self.logger.warning(f"GAME {state.game_id} NEVER REACHED GAME END, GIVING UP ON IT")
+            active = [state for state in self.games.values() if not state.done]
+            if not active:
+                self.logger.info("ALL TRACKED GAMES ARE FINAL, STOPPING LIVE INGESTION")
+                return
+            state = min(active, key=lambda s: s.next_poll_at)
+            wait = state.next_poll_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                new_actions = self.poll_game(state)
+            except Exception as e:
+                # one bad poll shouldn't stop the other games, the next poll retries from the same action number
+                self.logger.error(f"PROBLEM POLLING GAME {state.game_id}: {e}")
+                new_actions = 0
+            if new_actions:
+                self.logger.info(f"GAME {state.game_id}: APPENDED {new_actions} ACTIONS UP TO ACTION {state.last_action_number}")
+            if state.is_final:
+                self.logger.info(f"GAME {state.game_id} IS FINAL, NO LONGER POLLING")
+            self.schedule_next_poll(state, new_actions)
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll today's in-progress games and append new pbp actions")
+    parser.parse_args()
+
+    DB_URL = settings.DATABASE_URL_RW
+    metrics = LoadMetrics("live")
+    with psycopg.connect(DB_URL) as conn:
+        try:
+            LiveGameLoader(conn, metrics=metrics).run()
+        except Exception as e:
+            conn.rollback()
+            metrics.finish(conn, "failed", error=str(e))
+            raise
+        metrics.finish(conn, "succeeded")
+
+if __name__ == "__main__":
+    main()
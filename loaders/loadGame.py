@@ -1,5 +1,5 @@
 import psycopg
-from time import sleep
+from time import sleep, perf_counter
 import pandas as pd
 import random
 import sys
@@ -7,11 +7,21 @@ import logging
 from app.core.config import settings
 from nba_api.stats.endpoints import leaguegamefinder
 from datetime import datetime, timedelta, date
+from loaders.instrumentation import LoadMetrics
+from loaders.bulkUpsert import bulk_upsert
+from loaders.dataVersion import bump_data_version
+
+GAME_COLUMNS = ["id", "season_id", "home_team_id", "home_team_abrev", "away_team_id", "away_team_abrev", "date", "season_type", "winner_id"]
+GAME_TEAM_PERFORMANCE_COLUMNS = ["game_id", "team_id", "team_abrev", "mins", "pts", "overtime", "field_goals_made", "field_goals_attempted",
+                                 "field_goal_percentage", "three_pointers_made", "three_pointers_attempted", "three_pointer_percentage",
+                                 "free_throws_made", "free_throws_attempted", "free_throw_percentage", "offensive_rebounds",
+                                 "defensive_rebounds", "total_rebounds", "assists", "steals", "blocks", "turnovers", "personal_fouls", "plus_minus"]
 
 class GameLoader:
-    def __init__(self, db_connection, update: bool, whole_current_season: bool):
+    def __init__(self, db_connection, update: bool, whole_current_season: bool, metrics: LoadMetrics | None = None):
         # Configure database connection, logger
         self.conn = db_connection
+        self.metrics = metrics or LoadMetrics(__name__)
         self.update = update
         self.whole_current_season = whole_current_season
         self.logger = logging.getLogger(__name__)
@@ -38,20 +48,26 @@ class GameLoader:
                              'POR': 1610612757,'SAC': 1610612758,'SAS': 1610612759,'SEA': 1610612760,'TOR': 1610612761,'UTA': 1610612762,'VAN': 1610612763,'WAS': 1610612764}
         
     # retries to be robust against nba_api errors and rate limiting
-    def _with_retry(self, fn, desc: str, max_attempts: int = 6, base_sleep: float = 0.5, max_sleep: float = 60.0):
+    def _with_retry(self, fn, desc: str, endpoint: str = "nba_api", max_attempts: int = 6, base_sleep: float = 0.5, max_sleep: float = 60.0):
         delay = base_sleep
         for call_attempt in range(1, max_attempts + 1):
+            start = perf_counter()
             try:
-                return fn()
+                result = fn()
+                self.metrics.observe_api(endpoint, perf_counter() - start)
+                return result
             except Exception as e:
+                self.metrics.observe_api(endpoint, perf_counter() - start)
                 self.logger.error(f"Problem with NBA API fetching {desc} Attempt {call_attempt} out of {max_attempts}: {e}")
                 if call_attempt == max_attempts:
                     raise
+                self.metrics.record_retry(endpoint)
                 jitter = random.uniform(0, 0.5 * delay)
                 sleep(delay + jitter)
                 delay = min(delay * 2, max_sleep)
 
-    def insert_game(self, cur, game: pd.Series, season_type: str):
+    # both perspectives of a game produce the same game row, the bulk upsert collapses them on the primary key
+    def build_game_rows(self, game: pd.Series, season_type: str) -> tuple[tuple, tuple]:
         # TEAM AGNOSTIC GAME INFO
         primary_team_abrev = game['TEAM_ABBREVIATION']
         secondary_team_abrev = game['MATCHUP'][-3:]
@@ -71,52 +87,24 @@ class GameLoader:
         game_winner_id = primary_team_id if game['WL'] == 'W' else secondary_team_id
         home_team_abrev = primary_team_abrev if home_team_id == primary_team_id else secondary_team_abrev
         away_team_abrev = primary_team_abrev if away_team_id == primary_team_id else secondary_team_abrev
+        game_row = (game_id, game_season_id, home_team_id, home_team_abrev, away_team_id, away_team_abrev, game_date, season_type, game_winner_id)
 
-        try:
-            cur.execute("INSERT INTO game (id, season_id, home_team_id, home_team_abrev, away_team_id, away_team_abrev, date, season_type, winner_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING;",
-                            (game_id, game_season_id, home_team_id, home_team_abrev, away_team_id, away_team_abrev, game_date, season_type, game_winner_id))
-        except psycopg.Error as e:
-            self.logger.error(f"ERROR INSERTING GAME WITH ID {game_id}, ERROR: {e} ABORTING ...")
-            raise
-        
         # TEAM PERFORMANCE
         mins = game['MIN']
         pts = game['PTS']
         overtime = mins > 250 # this is a bit of an assumption will confirm using play by play data
-        field_goals_made = game['FGM']
-        field_goals_attempted = game['FGA']
-        field_goal_percentage = game['FG_PCT']
-        three_pointers_made = game['FG3M']
-        three_pointers_attempted = game['FG3A']
-        three_pointer_percentage = game['FG3_PCT']
-        free_throws_made = game['FTM']
-        free_throws_attempted = game['FTA']
-        free_throw_percentage = game['FT_PCT']
-        offensive_rebounds = game['OREB']
-        defensive_rebounds = game['DREB']
-        total_rebounds = game['REB']
-        assists = game['AST']
-        steals = game['STL']
-        blocks = game['BLK']
-        turnovers = game['TOV']
-        personal_fouls = game['PF']
         plus_minus = int(game['PLUS_MINUS']) if pd.notna(game['PLUS_MINUS']) else None
-        try: 
-            cur.execute("INSERT INTO game_team_performance (game_id, team_id, team_abrev, mins, pts, overtime, field_goals_made, field_goals_attempted, field_goal_percentage, " \
-            "three_pointers_made, three_pointers_attempted, three_pointer_percentage, free_throws_made, free_throws_attempted, free_throw_percentage, offensive_rebounds, " \
-            "defensive_rebounds, total_rebounds, assists, steals, blocks, turnovers, personal_fouls, plus_minus) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, "
-            "%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING;", (game_id, primary_team_id, primary_team_abrev, mins, pts, overtime, field_goals_made, field_goals_attempted, field_goal_percentage,
-                                                                three_pointers_made, three_pointers_attempted, three_pointer_percentage, free_throws_made, free_throws_attempted, free_throw_percentage, 
-                                                                offensive_rebounds, defensive_rebounds, total_rebounds, assists, steals, blocks, turnovers, personal_fouls, plus_minus))
-        except psycopg.Error as e: 
-            self.logger.error(f"ERROR INSERTING TEAM SPECIFIC GAME INFO WITH GAME ID: {game_id}, TEAM ID: {primary_team_id} ERROR: {e} ABORTING ...")
-            raise
-        return True     
+        performance_row = (game_id, primary_team_id, primary_team_abrev, mins, pts, overtime, game['FGM'], game['FGA'], game['FG_PCT'],
+                           game['FG3M'], game['FG3A'], game['FG3_PCT'], game['FTM'], game['FTA'], game['FT_PCT'],
+                           game['OREB'], game['DREB'], game['REB'], game['AST'], game['STL'], game['BLK'], game['TOV'], game['PF'], plus_minus)
+        return game_row, performance_row
 
     def load_games(self):
         if not self.team_ids:
             raise RuntimeError(f"ABORTING GAME LOADING, TEAM IDS NOT FOUND")
         
+        game_rows = []
+        performance_rows = []
         with self.conn.cursor() as cur:
             for id in self.team_ids:
                 self.logger.info(f'LOADING {"CURRENT SEASON" if self.update else "ALL"} GAMES FOR TEAM {id}')
@@ -128,33 +116,58 @@ class GameLoader:
 
                     gamefinder_regular = self._with_retry(
                         lambda: leaguegamefinder.LeagueGameFinder(team_id_nullable=id, season_type_nullable="Regular Season", season_nullable='2025-26', date_from_nullable=date_from_nullable),
-                        desc=f"Regular season games for 2025/26 season for team {id}"
+                        desc=f"Regular season games for 2025/26 season for team {id}",
+                        endpoint="LeagueGameFinder"
                     )
                     sleep(1)
                     gamefinder_playoff = self._with_retry(
                         lambda: leaguegamefinder.LeagueGameFinder(team_id_nullable=id, season_type_nullable="Playoffs", season_nullable='2025-26', date_from_nullable=date_from_nullable),
-                        desc=f"Playoff games for 2025/26 season for team {id}"
+                        desc=f"Playoff games for 2025/26 season for team {id}",
+                        endpoint="LeagueGameFinder"
                     )
                     sleep(1)
 
                 else:
                     gamefinder_regular = self._with_retry(
                         lambda: leaguegamefinder.LeagueGameFinder(team_id_nullable=id, season_type_nullable="Regular Season", date_from_nullable='11-01-1996'), # pbp era
-                        desc=f"Regular Season games for entire pbp era for team: {id}"
+                        desc=f"Regular Season games for entire pbp era for team: {id}",
+                        endpoint="LeagueGameFinder"
                     )
                     sleep(1)
                     gamefinder_playoff = self._with_retry(
                         lambda: leaguegamefinder.LeagueGameFinder(team_id_nullable=id, season_type_nullable="Playoffs", date_from_nullable='11-01-1996'),
-                        desc=f"Playoff games for entire pbp era for team: {id}"
+                        desc=f"Playoff games for entire pbp era for team: {id}",
+                        endpoint="LeagueGameFinder"
                     )
                     sleep(1)
 
                 # ITERATE THROUGH REGULAR SEASON GAMES FOR TEAM
-                games = gamefinder_regular.get_data_frames()[0]
-                for _, game in games.iterrows():
-                    self.insert_game(cur, game, "regular")
+                with self.metrics.transform():
+                    games = gamefinder_regular.get_data_frames()[0]
+                    for _, game in games.iterrows():
+                        game_row, performance_row = self.build_game_rows(game, "regular")
+                        game_rows.append(game_row)
+                        performance_rows.append(performance_row)
 
-                # ITERATE THROUGH PLAYOFF GAMES FOR TEAM
-                games = gamefinder_playoff.get_data_frames()[0]
-                for _, game in games.iterrows():
-                    self.insert_game(cur, game, "playoff")
+                    # ITERATE THROUGH PLAYOFF GAMES FOR TEAM
+                    games = gamefinder_playoff.get_data_frames()[0]
+                    for _, game in games.iterrows():
+                        game_row, performance_row = self.build_game_rows(game, "playoff")
+                        game_rows.append(game_row)
+                        performance_rows.append(performance_row)
+
+            # games must land before the team performances that reference them
+            try:
+                result = self.metrics.timed_write(lambda: bulk_upsert(cur, "game", GAME_COLUMNS, ["id"], game_rows))
+                self.logger.info(f"GAMES: {result.inserted} INSERTED, {result.updated} UPDATED")
+            except psycopg.Error as e:
+                self.logger.error(f"ERROR STORING GAMES, ERROR: {e} ABORTING ...")
+                raise
+            try:
+                performance_result = self.metrics.timed_write(lambda: bulk_upsert(cur, "game_team_performance", GAME_TEAM_PERFORMANCE_COLUMNS, ["game_id", "team_id"], performance_rows))
+                self.logger.info(f"TEAM GAME PERFORMANCES: {performance_result.inserted} INSERTED, {performance_result.updated} UPDATED")
+                if result.changed or performance_result.changed:
+                    bump_data_version(cur, {row[GAME_COLUMNS.index("season_id")] for row in game_rows})
+            except psycopg.Error as e:
+                self.logger.error(f"ERROR STORING TEAM SPECIFIC GAME INFO, ERROR: {e} ABORTING ...")
+                raise
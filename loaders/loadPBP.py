@@ -1,20 +1,59 @@
 import psycopg
-from time import sleep
+from time import sleep, perf_counter
 from nba_api.live.nba.endpoints import PlayByPlay
-import re
 from datetime import timedelta, date
 from app.core.config import settings
 import sys
 import pandas as pd
 import random
 import logging
+from loaders.instrumentation import LoadMetrics
+from loaders.bulkUpsert import merge_rows, UpsertResult
+from loaders.partitions import ensure_season_partition
+from loaders.dataVersion import bump_data_version
+from loaders.derived import write_derived, REGULATION_PERIODS, REGULATION_PERIOD_SECONDS, OVERTIME_PERIOD_SECONDS
+from loaders.buildActors import EventActorBuilder
+from loaders.buildPossessions import PossessionBuilder
+from loaders.buildStints import PlayerStintBuilder, LineupStintBuilder
+from loaders.buildGameState import GameStateBuilder
+from loaders.buildBoxScores import PlayerBoxScoreBuilder, TeamBoxScoreBuilder
+from loaders.buildShots import ShotBuilder
+
+# pbp_raw_event is list partitioned by season_id, which therefore has to be part of the conflict key
+PBP_KEY_COLUMNS = ["game_id", "event_num", "season_id"]
+PBP_COLUMNS = ["game_id", "season_id", "season_type", "event_num", "event_type", "event_subtype",
+               "home_score", "away_score", "period", "clock", "clock_seconds", "game_seconds_elapsed",
+               "home_team_id", "away_team_id", "home_team_abrev", "away_team_abrev",
+               "possession_team_id", "possession_team_abrev", "event_team_id", "event_team_abrev", "is_overtime",
+               "shooter_id", "assister_id", "jump_ball_winner_id", "jump_ball_loser_id", "jump_ball_recovered_id",
+               "rebounder_id", "turnover_id", "foul_drawn_id", "fouler_id", "stealer_id", "blocker_id", "sub_in_id", "sub_out_id",
+               "foul_is_technical", "foul_is_personal", "foul_is_offensive", "team_turnover", "team_rebound", "offensive_rebound",
+               "side", "descriptor", "area", "area_detail", "shot_distance", "shot_made", "shot_value", "shot_x", "shot_y"]
+
+# season ids covered by the live pbp feed (2 = regular season, 4 = playoffs)
+CURRENT_SEASON_IDS = [22025, 42025]
+PBP_ERA_SEASON_IDS = [21996, 41996, 21997, 41997, 21998, 41998, 21999, 41999, 22000, 42000, 22001, 42001, 
+                      22002, 42002, 22003, 42003, 22004, 42004, 22005, 42005, 22006, 42006, 22007, 42007, 
+                      22008, 42008, 22009, 42009, 22010, 42010, 22011, 42011, 22012, 42012, 22013, 42013, 
+                      22014, 42014, 22015, 42015, 22016, 42016, 22017, 42017, 22018, 42018, 22019, 42019, 
+                      22020, 42020, 22021, 42021, 22022, 42022, 22023, 42023, 22024, 42024, 22025]
 
 class PBPDataLoader:
     # --- Configure db connection and logging ---
-    def __init__(self, db_connection, update: bool, whole_current_season: bool):
+    # season_ids overrides the update / whole_current_season selection (used by the backfill to shard by season),
+    # skip_loaded skips games that already have pbp rows so an interrupted load can resume
+    def __init__(self, db_connection, update: bool, whole_current_season: bool, season_ids: list[int] | None = None, skip_loaded: bool = False,
+                 metrics: LoadMetrics | None = None):
         self.conn = db_connection
+        self.metrics = metrics or LoadMetrics(__name__)
         self.logger = logging.getLogger(__name__)
         self.whole_current_season = whole_current_season
+        self.season_ids = season_ids
+        self.skip_loaded = skip_loaded
+        self.partitioned_seasons = set()
+        # derived tables refreshed alongside every game's events
+        self.derived_builders = [EventActorBuilder(), GameStateBuilder(), PossessionBuilder(), PlayerStintBuilder(), LineupStintBuilder(),
+                                 PlayerBoxScoreBuilder(), TeamBoxScoreBuilder(), ShotBuilder()]
         self.logger.setLevel(logging.DEBUG)
         if not self.logger.handlers:
             stream_handler = logging.StreamHandler(sys.stdout)
@@ -32,37 +71,43 @@ class PBPDataLoader:
             raise RuntimeError(f"PROBLEM LOADING PLAYER IDS") from e
         
     # --- retries to be robust against nba_api errors and rate limiting
-    def _with_retry(self, fn, desc: str, max_attempts: int = 6, base_sleep: float = 0.5, max_sleep: float = 60.0):
+    def _with_retry(self, fn, desc: str, endpoint: str = "nba_api", max_attempts: int = 6, base_sleep: float = 0.5, max_sleep: float = 60.0):
         delay = base_sleep
         for call_attempt in range(1, max_attempts + 1):
+            start = perf_counter()
             try:
-                return fn()
+                result = fn()
+                self.metrics.observe_api(endpoint, perf_counter() - start)
+                return result
             except Exception as e:
+                self.metrics.observe_api(endpoint, perf_counter() - start)
                 if call_attempt == max_attempts:
                     self.logger.error(f"FATAL ERROR WORKING WITH NBA API, ROLLING BACK")
                     raise
                 else:
                     self.logger.warning(f"Problem with NBA API fetching {desc} Attempt {call_attempt} out of {max_attempts}: {e}")
+                self.metrics.record_retry(endpoint)
                 jitter = random.uniform(0, 0.5 * delay)
                 sleep(delay + jitter)
                 delay = min(delay * 2, max_sleep)
 
-    # --- helper to convert the iso8601 timestamps (shot clock) to intervals for storage in db
-    def iso8601_to_sql_interval(self, duration: str) -> str:
-        pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?'
-        match = re.match(pattern, duration)
-        if not match:
-            raise ValueError(f"Invalid ISO 8601 duration: {duration}")
-        
-        hours = int(match.group(1) or 0)
-        minutes = int(match.group(2) or 0)
-        seconds = float(match.group(3) or 0)
+    # --- parses a whole game's iso8601 clocks (PT11M34.50S, time left in the period) in one vectorized pass
+    def parse_clock_seconds(self, clocks: pd.Series) -> pd.Series:
+        parts = clocks.astype("string").str.extract(r'^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?$').astype(float)
+        seconds = parts[0].fillna(0) * 3600 + parts[1].fillna(0) * 60 + parts[2].fillna(0)
+        unparsed = clocks.notna() & parts.isna().all(axis=1)
+        if unparsed.any():
+            self.logger.warning(f"UNPARSEABLE CLOCK VALUES: {clocks[unparsed].unique().tolist()}")
+        return seconds.where(clocks.notna() & ~unparsed)
+
+    # --- seconds since tip off, regulation periods are 12 minutes and overtimes 5
+    def game_seconds_elapsed(self, periods: pd.Series, clock_seconds: pd.Series) -> pd.Series:
+        periods = pd.to_numeric(periods, errors="coerce")
+        period_length = periods.gt(REGULATION_PERIODS).map({True: OVERTIME_PERIOD_SECONDS, False: REGULATION_PERIOD_SECONDS})
+        period_start = (periods.clip(upper=REGULATION_PERIODS) - 1) * REGULATION_PERIOD_SECONDS \
+            + (periods - REGULATION_PERIODS - 1).clip(lower=0) * OVERTIME_PERIOD_SECONDS
+        return period_start + period_length - clock_seconds
 
-        sec_int = int(seconds)
-        microsec = int((seconds - sec_int) * 1_000_000)
-        interval_str = f"{hours} hours {minutes} minutes {sec_int} seconds {microsec} microseconds"
-        return interval_str
-    
     # --- helps validate type saftey for player ids, they occasionally come back as int, string, float, none
     def _player_id_or_none(self, id):
         if pd.isna(id):
@@ -73,18 +118,206 @@ class PBPDataLoader:
             return None
         return pid if pid in self.player_ids else None
 
-    # ---  pbp data loader, either updates current season pbp data or fetches data for all years as part of init
-    def load_pbp_data(self):    
-        if self.whole_current_season:
-            season_ids = [22025, 42025]
+    # --- transforms one game's live pbp actions into pbp_raw_event rows (ordered as PBP_COLUMNS)
+    def build_event_rows(self, df: pd.DataFrame, game: tuple) -> list[list]:
+        game_id = int(game[0])
+        season_type = game[1] # append season type string manually
+        season_id = game[2] # append season id manually
+        home_team_abrev = game[5]
+        away_team_abrev = game[6]
+
+        clock_seconds = self.parse_clock_seconds(df['clock'])
+        elapsed = self.game_seconds_elapsed(df['period'], clock_seconds)
+
+        rows = []
+        for (_, event), event_clock_seconds, event_elapsed in zip(df.iterrows(), clock_seconds.tolist(), elapsed.tolist()):
+            # non-conditional on event type
+            event_num = event['actionNumber']
+            event_type = event['actionType']
+            event_subtype = event['subType']
+            home_score = event['scoreHome']
+            away_score = event['scoreAway']
+            period = event['period']
+            clock = None
+            if pd.notna(event_clock_seconds):
+                clock = timedelta(seconds=event_clock_seconds)
+            else:
+                event_clock_seconds = None
+                event_elapsed = None
+            home_team_id = game[3]
+            away_team_id = game[4]
+            possession_team_abrev = None
+            possession_team_id = None
+            event_team_id = None
+            event_team_abrev = None
+            if pd.notna(event['teamId']):
+                event_team_id = int(float(event['teamId']))
+            if pd.notna(event['teamTricode']):
+                event_team_abrev = event['teamTricode']
+            if pd.notna(event['possession']):
+                possession_team_id = int(float(event['possession']))
+                if possession_team_id == home_team_id:
+                    possession_team_abrev = home_team_abrev
+                elif possession_team_id == away_team_id:
+                    possession_team_abrev = away_team_abrev
+                else:
+                    possession_team_abrev = None
+            is_overtime = period > 4
+
+            # conditional on event
+            shooter_id = None
+            assister_id = None
+            jump_ball_winner_id = None
+            jump_ball_loser_id = None
+            jump_ball_recovered_id = None
+            rebounder_id = None
+            foul_drawn_id = None
+            fouler_id = None
+            stealer_id = None
+            team_rebound = None
+            team_turnover = None
+            blocker_id = None
+            sub_in_id = None
+            sub_out_id = None
+            turnover_id = None
+            foul_is_technical = None
+            foul_is_personal = None
+            foul_is_offensive = None
+            offensive_rebound = None
+            side = None
+            descriptor = None
+            area = None
+            area_detail = None
+            shot_distance = None
+            shot_made = None
+            shot_value = None
+            shot_x = None            
+            shot_y = None
+
+            # filling conditional on event type
+            if pd.notna(event['actionType']) and event['actionType'] == 'freethrow':
+                shot_value = 1
+                shooter_id = self._player_id_or_none(event.get('personId'))
+                shot_made = True if event['shotResult'] == 'Made' else False
+
+            # heave game id logged in google doc
+            elif event.get('isFieldGoal') == 1: # nba_api does not properly support logging made heaves at the moment, I should do this an an open source contribution, ignoring for now
+                if event['actionType'] == '2pt':
+                    shot_value = 2
+                else:
+                    shot_value = 3
+                side = event['side']
+                descriptor = event['descriptor']
+                shot_x = event['x']
+                shot_y = event['y']
+                area = event['area']
+                area_detail = event['areaDetail']
+                shot_distance = event['shotDistance']
+                shooter_id = self._player_id_or_none(event.get('personId'))
+                assister_id = self._player_id_or_none(event.get('assistPersonId'))
+                shot_made = True if event['shotResult'] == 'Made' else False
+                if not shot_made:
+                    blocker_id = self._player_id_or_none(event.get('blockPersonId'))
+
+            elif event['actionType'] == 'jumpball':
+                jump_ball_loser_id = self._player_id_or_none(event.get('jumpBallLostPersonId'))
+                jump_ball_winner_id = self._player_id_or_none(event.get('jumpBallWonPersonId'))
+                                
+            elif event.get('actionType') == 'turnover':
+                turnover_id = self._player_id_or_none(event.get('personId'))
+                team_turnover = pd.isna(event.get('personId'))
+                if pd.notna(event.get('area')):
+                    area = event['area']
+                area_detail = event.get('areaDetail')
+                stealer_id = self._player_id_or_none(event.get('stealPersonId'))
+
+            elif event['actionType'] == 'foul':
+                foul_is_technical = event['subType'] == 'technical'
+                foul_is_offensive = event['subType'] == 'offensive'
+                foul_is_personal = event['subType'] == 'personal' or event['subType'] == 'offensive'
+                foul_drawn_id = self._player_id_or_none(event.get('foulDrawnPersonId'))
+                fouler_id = self._player_id_or_none(event.get('personId'))
+
+            elif event['actionType'] == 'substitution':
+                if event.get('subType') == 'out':
+                    sub_out_id = self._player_id_or_none(event.get('personId'))
+                if event.get('subType') == 'in':
+                    sub_in_id = self._player_id_or_none(event.get('personId'))
+
+            elif event['actionType'] == 'rebound':
+                rebounder_id = self._player_id_or_none(event.get('personId'))
+                team_rebound = rebounder_id is None
+                offensive_rebound = event.get('subType') == 'offensive'
+
+            elif event['actionType'] == 'violation':
+                qualifiers = event.get('qualifiers')
+                team_turnover = isinstance(qualifiers, (list, tuple, set, str)) and ('team' in qualifiers)
+
+            values = [game_id, season_id, season_type, event_num, event_type, event_subtype,
+                        home_score, away_score, period, clock, event_clock_seconds, event_elapsed,
+                        home_team_id, away_team_id, home_team_abrev, away_team_abrev,
+                        possession_team_id, possession_team_abrev, event_team_id, event_team_abrev, is_overtime,
+                        shooter_id, assister_id, jump_ball_winner_id, jump_ball_loser_id, jump_ball_recovered_id,
+                        rebounder_id, turnover_id, foul_drawn_id, fouler_id, stealer_id, blocker_id, sub_in_id, sub_out_id,
+                        foul_is_technical, foul_is_personal, foul_is_offensive, team_turnover, team_rebound, offensive_rebound,
+                        side, descriptor, area, area_detail, shot_distance, shot_made, shot_value, shot_x, shot_y]
+            rows.append(values)
+        return rows
+
+    # --- fetches the live pbp feed for a game, outside of any transaction so no locks are held during api calls
+    def fetch_game_actions(self, game_id: int) -> pd.DataFrame:
+        nba_game_id = str(game_id).zfill(10) # standardizing id size to 10 to align with nba_api
+        pbp = self._with_retry(
+            lambda: PlayByPlay(game_id = nba_game_id),
+            desc=f"PBP Data for game with id: {nba_game_id}",
+            endpoint="PlayByPlay"
+        )
+        return pd.DataFrame(pbp.actions.get_dict())
+
+    # --- new seasons get their partition the first time the loader writes to them
+    def ensure_partition(self, cur, season_id: int):
+        if season_id not in self.partitioned_seasons:
+            ensure_season_partition(cur, season_id)
+            self.partitioned_seasons.add(season_id)
+
+    # --- rebuilds derived tables for a game from its events, append=True only adds rows (live polling)
+    # returns whether any derived table changed
+    def store_derived(self, cur, game_id: int, events: pd.DataFrame, builders: list, append: bool = False) -> bool:
+        changed = False
+        for builder in builders:
+            changed |= write_derived(cur, builder, game_id, events, self.metrics, append=append).changed
+        return changed
+
+    # --- replaces one game's event set atomically, readers see either the old or the new game, never a mix
+    def store_game_events(self, game_id: int, season_id: int, rows: list[list]) -> UpsertResult:
+        with self.conn.transaction():
+            with self.conn.cursor() as cur:
+                try:
+                    self.ensure_partition(cur, season_id)
+                    result = self.metrics.timed_write(lambda: merge_rows(cur, "pbp_raw_event", PBP_COLUMNS, PBP_KEY_COLUMNS,
+                                                                         {"game_id": game_id, "season_id": season_id}, rows))
+                    self.store_derived(cur, game_id, pd.DataFrame(rows, columns=PBP_COLUMNS), self.derived_builders)
+                    if result.changed:
+                        bump_data_version(cur, [season_id])
+                except psycopg.Error as e:
+                    self.logger.error(f"PBP STORAGE ERROR: {e} FOR GAME {game_id}")
+                    raise
+        self.logger.info(f"GAME {game_id}: {result.inserted} EVENTS INSERTED, {result.updated} UPDATED, {result.deleted} DELETED")
+        return result
+
+    def selected_season_ids(self) -> list[int]:
+        if self.season_ids is not None:
+            return self.season_ids
+        elif self.whole_current_season:
+            return CURRENT_SEASON_IDS
         elif self.update:
-            season_ids = [22025, 42025]
-        else:
-            season_ids = [21996, 41996, 21997, 41997, 21998, 41998, 21999, 41999, 22000, 42000, 22001, 42001, 
-                          22002, 42002, 22003, 42003, 22004, 42004, 22005, 42005, 22006, 42006, 22007, 42007, 
-                          22008, 42008, 22009, 42009, 22010, 42010, 22011, 42011, 22012, 42012, 22013, 42013, 
-                          22014, 42014, 22015, 42015, 22016, 42016, 22017, 42017, 22018, 42018, 22019, 42019, 
-                          22020, 42020, 22021, 42021, 22022, 42022, 22023, 42023, 22024, 42024, 22025]
+            return CURRENT_SEASON_IDS
+        return PBP_ERA_SEASON_IDS
+
+    # ---  pbp data loader, either updates current season pbp data or fetches data for all years as part of init
+    # returns the number of games and events stored so callers can report throughput
+    def load_pbp_data(self) -> dict:    
+        season_ids = self.selected_season_ids()
 
         # Fetch games logged in the database
         try:
@@ -98,182 +331,72 @@ class PBPDataLoader:
         relevant_games = [row for row in rows if row[2] in season_ids]
         if self.update: # if updating, only look at pbp data from the past few days, although updates are nightly, this helps account for revised data and failed jobs
             relevant_games = [row for row in relevant_games if row[7] > (date.today() - timedelta(days=3))]
+        if self.skip_loaded:
+            try:
+                with self.conn.cursor() as cur:
+                    cur.execute('SELECT DISTINCT game_id FROM pbp_raw_event WHERE season_id = ANY(%s);', (list(season_ids),))
+                    loaded_game_ids = {r[0] for r in cur.fetchall()}
+            except psycopg.Error as e:
+                self.logger.error(f"ERROR FETCHING ALREADY LOADED GAMES: {e}")
+                raise
+            self.logger.info(f"SKIPPING {len(loaded_game_ids)} GAMES WITH PBP DATA ALREADY LOADED")
+            relevant_games = [row for row in relevant_games if row[0] not in loaded_game_ids]
         num_games = len(relevant_games)
+        # games actually stored, an empty feed is skipped and doesn't count
+        games_stored = 0
+        num_events = 0
+        # close the implicit read transaction so each game below commits on its own instead of as a savepoint
+        self.conn.commit()
 
-        # getting pbp dfs for each fetched game, processing, inserting into dataframe
+        # fetch each game's pbp, transform it, then merge it into the stored event set in its own transaction
         for count, row in enumerate(relevant_games, start=1):
             self.logger.info(f'FETCHING AND STORING PBP INFO FOR GAME: {count} OF {num_games}')
-            with self.conn.transaction():
-                with self.conn.cursor() as cur:
-                    count += 1
-                    game_id = str(row[0]).zfill(10) # standardizing id size to 10 to align with nba_api
-                    pbp = self._with_retry(
-                        lambda: PlayByPlay(game_id = game_id),
-                        desc=f"PBP Data for game with id: {game_id}"
-                    )  
-                    df = pd.DataFrame(pbp.actions.get_dict()) 
-                    game_id = int(game_id)
-                    season_type = row[1] # append season type string manually
-                    season_id = row[2] # append season id manually
-                    home_team_id = row[3] 
-                    away_team_id = row[4]
-                    home_team_abrev = row[5]
-                    away_team_abrev = row[6]
-                    
-                    for _, event in df.iterrows():
-                        # non-conditional on event type
-                        event_num = event['actionNumber']
-                        event_type = event['actionType']
-                        event_subtype = event['subType']
-                        home_score = event['scoreHome']
-                        away_score = event['scoreAway']
-                        period = event['period']
-                        clock = None 
-                        if pd.notna(event['clock']):
-                            clock = self.iso8601_to_sql_interval(event['clock'])
-                        home_team_id = row[3]
-                        away_team_id = row[4]
-                        possession_team_abrev = None
-                        possession_team_id = None
-                        event_team_id = None
-                        event_team_abrev = None
-                        if pd.notna(event['teamId']):
-                            event_team_id = int(float(event['teamId']))
-                        if pd.notna(event['teamTricode']):
-                            event_team_abrev = event['teamTricode']
-                        if pd.notna(event['possession']):
-                            possession_team_id = int(float(event['possession']))
-                            if possession_team_id == home_team_id:
-                                possession_team_abrev = home_team_abrev
-                            elif possession_team_id == away_team_id:
-                                possession_team_abrev = away_team_abrev
-                            else:
-                                possession_team_abrev = None
-                        is_overtime = period > 4
-
-                        # conditional on event
-                        shooter_id = None
-                        assister_id = None
-                        jump_ball_winner_id = None
-                        jump_ball_loser_id = None
-                        jump_ball_recovered_id = None
-                        rebounder_id = None
-                        foul_drawn_id = None
-                        fouler_id = None
-                        stealer_id = None
-                        team_rebound = None
-                        team_turnover = None
-                        blocker_id = None
-                        sub_in_id = None
-                        sub_out_id = None
-                        turnover_id = None
-                        foul_is_technical = None
-                        foul_is_personal = None
-                        foul_is_offensive = None
-                        offensive_rebound = None
-                        side = None
-                        descriptor = None
-                        area = None
-                        area_detail = None
-                        shot_distance = None
-                        shot_made = None
-                        shot_value = None
-                        shot_x = None            
-                        shot_y = None
-
-                        # filling conditional on event type
-                        if pd.notna(event['actionType']) and event['actionType'] == 'freethrow':
-                            shot_value = 1
-                            shooter_id = self._player_id_or_none(event.get('personId'))
-                            shot_made = True if event['shotResult'] == 'Made' else False
-
-                        # heave game id logged in google doc
-                        elif event.get('isFieldGoal') == 1: # nba_api does not properly support logging made heaves at the moment, I should do this an an open source contribution, ignoring for now
-                            if event['actionType'] == '2pt':
-                                shot_value = 2
-                            else:
-                                shot_value = 3
-                            side = event['side']
-                            descriptor = event['descriptor']
-                            shot_x = event['x']
-                            shot_y = event['y']
-                            area = event['area']
-                            area_detail = event['areaDetail']
-                            shot_distance = event['shotDistance']
-                            shooter_id = self._player_id_or_none(event.get('personId'))
-                            assister_id = self._player_id_or_none(event.get('assistPersonId'))
-                            shot_made = True if event['shotResult'] == 'Made' else False
-                            if not shot_made:
-                                blocker_id = self._player_id_or_none(event.get('blockPersonId'))
+            game_id = int(row[0])
+            df = self.fetch_game_actions(game_id)
+            if df.empty:
+                # an empty feed would otherwise merge as "every event was removed"
+                self.logger.warning(f"NO PBP ACTIONS RETURNED FOR GAME {game_id}, SKIPPING")
+                continue
+            num_events += len(df)
+            with self.metrics.transform():
+                rows = self.build_event_rows(df, row)
+            self.store_game_events(game_id, int(row[2]), rows)
+            games_stored += 1
+            self.metrics.increment("games")
+            self.metrics.increment("events", len(df))
+        return {"games": games_stored, "events": num_events}
 
-                        elif event['actionType'] == 'jumpball':
-                            jump_ball_loser_id = self._player_id_or_none(event.get('jumpBallLostPersonId'))
-                            jump_ball_winner_id = self._player_id_or_none(event.get('jumpBallWonPersonId'))
-                                
-                        elif event.get('actionType') == 'turnover':
-                            turnover_id = self._player_id_or_none(event.get('personId'))
-                            team_turnover = pd.isna(event.get('personId'))
-                            if pd.notna(event.get('area')):
-                                area = event['area']
-                            area_detail = event.get('areaDetail')
-                            stealer_id = self._player_id_or_none(event.get('stealPersonId'))
-
-                        elif event['actionType'] == 'foul':
-                            foul_is_technical = event['subType'] == 'technical'
-                            foul_is_offensive = event['subType'] == 'offensive'
-                            foul_is_personal = event['subType'] == 'personal' or event['subType'] == 'offensive'
-                            foul_drawn_id = self._player_id_or_none(event.get('foulDrawnPersonId'))
-                            fouler_id = self._player_id_or_none(event.get('personId'))
-
-                        elif event['actionType'] == 'substitution':
-                            if event.get('subType') == 'out':
-                                sub_out_id = self._player_id_or_none(event.get('personId'))
-                            if event.get('subType') == 'in':
-                                sub_in_id = self._player_id_or_none(event.get('personId'))
-
-                        elif event['actionType'] == 'rebound':
-                            rebounder_id = self._player_id_or_none(event.get('personId'))
-                            team_rebound = rebounder_id is None
-                            offensive_rebound = event.get('subType') == 'offensive'
-
-                        elif event['actionType'] == 'violation':
-                            qualifiers = event.get('qualifiers')
-                            team_turnover = isinstance(qualifiers, (list, tuple, set, str)) and ('team' in qualifiers)
+    # --- re-derives every derived table from the events already stored, without calling the api, so games loaded
+    # before a derived table existed get their rows. returns the number of games and events read
+    def rebuild_derived(self) -> dict:
+        season_ids = self.selected_season_ids()
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute('SELECT DISTINCT game_id, season_id FROM pbp_raw_event WHERE season_id = ANY(%s) ORDER BY game_id;',
+                            (list(season_ids),))
+                games = cur.fetchall()
+        except psycopg.Error as e:
+            self.logger.error(f"ERROR FETCHING LOADED GAMES: {e}")
+            raise
+        num_games = len(games)
+        num_events = 0
+        # same as load_pbp_data, every game below commits on its own
+        self.conn.commit()
 
-                        values = [game_id, season_id, season_type, event_num, event_type, event_subtype,
-                                    home_score, away_score, period, clock,
-                                    home_team_id, away_team_id, home_team_abrev, away_team_abrev,
-                                    possession_team_id, possession_team_abrev, event_team_id, event_team_abrev, is_overtime,
-                                    shooter_id, assister_id, jump_ball_winner_id, jump_ball_loser_id, jump_ball_recovered_id,
-                                    rebounder_id, turnover_id, foul_drawn_id, fouler_id, stealer_id, blocker_id, sub_in_id, sub_out_id,
-                                    foul_is_technical, foul_is_personal, foul_is_offensive, team_turnover, team_rebound, offensive_rebound,
-                                    side, descriptor, area, area_detail, shot_distance, shot_made, shot_value, shot_x, shot_y]
-                        try:
-                            cur.execute(
-                                """
-                                INSERT INTO pbp_raw_event (
-                                    game_id, season_id, season_type, event_num, event_type, event_subtype,
-                                    home_score, away_score, period, clock,
-                                    home_team_id, away_team_id, home_team_abrev, away_team_abrev,
-                                    possession_team_id, possession_team_abrev, event_team_id, event_team_abrev, is_overtime,
-                                    shooter_id, assister_id, jump_ball_winner_id, jump_ball_loser_id, jump_ball_recovered_id,
-                                    rebounder_id, turnover_id, foul_drawn_id, fouler_id, stealer_id, blocker_id, sub_in_id, sub_out_id,
-                                    foul_is_technical, foul_is_personal, foul_is_offensive, team_turnover, team_rebound, offensive_rebound,
-                                    side, descriptor, area, area_detail, shot_distance, shot_made, shot_value, shot_x, shot_y
-                                ) VALUES (
-                                    %s, %s, %s, %s, %s, %s,
-                                    %s, %s, %s, %s,
-                                    %s, %s, %s, %s,
-                                    %s, %s, %s, %s, %s,
-                                    %s, %s, %s, %s, %s,
-                                    %s, %s, %s, %s, %s, %s, %s, %s,
-                                    %s, %s, %s, %s, %s, %s,
-                                    %s, %s, %s, %s, %s, %s, %s, %s, %s
-                                )
-                                ON CONFLICT (game_id, event_num) DO NOTHING;
-                                """,
-                                tuple(values)
-                            )
-                        except psycopg.Error as e:
-                            self.logger.error(f"PBP STORAGE ERROR: {e} FOR GAME {game_id}, EVENT {event_num}")
-                            raise
+        for count, (game_id, season_id) in enumerate(games, start=1):
+            self.logger.info(f'REBUILDING DERIVED TABLES FOR GAME: {count} OF {num_games}')
+            with self.conn.transaction():
+                with self.conn.cursor() as cur:
+                    try:
+                        cur.execute(f'SELECT {", ".join(PBP_COLUMNS)} FROM pbp_raw_event WHERE season_id = %s AND game_id = %s ORDER BY event_num;',
+                                    (season_id, game_id))
+                        events = pd.DataFrame(cur.fetchall(), columns=PBP_COLUMNS)
+                        if self.store_derived(cur, int(game_id), events, self.derived_builders):
+                            bump_data_version(cur, [season_id])
+                    except psycopg.Error as e:
+                        self.logger.error(f"DERIVED REBUILD ERROR: {e} FOR GAME {game_id}")
+                        raise
+            num_events += len(events)
+            self.metrics.increment("games")
+            self.metrics.increment("events", len(events))
+        return {"games": num_games, "events": num_events}
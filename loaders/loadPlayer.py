@@ -3,11 +3,14 @@ import logging
 import sys
 from nba_api.stats.static import players
 from app.core.config import settings
+from loaders.instrumentation import LoadMetrics
+from loaders.bulkUpsert import bulk_upsert, UpsertResult
 
 # -- simple, but giving same object structure in case I want to use it to pull player stats later
 class PlayerLoader:
-    def __init__(self, db_conn: psycopg.connection):
+    def __init__(self, db_conn: psycopg.connection, metrics: LoadMetrics | None = None):
         self.conn = db_conn
+        self.metrics = metrics or LoadMetrics(__name__)
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.DEBUG)
         if not self.logger.handlers:
@@ -17,18 +20,15 @@ class PlayerLoader:
             self.logger.addHandler(stream_handler)
     
     # dont need retry for static library data
-    def load_player_index(self, cur: psycopg.cursor):
+    # whole index goes through one staged upsert, only new players and name / active status changes are written
+    def load_player_index(self, cur: psycopg.cursor) -> UpsertResult:
         self.logger.info(f"LOADING PLAYER INDEX FROM NBA_API STATIC DATA")
         all_players = players.get_players()
-        for player in all_players:
-            player_id = player['id']
-            full_name = player['full_name']
-            first_name = player['first_name']
-            last_name = player['last_name']
-            is_active = player['is_active']
-            try:
-                cur.execute("INSERT INTO player (id, full_name, first_name, last_name, is_active)" \
-                " VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING;", (player_id, full_name, first_name, last_name, is_active))
-            except psycopg.Error as e:
-                self.logger.error(f"PROBLEM LOADING PLAYER WITH ID {player_id}: {e}")
-                raise RuntimeError(f"Failed loading player {player_id}") from e
+        rows = [(player['id'], player['full_name'], player['first_name'], player['last_name'], player['is_active']) for player in all_players]
+        try:
+            result = self.metrics.timed_write(lambda: bulk_upsert(cur, "player", ["id", "full_name", "first_name", "last_name", "is_active"], ["id"], rows))
+        except psycopg.Error as e:
+            self.logger.error(f"PROBLEM LOADING PLAYER INDEX: {e}")
+            raise RuntimeError("Failed loading player index") from e
+        self.logger.info(f"PLAYER INDEX: {result.staged} PLAYERS STAGED, {result.inserted} INSERTED, {result.updated} UPDATED")
+        return result
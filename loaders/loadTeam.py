@@ -4,11 +4,14 @@ import random
 import time
 from app.core.config import settings
 from nba_api.stats.endpoints import TeamDetails
+from loaders.instrumentation import LoadMetrics
+from loaders.bulkUpsert import bulk_upsert, UpsertResult
 import sys
 
 class TeamLoader:
-    def __init__(self, db_conn):
+    def __init__(self, db_conn, metrics: LoadMetrics | None = None):
         self.conn = db_conn
+        self.metrics = metrics or LoadMetrics(__name__)
 
         # API has some weird edge cases with team ids so for now I'm going to manage all of this manually
         self.team_ids = [1610612766,1610612764,1610612759,1610612751,1610612739,1610612738,1610612758,
@@ -40,49 +43,66 @@ class TeamLoader:
             stream_handler.setFormatter(log_formatter)
             self.logger.addHandler(stream_handler)
 
-    def _with_retry(self, fn, desc: str, max_attempts: int = 6, base_sleep: float = 0.5, max_sleep: float = 60.0):
+    def _with_retry(self, fn, desc: str, endpoint: str = "nba_api", max_attempts: int = 6, base_sleep: float = 0.5, max_sleep: float = 60.0):
         delay = base_sleep
         for call_attempt in range(1, max_attempts + 1):
+            start = time.perf_counter()
             try:
-                return fn()
+                result = fn()
+                self.metrics.observe_api(endpoint, time.perf_counter() - start)
+                return result
             except Exception as e:
+                self.metrics.observe_api(endpoint, time.perf_counter() - start)
                 if call_attempt == max_attempts:
                     self.logger.error(f"FATAL ERROR WORKING WITH NBA API, ROLLING BACK: {e}")
                     raise
                 else:
                     self.logger.warning(f"Problem with NBA API fetching {desc} Attempt {call_attempt} out of {max_attempts}: {e}")
+                self.metrics.record_retry(endpoint)
                 jitter = random.uniform(0, 0.5 * delay)
                 time.sleep(delay + jitter)
                 delay = min(delay * 2, max_sleep)
 
-    def load_historical_teams(self, cur):
-        for team_id in self.team_ids:
+    # team history is static reference data, TeamDetails is only called for teams missing from the index unless refresh is set
+    def load_historical_teams(self, cur, refresh: bool = False) -> UpsertResult:
+        team_ids = self.team_ids
+        if not refresh:
+            cur.execute("SELECT DISTINCT id FROM historical_team_index;")
+            stored_ids = {row[0] for row in cur.fetchall()}
+            team_ids = [team_id for team_id in self.team_ids if team_id not in stored_ids]
+            self.logger.info(f"SKIPPING HISTORICAL TEAM DETAILS FOR {len(self.team_ids) - len(team_ids)} TEAMS ALREADY INDEXED")
+
+        rows = []
+        for team_id in team_ids:
             df = self._with_retry(
                 lambda: TeamDetails(team_id = team_id).get_data_frames(),
-                desc=f"Historical team data for team: {team_id}"
+                desc=f"Historical team data for team: {team_id}",
+                endpoint="TeamDetails"
             )
             historical = df[1]
+            self.logger.info(f"FETCHED HISTORICAL TEAM INDEX FOR TEAM WITH ID: {team_id}")
             for _, row in historical.iterrows():
-                self.logger.info(f"STORING HISTORICAL TEAM INDEX FOR TEAM WITH ID: {team_id}")
-                self.logger.info(f"{team_id}, {row['CITY']}, {row['NICKNAME']}, {row['YEARFOUNDED']}, {row['YEARACTIVETILL']}")
-                current_iteration = False
-                if row['YEARACTIVETILL'] == historical['YEARACTIVETILL'].max():
-                    current_iteration = True
-                try:
-                    cur.execute("INSERT INTO historical_team_index (id, current_iteration, city, nickname, year_founded, year_active_til) VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING;", 
-                            (team_id, current_iteration, row['CITY'], row['NICKNAME'], row['YEARFOUNDED'], row['YEARACTIVETILL']))
-                except psycopg.Error:
-                    self.logger.error(f"ERROR STORING HISTORICAL TEAM INDEX FOR TEAM WITH ID: {team_id}")
-                    raise
+                current_iteration = bool(row['YEARACTIVETILL'] == historical['YEARACTIVETILL'].max())
+                rows.append((team_id, current_iteration, row['CITY'], row['NICKNAME'], row['YEARFOUNDED'], row['YEARACTIVETILL']))
             time.sleep(.2)
 
-    def load_modern_teams(self, cur):
-        for abrev in self.abrev_id_map.keys():
-            self.logger.info(f"STORING MODERN TEAM INDEX FOR TEAM WITH ABBREVIATION: {abrev}")
-            team_id = self.abrev_id_map[abrev]
-            nickname = self.abrev_nickname_map[abrev]
-            try:
-                cur.execute("INSERT INTO modern_team_index (id, abrev, nickname) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING", (team_id, abrev, nickname))
-            except psycopg.Error as e:
-                self.logger.error(f"ERROR STORING MODERN TEAM INDEX FOR TEAM WITH ABBREVIATION: {abrev} ERROR: {e}")
-                raise
\ No newline at end of file
+        try:
+            result = self.metrics.timed_write(lambda: bulk_upsert(
+                cur, "historical_team_index", ["id", "current_iteration", "city", "nickname", "year_founded", "year_active_til"],
+                ["id", "nickname", "year_active_til"], rows))
+        except psycopg.Error as e:
+            self.logger.error(f"ERROR STORING HISTORICAL TEAM INDEX: {e}")
+            raise
+        self.logger.info(f"HISTORICAL TEAM INDEX: {result.inserted} INSERTED, {result.updated} UPDATED")
+        return result
+
+    def load_modern_teams(self, cur) -> UpsertResult:
+        self.logger.info(f"STORING MODERN TEAM INDEX FOR {len(self.abrev_id_map)} TEAM ABBREVIATIONS")
+        rows = [(self.abrev_id_map[abrev], abrev, self.abrev_nickname_map[abrev]) for abrev in self.abrev_id_map.keys()]
+        try:
+            result = self.metrics.timed_write(lambda: bulk_upsert(cur, "modern_team_index", ["id", "abrev", "nickname"], ["id", "abrev"], rows))
+        except psycopg.Error as e:
+            self.logger.error(f"ERROR STORING MODERN TEAM INDEX: {e}")
+            raise
+        self.logger.info(f"MODERN TEAM INDEX: {result.inserted} INSERTED, {result.updated} UPDATED")
+        return result
@@ -0,0 +1,115 @@
+# post-load maintenance: ANALYZE what the run changed (partition leaves and their partitioned parent, which autovacuum
+# never analyzes), VACUUM where dead tuples piled up, and keep per-partition extended statistics in place
+#   python -m loaders.maintenance --tables pbp_raw_event game_state
+import argparse
+import logging
+import sys
+import time
+import psycopg
+from psycopg import sql
+from app.core.config import settings
+from loaders.instrumentation import LoadMetrics
+
+# vacuum once a relation has at least this many dead tuples and they make up this share of its rows
+VACUUM_MIN_DEAD_TUPLES = 10_000
+VACUUM_DEAD_RATIO = 0.1
+# extended statistics created on every pbp_raw_event season partition (season_id is constant within one, so the
+# (season_id, event_team_id) group from the migration only lives on the parent)
+PARTITION_STATISTICS = {
+    "type_subtype": ["event_type", "event_subtype"],
+    "team_type": ["event_team_id", "event_type"],
+}
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+if not logger.handlers:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    log_formatter = logging.Formatter("%(asctime)s [%(processName)s: %(process)d] [%(threadName)s: %(thread)d] [%(levelname)s] %(name)s: %(message)s")
+    stream_handler.setFormatter(log_formatter)
+    logger.addHandler(stream_handler)
+
+# --- the changed tables plus their partitions, with the activity counters autovacuum would look at
+def relation_stats(cur, tables: list[str]) -> list[tuple]:
+    cur.execute(
+        """
+        WITH targets AS (
+            SELECT c.oid, c.relname, c.relname AS parent FROM pg_class c
+            WHERE c.relname = ANY(%s) AND c.relnamespace = 'public'::regnamespace
+            UNION ALL
+            SELECT i.inhrelid, child.relname, p.relname FROM pg_inherits i
+            JOIN pg_class p ON p.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE p.relname = ANY(%s) AND p.relnamespace = 'public'::regnamespace
+        )
+        SELECT t.relname, t.parent, c.relkind, coalesce(s.n_live_tup, 0), coalesce(s.n_dead_tup, 0), coalesce(s.n_mod_since_analyze, 0)
+        FROM targets t
+        JOIN pg_class c ON c.oid = t.oid
+        LEFT JOIN pg_stat_user_tables s ON s.relid = t.oid
+        ORDER BY t.parent, t.relname;
+        """,
+        (tables, tables)
+    )
+    return cur.fetchall()
+
+def ensure_partition_statistics(cur, partition: str) -> int:
+    created = 0
+    for suffix, columns in PARTITION_STATISTICS.items():
+        name = f"{partition}_{suffix}_stats"
+        cur.execute("SELECT 1 FROM pg_statistic_ext WHERE stxname = %s;", (name,))
+        if cur.fetchone():
+            continue
+        cur.execute(sql.SQL("CREATE STATISTICS {} (ndistinct, dependencies, mcv) ON {} FROM {}").format(
+            sql.Identifier(name), sql.SQL(", ").join(map(sql.Identifier, columns)), sql.Identifier(partition)))
+        created += 1
+    return created
+
+def _timed(cur, statement: sql.Composable, label: str, metrics: LoadMetrics):
+    start = time.perf_counter()
+    with metrics.stage(f"maintenance:{label}"):
+        cur.execute(statement)
+    logger.info(f"{label.upper()} {time.perf_counter() - start:.1f}s")
+
+# --- needs the table owner and VACUUM can't run inside a transaction, so pass an autocommit migrations connection
+def run_maintenance(conn, metrics: LoadMetrics, tables: list[str] | None = None) -> dict:
+    tables = sorted(tables if tables is not None else metrics.changed_tables())
+    if not tables:
+        logger.info("NO TABLES CHANGED, SKIPPING MAINTENANCE")
+        return {"analyzed": [], "vacuumed": []}
+    analyzed, vacuumed = [], []
+    with conn.cursor() as cur:
+        stats = relation_stats(cur, tables)
+        for relname, parent, relkind, live, dead, modified in stats:
+            if relkind == "p":
+                continue
+            if parent == "pbp_raw_event" and relname != parent:
+                metrics.increment("statistics_created", ensure_partition_statistics(cur, relname))
+            if dead >= VACUUM_MIN_DEAD_TUPLES and dead >= VACUUM_DEAD_RATIO * max(live, 1):
+                _timed(cur, sql.SQL("VACUUM (ANALYZE) {}").format(sql.Identifier(relname)), f"vacuum {relname}", metrics)
+                vacuumed.append(relname)
+            elif modified:
+                _timed(cur, sql.SQL("ANALYZE {}").format(sql.Identifier(relname)), f"analyze {relname}", metrics)
+                analyzed.append(relname)
+        # partitioned parents hold the inherited statistics used for queries spanning several seasons, and only get
+        # them from an explicit ANALYZE
+        for relname, parent, relkind, *_ in stats:
+            if relkind == "p":
+                _timed(cur, sql.SQL("ANALYZE {}").format(sql.Identifier(relname)), f"analyze {relname}", metrics)
+                analyzed.append(relname)
+    metrics.increment("tables_analyzed", len(analyzed))
+    metrics.increment("tables_vacuumed", len(vacuumed))
+    logger.info(f"MAINTENANCE DONE: {len(analyzed)} ANALYZED, {len(vacuumed)} VACUUMED")
+    return {"analyzed": analyzed, "vacuumed": vacuumed}
+
+def main():
+    parser = argparse.ArgumentParser(description="ANALYZE / VACUUM tables after a load")
+    parser.add_argument("--tables", nargs="+", required=True, help="tables (partitioned parents include their partitions)")
+    args = parser.parse_args()
+
+    metrics = LoadMetrics("maintenance")
+    with psycopg.connect(settings.DATABASE_URL_MIGRATIONS, autocommit=True) as conn:
+        with metrics.stage("maintenance"):
+            run_maintenance(conn, metrics, args.tables)
+        metrics.finish(conn, "succeeded")
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,54 @@ from loaders.loadPBP import PBPDataLoader
 import psycopg
 from app.core.config import settings
 from loaders.loadGame import GameLoader
+from loaders.instrumentation import LoadMetrics
+from loaders.refreshRollups import refresh_rollups
+from loaders.maintenance import run_maintenance
+from loaders.exportSnapshot import export_snapshot
 
 # -> update player index -> update game data -> update play by play data
 def main():
     DB_URL = settings.DATABASE_URL_RW
+    metrics = LoadMetrics("nightly")
+    try:
+        with metrics.stage("players"):
+            with psycopg.connect(DB_URL) as conn:
+                with conn.transaction():
+                    loader = PlayerLoader(conn, metrics=metrics)
+                    with conn.cursor() as cur:
+                        loader.load_player_index(cur)
+
+        with metrics.stage("games"):
+            with psycopg.connect(DB_URL) as conn:
+                with conn.transaction():
+                    game_loader = GameLoader(conn, update=True, whole_current_season=False, metrics=metrics)
+                    game_loader.load_games()
+
+        with metrics.stage("pbp"):
+            with psycopg.connect(DB_URL) as conn:
+                data_loader = PBPDataLoader(conn, update=True, whole_current_season=False, metrics=metrics)
+                data_loader.load_pbp_data()
+
+        with metrics.stage("rollups"):
+            with psycopg.connect(DB_URL) as conn:
+                refresh_rollups(conn, metrics)
+
+        # analyze / vacuum need the table owner, so this stage uses the migrations role
+        with metrics.stage("maintenance"):
+            with psycopg.connect(settings.DATABASE_URL_MIGRATIONS, autocommit=True) as conn:
+                run_maintenance(conn, metrics)
+
+        # no-op unless ANALYTICS_BACKEND=duckdb
+        with metrics.stage("snapshot"):
+            with psycopg.connect(DB_URL) as conn:
+                export_snapshot(conn, metrics)
+    except Exception as e:
+        with psycopg.connect(DB_URL) as conn:
+            metrics.finish(conn, "failed", error=str(e))
+        raise
+
     with psycopg.connect(DB_URL) as conn:
-        with conn.transaction():
-            loader = PlayerLoader(conn)
-            with conn.cursor() as cur:
-                loader.load_player_index(cur)
-                
-    with psycopg.connect(DB_URL) as conn:
-        with conn.transaction():
-            game_loader = GameLoader(conn, update=True, whole_current_season=False)
-            game_loader.load_games()
-            
-    with psycopg.connect(DB_URL) as conn:
-        data_loader = PBPDataLoader(conn, update=True, whole_current_season=False)
-        data_loader.load_pbp_data()
+        metrics.finish(conn, "succeeded")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
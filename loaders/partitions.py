@@ -0,0 +1,65 @@
+# season partitions of pbp_raw_event: creation on demand for the loaders, and moving old seasons to cheaper storage
+#   python -m loaders.partitions --archive-before 22015 --tablespace archive
+import argparse
+import logging
+import sys
+import psycopg
+from psycopg import sql
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+if not logger.handlers:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    log_formatter = logging.Formatter("%(asctime)s [%(processName)s: %(process)d] [%(threadName)s: %(thread)d] [%(levelname)s] %(name)s: %(message)s")
+    stream_handler.setFormatter(log_formatter)
+    logger.addHandler(stream_handler)
+
+def partition_name(season_id: int) -> str:
+    return f"pbp_raw_event_{int(season_id)}"
+
+# --- idempotent, goes through the security definer function so the loaders' role doesn't need to own the table
+def ensure_season_partition(cur, season_id: int) -> str:
+    cur.execute("SELECT ensure_pbp_partition(%s);", (int(season_id),))
+    return cur.fetchone()[0]
+
+def list_season_partitions(cur) -> list[tuple[int, str, str | None]]:
+    cur.execute(
+        """
+        SELECT substring(c.relname FROM 'pbp_raw_event_(\\d+)$')::int AS season_id, c.relname, t.spcname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        LEFT JOIN pg_tablespace t ON t.oid = c.reltablespace
+        WHERE p.relname = 'pbp_raw_event'
+        ORDER BY 1;
+        """
+    )
+    return cur.fetchall()
+
+# --- rewrites finished seasons into a separate tablespace, packed full since they are never updated again
+# needs the table owner, so it runs with the migrations connection rather than the loaders' role
+def archive_season_partitions(conn, before_season_id: int, tablespace: str):
+    with conn.cursor() as cur:
+        partitions = list_season_partitions(cur)
+    conn.commit()
+    for season_id, name, current_tablespace in partitions:
+        if season_id is None or season_id % 10000 >= before_season_id % 10000 or current_tablespace == tablespace:
+            continue
+        logger.info(f"ARCHIVING PARTITION {name} TO TABLESPACE {tablespace}")
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("ALTER TABLE {} SET (fillfactor = 100, autovacuum_vacuum_scale_factor = 0.5)").format(sql.Identifier(name)))
+                cur.execute(sql.SQL("ALTER TABLE {} SET TABLESPACE {}").format(sql.Identifier(name), sql.Identifier(tablespace)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage season partitions of pbp_raw_event")
+    parser.add_argument("--archive-before", type=int, required=True,
+                        help="season id (e.g. 22015) - regular season and playoff partitions of earlier seasons are archived")
+    parser.add_argument("--tablespace", required=True, help="tablespace for archived partitions")
+    args = parser.parse_args()
+    with psycopg.connect(settings.DATABASE_URL_MIGRATIONS) as conn:
+        archive_season_partitions(conn, args.archive_before, args.tablespace)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# post-load stage: refreshes the season rollup materialized views whose source tables changed during the run
+#   python -m loaders.refreshRollups --all
+import argparse
+import logging
+import sys
+import time
+import psycopg
+from app.core.config import settings
+from loaders.instrumentation import LoadMetrics
+from loaders.dataVersion import bump_data_version, ALL_SEASONS
+
+# rollup -> tables it is computed from
+ROLLUP_SOURCES = {
+    "mv_player_season_shooting": ["pbp_raw_event"],
+    "mv_assist_pairs": ["pbp_raw_event"],
+    "mv_team_season_opponent_scoring": ["team_game_box"],
+    "mv_player_season_home_away": ["player_game_box"],
+    "mv_player_season_shot_bins": ["shots"],
+}
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+if not logger.handlers:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    log_formatter = logging.Formatter("%(asctime)s [%(processName)s: %(process)d] [%(threadName)s: %(thread)d] [%(levelname)s] %(name)s: %(message)s")
+    stream_handler.setFormatter(log_formatter)
+    logger.addHandler(stream_handler)
+
+def affected_rollups(tables: set[str]) -> list[str]:
+    return [name for name, sources in ROLLUP_SOURCES.items() if tables.intersection(sources)]
+
+# --- CONCURRENTLY keeps the rollups readable by the oracle while they refresh, each one commits on its own
+def refresh_rollups(conn, metrics: LoadMetrics, rollups: list[str] | None = None) -> list[str]:
+    if rollups is None:
+        rollups = affected_rollups(metrics.changed_tables())
+    if not rollups:
+        logger.info("NO ROLLUP SOURCES CHANGED, SKIPPING ROLLUP REFRESH")
+        return []
+    conn.commit()
+    for name in rollups:
+        start = time.perf_counter()
+        try:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    cur.execute("SELECT refresh_rollup(%s);", (name,))
+                    bump_data_version(cur, [ALL_SEASONS])
+        except psycopg.Error as e:
+            logger.error(f"PROBLEM REFRESHING ROLLUP {name}: {e}")
+            raise
+        elapsed = time.perf_counter() - start
+        metrics.increment("rollups_refreshed")
+        logger.info(f"REFRESHED ROLLUP {name} IN {elapsed:.1f}s")
+    return rollups
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the season rollup materialized views")
+    parser.add_argument("--all", action="store_true", help="refresh every rollup")
+    parser.add_argument("--rollups", nargs="*", default=None, choices=list(ROLLUP_SOURCES), help="refresh only these rollups")
+    args = parser.parse_args()
+
+    rollups = list(ROLLUP_SOURCES) if args.all else args.rollups
+    if not rollups:
+        parser.error("pass --all or --rollups")
+    metrics = LoadMetrics("rollups")
+    with psycopg.connect(settings.DATABASE_URL_RW) as conn:
+        try:
+            with metrics.stage("rollups"):
+                refresh_rollups(conn, metrics, rollups)
+        except Exception as e:
+            conn.rollback()
+            metrics.finish(conn, "failed", error=str(e))
+            raise
+        metrics.finish(conn, "succeeded")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+# synthetic seasons for scale testing: simulates statistically plausible games possession by possession and writes them
+# through the same path as real data (PBPDataLoader.build_event_rows / store_game_events, bulk upserts for games), so
+# indexes, partitions and rollups can be benchmarked at 1, 10 or 30 seasons without touching the nba api
+#   python -m loaders.syntheticLoader --seasons 10 --games-per-season 1230 --seed 7
+# synthetic seasons use season ids 22900 and up (and game / player ids far outside the real ranges), so they never mix
+# with real data and can be dropped again partition by partition
+import argparse
+import logging
+import math
+import random
+import sys
+from datetime import date, timedelta
+import pandas as pd
+import psycopg
+from app.core.config import settings
+from loaders.instrumentation import LoadMetrics
+from loaders.bulkUpsert import bulk_upsert
+from loaders.dataVersion import bump_data_version
+from loaders.derived import REGULATION_PERIODS, REGULATION_PERIOD_SECONDS, OVERTIME_PERIOD_SECONDS
+from loaders.buildShots import CORNER_THREE_LATERAL, PAINT_HALF_WIDTH, PAINT_MAX_DEPTH, RESTRICTED_AREA_RADIUS
+from loaders.loadGame import GAME_COLUMNS, GAME_TEAM_PERFORMANCE_COLUMNS
+from loaders.loadPBP import PBPDataLoader
+from loaders.loadTeam import TeamLoader
+from loaders.refreshRollups import refresh_rollups
+
+SYNTHETIC_SEASON_YEAR = 2900
+SYNTHETIC_PLAYER_BASE = 900000000
+SYNTHETIC_GAME_BASE = 9000000000
+ROSTER_SIZE = 13
+GAMES_PER_SEASON = 1230
+CURRENT_TEAMS = ['ATL', 'BKN', 'BOS', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW', 'HOU', 'IND', 'LAC', 'LAL', 'MEM',
+                 'MIA', 'MIL', 'MIN', 'NOP', 'NYK', 'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS']
+# columns of the live PlayByPlay feed that build_event_rows reads
+FEED_COLUMNS = ["actionNumber", "actionType", "subType", "scoreHome", "scoreAway", "period", "clock", "teamId", "teamTricode",
+                "possession", "personId", "shotResult", "isFieldGoal", "side", "descriptor", "x", "y", "area", "areaDetail",
+                "shotDistance", "assistPersonId", "blockPersonId", "stealPersonId", "foulDrawnPersonId",
+                "jumpBallWonPersonId", "jumpBallLostPersonId", "qualifiers"]
+
+# --- league-average-ish rates, enough for plausible box scores / shot charts rather than a faithful model
+# (area, share of field goal attempts, shot value, make probability, shot subtypes)
+SHOT_ZONES = [
+    ("Restricted Area", 0.30, 2, 0.65, ["Layup", "Dunk"]),
+    ("In The Paint (Non-RA)", 0.17, 2, 0.44, ["Floating Jump shot", "Hook"]),
+    ("Mid-Range", 0.13, 2, 0.42, ["Jump Shot", "Pullup Jump shot"]),
+    ("Left Corner 3", 0.05, 3, 0.39, ["Jump Shot"]),
+    ("Right Corner 3", 0.05, 3, 0.39, ["Jump Shot"]),
+    ("Above the Break 3", 0.30, 3, 0.36, ["Jump Shot", "Pullup Jump shot", "Step Back Jump shot"]),
+]
+TURNOVER_RATE = 0.13
+STEAL_SHARE = 0.5
+TEAM_TURNOVER_SHARE = 0.05
+NON_SHOOTING_FOUL_RATE = 0.06
+SHOOTING_FOUL_RATE = 0.09
+FREE_THROW_PCT = 0.77
+ASSIST_RATE = 0.6
+BLOCK_RATE = 0.07
+OFFENSIVE_REBOUND_RATE = 0.24
+SUBSTITUTION_RATE = 0.35
+MIN_SECONDS_BETWEEN_SUBS = 120
+TURNOVER_SUBTYPES = ["bad pass", "lost ball", "out-of-bounds", "traveling", "offensive foul"]
+# usage weights by roster slot, starters take most shots, the end of the bench rarely plays
+SLOT_WEIGHTS = [5, 5, 4, 4, 3, 3, 2.5, 2, 2, 1.5, 0.5, 0.3, 0.2]
+
+# court geometry in feet, same conventions as loaders.buildShots
+COURT_LENGTH = 94.0
+COURT_WIDTH = 50.0
+BASKET_FROM_BASELINE = 5.25
+# feed coordinates are rounded to 1/100 of the court, shot locations keep this far (feet) off the zone boundaries
+ZONE_MARGIN = 0.1
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+if not logger.handlers:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    log_formatter = logging.Formatter("%(asctime)s [%(processName)s: %(process)d] [%(threadName)s: %(thread)d] [%(levelname)s] %(name)s: %(message)s")
+    stream_handler.setFormatter(log_formatter)
+    logger.addHandler(stream_handler)
+
+def synthetic_season_id(index: int) -> int:
+    return 20000 + SYNTHETIC_SEASON_YEAR + index
+
+def roster(team_index: int) -> list[int]:
+    return [SYNTHETIC_PLAYER_BASE + team_index * 100 + slot for slot in range(ROSTER_SIZE)]
+
+def _feed_clock(seconds: float) -> str:
+    minutes, rest = divmod(max(seconds, 0.0), 60)
+    return f"PT{int(minutes):02d}M{rest:05.2f}S"
+
+# --- a shot location in feet relative to the attacking basket (x lateral, y out from the basket), inverse of the
+# normalization in buildShots so the derived zones agree with the feed's area
+def _shot_location(rng: random.Random, area: str) -> tuple[float, float]:
+    if area in ("Left Corner 3", "Right Corner 3"):
+        x = rng.uniform(CORNER_THREE_LATERAL + ZONE_MARGIN, 23.5)
+        return (-x if area == "Left Corner 3" else x), rng.uniform(-3.0, 8.0)
+    if area == "In The Paint (Non-RA)":
+        while True:
+            x = rng.uniform(-PAINT_HALF_WIDTH + ZONE_MARGIN, PAINT_HALF_WIDTH - ZONE_MARGIN)
+            y = rng.uniform(0.0, PAINT_MAX_DEPTH - ZONE_MARGIN)
+            if math.hypot(x, y) > RESTRICTED_AREA_RADIUS + ZONE_MARGIN:
+                return x, y
+    min_distance, max_distance, max_angle = {"Restricted Area": (0.0, RESTRICTED_AREA_RADIUS - ZONE_MARGIN, 90),
+                                             "Mid-Range": (9.0, 21.5, 75),
+                                             "Above the Break 3": (23.75, 27.0, 65)}[area]
+    while True:
+        distance = rng.uniform(min_distance, max_distance)
+        angle = math.radians(rng.uniform(-max_angle, max_angle))
+        x, y = distance * math.sin(angle), distance * math.cos(angle)
+        # short, steep mid-range angles land in the paint box, buildShots would call those paint shots
+        in_paint = abs(x) <= PAINT_HALF_WIDTH + ZONE_MARGIN and y <= PAINT_MAX_DEPTH + ZONE_MARGIN
+        if area != "Mid-Range" or not in_paint:
+            return x, y
+
+def _feed_coordinates(x: float, y: float, side: str) -> tuple[float, float]:
+    lateral, from_baseline = (x, y + BASKET_FROM_BASELINE) if side == "left" else (-x, COURT_LENGTH - y - BASKET_FROM_BASELINE)
+    return round(from_baseline / COURT_LENGTH * 100, 2), round((lateral + COURT_WIDTH / 2) / COURT_WIDTH * 100, 2)
+
+# --- one game, possession by possession, as live PlayByPlay feed actions plus both teams' official box score rows
+class SyntheticGame:
+    def __init__(self, rng: random.Random, teams: list[tuple[int, str, list[int]]]):
+        self.rng = rng
+        self.teams = teams # (team id, tricode, roster), home first
+        self.actions = []
+        self.score = [0, 0]
+        self.stats = [dict.fromkeys(["fgm", "fga", "fg3m", "fg3a", "ftm", "fta", "oreb", "dreb", "ast", "stl", "blk", "tov", "pf"], 0)
+                      for _ in teams]
+        self.on_court = [list(team[2][:5]) for team in teams]
+        self.last_sub = [None, None]
+        self.period = 1
+        self.clock = float(REGULATION_PERIOD_SECONDS)
+        self.offense = 0
+
+    def emit(self, action_type: str, sub_type, team: int | None = None, person: int | None = None, **fields):
+        action = {
+            "actionNumber": len(self.actions) + 1,
+            "actionType": action_type,
+            "subType": sub_type,
+            "scoreHome": self.score[0],
+            "scoreAway": self.score[1],
+            "period": self.period,
+            "clock": _feed_clock(self.clock),
+            "teamId": self.teams[team][0] if team is not None else None,
+            "teamTricode": self.teams[team][1] if team is not None else None,
+            "possession": self.teams[self.offense][0],
+            "personId": person,
+        }
+        action.update(fields)
+        self.actions.append(action)
+
+    def pick(self, team: int, exclude: int | None = None) -> int:
+        players = [p for p in self.on_court[team] if p != exclude]
+        weights = [SLOT_WEIGHTS[self.teams[team][2].index(p)] for p in players]
+        return self.rng.choices(players, weights=weights)[0]
+
+    def attacking_side(self, team: int) -> str:
+        second_half = self.period > REGULATION_PERIODS // 2
+        return "left" if (team == 0) != second_half else "right"
+
+    def substitute(self):
+        for team in (0, 1):
+            if self.last_sub[team] is not None and self.game_seconds() - self.last_sub[team] < MIN_SECONDS_BETWEEN_SUBS:
+                continue
+            bench = [p for p in self.teams[team][2] if p not in self.on_court[team]]
+            for _ in range(self.rng.randint(1, 2)):
+                out = self.rng.choice(self.on_court[team])
+                # starters come back in more often than the end of the bench
+                weights = [SLOT_WEIGHTS[self.teams[team][2].index(p)] for p in bench]
+                sub_in = self.rng.choices(bench, weights=weights)[0]
+                self.emit("substitution", "out", team, out)
+                self.emit("substitution", "in", team, sub_in)
+                self.on_court[team][self.on_court[team].index(out)] = sub_in
+                bench[bench.index(sub_in)] = out
+            self.last_sub[team] = self.game_seconds()
+
+    # approximate seconds since tip off (overtimes counted as full periods), only used to space out substitutions
+    def game_seconds(self) -> float:
+        return self.period * REGULATION_PERIOD_SECONDS - self.clock
+
+    def free_throws(self, shooter: int, attempts: int) -> bool:
+        team = self.offense
+        made = False
+        for attempt in range(1, attempts + 1):
+            made = self.rng.random() < FREE_THROW_PCT
+            self.stats[team]["fta"] += 1
+            if made:
+                self.stats[team]["ftm"] += 1
+                self.score[team] += 1
+            self.emit("freethrow", f"{attempt} of {attempts}", team, shooter, shotResult="Made" if made else "Missed")
+        return made
+
+    def rebound(self, team: int) -> bool:
+        offensive = self.rng.random() < OFFENSIVE_REBOUND_RATE
+        rebounding_team = team if offensive else 1 - team
+        self.stats[rebounding_team]["oreb" if offensive else "dreb"] += 1
+        self.emit("rebound", "offensive" if offensive else "defensive", rebounding_team, self.pick(rebounding_team))
+        return offensive
+
+    def shot(self) -> bool:
+        team, defense = self.offense, 1 - self.offense
+        shooter = self.pick(team)
+        area, _, value, make_pct, sub_types = self.rng.choices(SHOT_ZONES, weights=[z[1] for z in SHOT_ZONES])[0]
+        fouled = self.rng.random() < SHOOTING_FOUL_RATE
+        made = self.rng.random() < make_pct * (0.55 if fouled else 1.0)
+        if fouled and not made:
+            fouler = self.pick(defense)
+            self.stats[defense]["pf"] += 1
+            self.emit("foul", "personal", defense, fouler, descriptor="shooting", foulDrawnPersonId=shooter)
+            return self.free_throws(shooter, value) or not self.rebound(team)
+
+        x, y = _shot_location(self.rng, area)
+        side = self.attacking_side(team)
+        feed_x, feed_y = _feed_coordinates(x, y, side)
+        fields = {"isFieldGoal": 1, "side": side, "descriptor": None, "x": feed_x, "y": feed_y, "area": area,
+                  "areaDetail": None, "shotDistance": round(math.hypot(x, y), 1), "shotResult": "Made" if made else "Missed"}
+        self.stats[team]["fga"] += 1
+        self.stats[team]["fg3a"] += value == 3
+        if made:
+            self.score[team] += value
+            self.stats[team]["fgm"] += 1
+            self.stats[team]["fg3m"] += value == 3
+            if self.rng.random() < ASSIST_RATE:
+                self.stats[team]["ast"] += 1
+                fields["assistPersonId"] = self.pick(team, exclude=shooter)
+        elif self.rng.random() < BLOCK_RATE:
+            self.stats[defense]["blk"] += 1
+            fields["blockPersonId"] = self.pick(defense)
+        self.emit(f"{value}pt", self.rng.choice(sub_types), team, shooter, **fields)
+        if made and fouled:
+            fouler = self.pick(defense)
+            self.stats[defense]["pf"] += 1
+            self.emit("foul", "personal", defense, fouler, descriptor="shooting", foulDrawnPersonId=shooter)
+            return self.free_throws(shooter, 1) or not self.rebound(team)
+        return made or not self.rebound(team)
+
+    # --- one possession, returns whether the ball changes hands
+    def possession(self) -> bool:
+        team, defense = self.offense, 1 - self.offense
+        if self.rng.random() < TURNOVER_RATE:
+            self.stats[team]["tov"] += 1
+            person = None if self.rng.random() < TEAM_TURNOVER_SHARE else self.pick(team)
+            fields = {}
+            if person is not None and self.rng.random() < STEAL_SHARE:
+                self.stats[defense]["stl"] += 1
+                fields["stealPersonId"] = self.pick(defense)
+            self.emit("turnover", self.rng.choice(TURNOVER_SUBTYPES), team, person, **fields)
+            return True
+        if self.rng.random() < NON_SHOOTING_FOUL_RATE:
+            self.stats[defense]["pf"] += 1
+            self.emit("foul", "personal", defense, self.pick(defense), foulDrawnPersonId=self.pick(team))
+            return False
+        # offensive rebounds keep the possession going with another attempt, each costing a few seconds
+        while True:
+            if self.shot():
+                return True
+            self.clock -= self.rng.uniform(2.0, 8.0)
+            if self.clock <= 0:
+                return True
+
+    def play_period(self, length: int, tip_winner: int):
+        self.clock = float(length)
+        self.offense = tip_winner if self.period % 2 == 1 else 1 - tip_winner
+        self.emit("period", "start")
+        if self.period == 1:
+            self.emit("jumpball", "recovered", tip_winner, None,
+                      jumpBallWonPersonId=self.teams[tip_winner][2][4], jumpBallLostPersonId=self.teams[1 - tip_winner][2][4])
+        dead_ball = False
+        while True:
+            if dead_ball and self.rng.random() < SUBSTITUTION_RATE:
+                self.substitute()
+            self.clock -= self.rng.uniform(6.0, 20.0)
+            if self.clock <= 0:
+                break
+            events_before = len(self.actions)
+            if self.possession():
+                self.offense = 1 - self.offense
+                # like the live feed, the action that ends a possession already carries the team getting the ball. a
+                # possession cut off by the clock isn't handed over, the next period decides who has it
+                if len(self.actions) > events_before and self.clock > 0:
+                    self.actions[-1]["possession"] = self.teams[self.offense][0]
+            # substitutions only happen on a dead ball: after free throws, fouls, turnovers and made baskets
+            last = self.actions[-1] if len(self.actions) > events_before else {}
+            dead_ball = last.get("actionType") in ("freethrow", "foul", "turnover") or last.get("shotResult") == "Made"
+        self.clock = 0.0
+        self.emit("period", "end")
+
+    def play(self) -> list[dict]:
+        tip_winner = self.rng.randint(0, 1)
+        for period in range(1, REGULATION_PERIODS + 1):
+            self.period = period
+            self.play_period(REGULATION_PERIOD_SECONDS, tip_winner)
+        while self.score[0] == self.score[1]:
+            self.period += 1
+            self.play_period(OVERTIME_PERIOD_SECONDS, tip_winner)
+        self.emit("game", "end")
+        return self.actions
+
+    def performance_rows(self, game_id: int) -> list[tuple]:
+        overtimes = self.period - REGULATION_PERIODS
+        rows = []
+        for team, (team_id, tricode, _) in enumerate(self.teams):
+            s = self.stats[team]
+            opponent = 1 - team
+            pct = lambda made, attempts: round(made / attempts, 3) if attempts else None
+            rows.append((game_id, team_id, tricode, 240 + 25 * overtimes, self.score[team], overtimes > 0,
+                         s["fgm"], s["fga"], pct(s["fgm"], s["fga"]), s["fg3m"], s["fg3a"], pct(s["fg3m"], s["fg3a"]),
+                         s["ftm"], s["fta"], pct(s["ftm"], s["fta"]), s["oreb"], s["dreb"], s["oreb"] + s["dreb"],
+                         s["ast"], s["stl"], s["blk"], s["tov"], s["pf"], self.score[team] - self.score[opponent]))
+        return rows
+
+class SyntheticDataLoader:
+    def __init__(self, db_connection, seasons: int, games_per_season: int = GAMES_PER_SEASON, seed: int = 0,
+                 metrics: LoadMetrics | None = None):
+        self.conn = db_connection
+        self.seasons = seasons
+        self.games_per_season = games_per_season
+        self.seed = seed
+        self.metrics = metrics or LoadMetrics("synthetic")
+        team_loader = TeamLoader(db_connection, metrics=self.metrics)
+        self.teams = [(team_loader.abrev_id_map[abrev], abrev, roster(index)) for index, abrev in enumerate(CURRENT_TEAMS)]
+
+    # --- modern_team_index comes from TeamLoader's static maps (no api call), players are synthetic roster slots
+    def load_reference_data(self):
+        rows = [(player_id, f"Synthetic {abrev} {slot + 1}", "Synthetic", f"{abrev} {slot + 1}", True)
+                for _, abrev, players in self.teams for slot, player_id in enumerate(players)]
+        with self.conn.transaction():
+            with self.conn.cursor() as cur:
+                TeamLoader(self.conn, metrics=self.metrics).load_modern_teams(cur)
+                result = self.metrics.timed_write(lambda: bulk_upsert(cur, "player", ["id", "full_name", "first_name", "last_name", "is_active"], ["id"], rows))
+        logger.info(f"SYNTHETIC PLAYERS: {result.inserted} INSERTED, {result.updated} UPDATED")
+
+    # --- schedule for one season, every game a random pairing one day apart per 15 games like a real slate
+    def schedule(self, rng: random.Random, season_index: int) -> list[tuple]:
+        season_id = synthetic_season_id(season_index)
+        opening_night = date(SYNTHETIC_SEASON_YEAR + season_index, 10, 20)
+        games = []
+        for number in range(self.games_per_season):
+            home, away = rng.sample(range(len(self.teams)), 2)
+            game_id = SYNTHETIC_GAME_BASE + season_index * 100000 + number + 1
+            games.append((game_id, season_id, home, away, opening_night + timedelta(days=number // 15)))
+        return games
+
+    def load_season(self, season_index: int, pbp_loader: PBPDataLoader) -> int:
+        rng = random.Random(f"{self.seed}-{season_index}")
+        simulated = []
+        with self.metrics.transform():
+            for game_id, season_id, home, away, game_date in self.schedule(rng, season_index):
+                game = SyntheticGame(rng, [self.teams[home], self.teams[away]])
+                actions = pd.DataFrame(game.play(), columns=FEED_COLUMNS)
+                winner = self.teams[home][0] if game.score[0] > game.score[1] else self.teams[away][0]
+                game_row = (game_id, season_id, self.teams[home][0], self.teams[home][1], self.teams[away][0], self.teams[away][1],
+                            game_date, "regular", winner)
+                simulated.append((game_row, game.performance_rows(game_id), actions))
+
+        # games (and their official box scores) must exist before the events that reference them
+        season_id = synthetic_season_id(season_index)
+        with self.conn.transaction():
+            with self.conn.cursor() as cur:
+                self.metrics.timed_write(lambda: bulk_upsert(cur, "game", GAME_COLUMNS, ["id"], [g[0] for g in simulated]))
+                self.metrics.timed_write(lambda: bulk_upsert(cur, "game_team_performance", GAME_TEAM_PERFORMANCE_COLUMNS, ["game_id", "team_id"],
+                                                             [row for g in simulated for row in g[1]]))
+                bump_data_version(cur, [season_id])
+
+        events = 0
+        for count, (game_row, _, actions) in enumerate(simulated, start=1):
+            # same tuple layout load_pbp_data reads from the game table
+            game = (game_row[0], game_row[7], game_row[1], game_row[2], game_row[4], game_row[3], game_row[5], game_row[6])
+            with self.metrics.transform():
+                rows = pbp_loader.build_event_rows(actions, game)
+            pbp_loader.store_game_events(game_row[0], season_id, rows)
+            self.metrics.increment("games")
+            self.metrics.increment("events", len(actions))
+            events += len(actions)
+            if count % 100 == 0:
+                logger.info(f"SEASON {season_id}: STORED {count} OF {len(simulated)} GAMES")
+        return events
+
+    def load(self) -> dict:
+        self.load_reference_data()
+        pbp_loader = PBPDataLoader(self.conn, update=False, whole_current_season=False, metrics=self.metrics)
+        # close the implicit read transaction from the player id lookup so each game commits on its own
+        self.conn.commit()
+        events = 0
+        for season_index in range(self.seasons):
+            logger.info(f"GENERATING SYNTHETIC SEASON {synthetic_season_id(season_index)} ({season_index + 1} OF {self.seasons})")
+            events += self.load_season(season_index, pbp_loader)
+        return {"games": self.seasons * self.games_per_season, "events": events}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic seasons of games and play-by-play for scale testing")
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--games-per-season", type=int, default=GAMES_PER_SEASON)
+    parser.add_argument("--seed", type=int, default=0, help="same seed, same games")
+    parser.add_argument("--skip-rollups", action="store_true", help="don't refresh the season rollups afterwards")
+    args = parser.parse_args()
+
+    DB_URL = settings.DATABASE_URL_RW
+    metrics = LoadMetrics("synthetic")
+    try:
+        with metrics.stage("synthetic"):
+            with psycopg.connect(DB_URL) as conn:
+                SyntheticDataLoader(conn, args.seasons, args.games_per_season, args.seed, metrics=metrics).load()
+        if not args.skip_rollups:
+            with metrics.stage("rollups"):
+                with psycopg.connect(DB_URL) as conn:
+                    refresh_rollups(conn, metrics)
+    except Exception as e:
+        with psycopg.connect(DB_URL) as conn:
+            metrics.finish(conn, "failed", error=str(e))
+        raise
+
+    with psycopg.connect(DB_URL) as conn:
+        metrics.finish(conn, "succeeded")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+
+# app.core.config builds its Settings at import time, the tests never connect anywhere so placeholders are enough
+for name in ("JWT_SECRET_KEY", "DATABASE_URL", "DATABASE_URL_RW", "DATABASE_URL_AUTH_RO", "DATABASE_URL_MIGRATIONS", "OPENAI_API_KEY"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("SCHEMA_PATH", os.path.join(os.path.dirname(__file__), "..", "app", "constants", "schema.txt"))
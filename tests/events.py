@@ -0,0 +1,40 @@
+# compact builders for game event frames in the shape PBPDataLoader.build_event_rows produces (PBP_COLUMNS), so the
+# derived table builders can be tested without the nba api
+import pandas as pd
+from loaders.derived import REGULATION_PERIODS, REGULATION_PERIOD_SECONDS, OVERTIME_PERIOD_SECONDS
+from loaders.loadPBP import PBP_COLUMNS
+
+GAME_ID = 22500001
+SEASON_ID = 22025
+HOME, AWAY = 1610612747, 1610612738
+HOME_ABREV, AWAY_ABREV = "LAL", "BOS"
+
+def elapsed(period: int, clock_seconds: float) -> float:
+    if period <= REGULATION_PERIODS:
+        return (period - 1) * REGULATION_PERIOD_SECONDS + REGULATION_PERIOD_SECONDS - clock_seconds
+    overtime = period - REGULATION_PERIODS - 1
+    return REGULATION_PERIODS * REGULATION_PERIOD_SECONDS + overtime * OVERTIME_PERIOD_SECONDS + OVERTIME_PERIOD_SECONDS - clock_seconds
+
+# each action is a dict of the PBP_COLUMNS it sets, event numbers follow list order and scores / the period carry
+# forward from the previous action unless given
+def pbp_events(actions: list[dict]) -> pd.DataFrame:
+    rows = []
+    home_score = away_score = 0
+    period = 1
+    for event_num, action in enumerate(actions, start=1):
+        row = dict.fromkeys(PBP_COLUMNS)
+        home_score = action.get("home_score", home_score)
+        away_score = action.get("away_score", away_score)
+        period = action.get("period", period)
+        row.update(
+            game_id=GAME_ID, season_id=SEASON_ID, season_type="regular", event_num=event_num, period=period,
+            home_score=home_score, away_score=away_score, home_team_id=HOME, away_team_id=AWAY,
+            home_team_abrev=HOME_ABREV, away_team_abrev=AWAY_ABREV, is_overtime=period > REGULATION_PERIODS,
+        )
+        row.update(action)
+        if row["clock_seconds"] is not None:
+            row["game_seconds_elapsed"] = elapsed(period, row["clock_seconds"])
+        if row["event_team_id"] is not None:
+            row["event_team_abrev"] = HOME_ABREV if row["event_team_id"] == HOME else AWAY_ABREV
+        rows.append(row)
+    return pd.DataFrame(rows, columns=PBP_COLUMNS)
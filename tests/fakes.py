@@ -0,0 +1,122 @@
+# stand-ins for psycopg cursors / connections, recording what the loaders send instead of talking to postgres
+from contextlib import asynccontextmanager, contextmanager
+
+class FakeCopy:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def write_row(self, row):
+        self.cursor.copied.append(tuple(row))
+
+class FakeCursor:
+    def __init__(self, fetchone=None, fetchall=None, rowcount=0):
+        self.statements = []
+        self.copied = []
+        self._fetchone = list(fetchone or [])
+        self._fetchall = fetchall or []
+        self.rowcount = rowcount
+
+    def execute(self, query, params=None):
+        self.statements.append(query if isinstance(query, str) else query.as_string(None))
+
+    @contextmanager
+    def copy(self, query):
+        self.statements.append(query if isinstance(query, str) else query.as_string(None))
+        yield FakeCopy(self)
+
+    def fetchone(self):
+        return self._fetchone.pop(0) if self._fetchone else None
+
+    def fetchall(self):
+        return self._fetchall
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class FakeConnection:
+    def __init__(self, cursor: FakeCursor | None = None):
+        self.cur = cursor or FakeCursor()
+
+    def cursor(self):
+        return self.cur
+
+    @contextmanager
+    def transaction(self):
+        yield
+
+    def commit(self):
+        pass
+
+class FakeAsyncCopy:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+class FakeAsyncCursor:
+    def __init__(self, columns=None, rows=None, fetchone=None, error: Exception | None = None, copy_chunks=None, rowcount=0):
+        self.rowcount = rowcount
+        self.copy_chunks = list(copy_chunks or [])
+        self.statements = []
+        self.params = []
+        self.description = [(name,) for name in columns or []]
+        self.rows = list(rows or [])
+        self._fetchone = list(fetchone or [])
+        self.error = error
+
+    async def execute(self, query, params=None):
+        self.statements.append(query if isinstance(query, str) else query.as_string(None))
+        self.params.append(params)
+        if self.error is not None and not self.statements[-1].startswith("SET"):
+            raise self.error
+
+    @asynccontextmanager
+    async def copy(self, query):
+        await self.execute(query)
+        yield FakeAsyncCopy(self.copy_chunks)
+
+    async def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    async def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    async def fetchone(self):
+        return self._fetchone.pop(0) if self._fetchone else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeAsyncConnection:
+    def __init__(self, cursor: FakeAsyncCursor | None = None):
+        self.cur = cursor or FakeAsyncCursor()
+
+    def cursor(self, name=None):
+        return self.cur
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+class FakeAsyncPool:
+    def __init__(self, connection: FakeAsyncConnection):
+        self.conn = connection
+        self.in_use = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        self.in_use += 1
+        try:
+            yield self.conn
+        finally:
+            self.in_use -= 1
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import logging
+import duckdb
+import psycopg
+import pytest
+from app.services.analytics import MANIFEST_NAME, AnalyticsEngine
+from app.services.data_version import DataVersions
+from app.services.oracle import Oracle
+from tests.fakes import FakeAsyncConnection, FakeAsyncCursor
+
+def write_snapshot(directory, name: str, data_version: int, rows: list[tuple]):
+    snapshot = directory / name
+    snapshot.mkdir()
+    db = duckdb.connect()
+    db.execute("CREATE TABLE player_game_box (player_id BIGINT, season_id INTEGER, pts INTEGER, field_goals_attempted INTEGER)")
+    db.executemany("INSERT INTO player_game_box VALUES (?, ?, ?, ?)", rows)
+    db.execute(f"COPY player_game_box TO '{snapshot / 'player_game_box.parquet'}' (FORMAT parquet)")
+    (directory / MANIFEST_NAME).write_text(json.dumps({"snapshot": name, "data_version": data_version, "tables": ["player_game_box"]}))
+
+def engine_for(tmp_path, data_version: int = 1) -> AnalyticsEngine:
+    versions = DataVersions()
+    versions.apply(22025, data_version)
+    write_snapshot(tmp_path, "s1", data_version, [(1, 22025, 30, 20), (1, 22025, 21, 0), (2, 22025, 7, 4)])
+    return AnalyticsEngine(str(tmp_path), versions)
+
+def test_only_fresh_aggregate_queries_over_snapshot_tables_are_served(tmp_path):
+    engine = engine_for(tmp_path)
+    serve = lambda query: asyncio.run(engine.can_serve(query))
+    assert serve("SELECT player_id, avg(pts) FROM player_game_box GROUP BY player_id")
+    assert not serve("SELECT pts FROM player_game_box WHERE player_id = 1")
+    assert not serve("SELECT count(*) FROM game")
+    assert serve("WITH t AS (SELECT * FROM player_game_box) SELECT count(*) FROM t")
+    engine.versions.apply(22025, 2)
+    assert not serve("SELECT count(*) FROM player_game_box")
+
+def test_integer_division_truncates_like_postgres(tmp_path):
+    engine = engine_for(tmp_path)
+    asyncio.run(engine.can_serve("SELECT count(*) FROM player_game_box"))
+    result = asyncio.run(engine.run("SELECT sum(pts) / count(*) AS ppg FROM player_game_box WHERE player_id = 1"))
+    assert result["rows"] == [(25,)]
+
+def test_snapshot_settings_are_locked(tmp_path):
+    engine = engine_for(tmp_path)
+    asyncio.run(engine.can_serve("SELECT count(*) FROM player_game_box"))
+    with pytest.raises(duckdb.Error):
+        engine._db.cursor().execute("SET integer_division = false")
+
+def test_non_finite_results_fall_back_to_postgres(tmp_path):
+    engine = engine_for(tmp_path)
+    query = "SELECT player_id, power(10.0, max(pts)) AS scale FROM player_game_box GROUP BY player_id ORDER BY player_id"
+    oracle = Oracle(logger=logging.getLogger("test"), schema="", client=None, analytics=engine)
+    conn = FakeAsyncConnection(FakeAsyncCursor())
+    assert asyncio.run(oracle.execute_sql(query, conn))["rows"] == [(1, 1e30), (2, 1e7)]
+    assert conn.cur.statements == []
+
+    # duckdb overflows to Infinity where postgres raises, so postgres is asked instead
+    write_snapshot(tmp_path, "s2", 1, [(1, 22025, 400, 0)])
+    engine._manifest_mtime = None
+    conn = FakeAsyncConnection(FakeAsyncCursor(error=psycopg.errors.NumericValueOutOfRange("value out of range: overflow")))
+    assert asyncio.run(oracle.execute_sql(query, conn)) == {}
+    assert conn.cur.statements[-1] == query
+
+def test_a_new_manifest_is_picked_up(tmp_path):
+    engine = engine_for(tmp_path)
+    asyncio.run(engine.can_serve("SELECT count(*) FROM player_game_box"))
+    assert engine.manifest["snapshot"] == "s1"
+    write_snapshot(tmp_path, "s2", 1, [(3, 22025, 10, 5)])
+    engine._manifest_mtime = None
+    assert asyncio.run(engine.can_serve("SELECT count(*) FROM player_game_box"))
+    assert asyncio.run(engine.run("SELECT count(*) FROM player_game_box"))["rows"] == [(1,)]
@@ -0,0 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+import app.services.audit as audit
+from app.services.audit import AuditWriter, normalize_question, sql_hash
+from app.services.metrics import registry
+
+def counter(name: str) -> float:
+    return registry.counters.get((name, ()), 0)
+
+class BrokenPool:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        self.calls += 1
+        raise self.error
+        yield
+
+def test_normalized_questions_and_sql_hashes_group_rephrasings():
+    assert normalize_question("  Who led the league in  assists?? ") == "who led the league in assists"
+    assert sql_hash("SELECT 1\n  FROM game") == sql_hash("select 1 from game")
+    assert sql_hash(None) is None
+
+def test_a_failed_batch_is_counted_and_the_writer_keeps_running(monkeypatch):
+    pool = BrokenPool(TimeoutError("couldn't get a connection after 30 sec"))
+    monkeypatch.setattr(audit, "get_async_pool_rw", lambda: pool)
+    writer = AuditWriter(queue_size=10, batch_size=2, flush_seconds=0.01)
+    dropped, failed = counter("oracle_audit_dropped_total"), counter("oracle_audit_failed_batches_total")
+
+    async def scenario():
+        task = asyncio.create_task(writer.run())
+        for record in [("a",), ("b",), ("c",)]:
+            writer.queue.put_nowait(record)
+        while pool.calls < 2:
+            await asyncio.sleep(0.01)
+        assert not task.done()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert counter("oracle_audit_dropped_total") - dropped == 3
+    assert counter("oracle_audit_failed_batches_total") - failed == 2
@@ -0,0 +1,68 @@
+import logging
+from loaders.buildBoxScores import PlayerBoxScoreBuilder, TeamBoxScoreBuilder
+from tests.events import AWAY, HOME, pbp_events
+from tests.fakes import FakeCursor
+
+EVENTS = pbp_events([
+    {"event_type": "period", "event_subtype": "start", "clock_seconds": 720},
+    {"event_type": "2pt", "shot_made": True, "event_team_id": HOME, "shooter_id": 101, "assister_id": 102, "clock_seconds": 700, "home_score": 2},
+    {"event_type": "3pt", "shot_made": False, "event_team_id": AWAY, "shooter_id": 201, "blocker_id": 103, "clock_seconds": 680},
+    {"event_type": "rebound", "event_team_id": HOME, "rebounder_id": 104, "offensive_rebound": False, "clock_seconds": 678},
+    {"event_type": "turnover", "event_team_id": HOME, "turnover_id": 101, "stealer_id": 202, "clock_seconds": 660},
+    {"event_type": "foul", "event_team_id": HOME, "fouler_id": 105, "foul_drawn_id": 203, "clock_seconds": 650},
+    {"event_type": "freethrow", "event_subtype": "1 of 2", "shot_made": True, "event_team_id": AWAY, "shooter_id": 203, "clock_seconds": 650, "away_score": 1},
+    {"event_type": "freethrow", "event_subtype": "2 of 2", "shot_made": False, "event_team_id": AWAY, "shooter_id": 203, "clock_seconds": 650},
+    {"event_type": "rebound", "event_team_id": AWAY, "team_rebound": True, "offensive_rebound": True, "clock_seconds": 650},
+    {"event_type": "3pt", "shot_made": True, "event_team_id": AWAY, "shooter_id": 204, "clock_seconds": 630, "away_score": 4},
+    {"event_type": "turnover", "event_team_id": HOME, "team_turnover": True, "clock_seconds": 620},
+    {"event_type": "period", "event_subtype": "end", "clock_seconds": 0},
+])
+
+def test_player_box_counts_each_actor():
+    box = PlayerBoxScoreBuilder().build(EVENTS).set_index("player_id")
+    assert box.loc[101, ["pts", "field_goals_made", "turnovers"]].tolist() == [2, 1, 1]
+    assert box.loc[102, "assists"] == 1 and box.loc[103, "blocks"] == 1 and box.loc[202, "steals"] == 1
+    assert box.loc[104, ["defensive_rebounds", "total_rebounds"]].tolist() == [1, 1]
+    assert box.loc[203, ["free_throws_made", "free_throws_attempted", "pts"]].tolist() == [1, 2, 1]
+    assert box.loc[201, ["three_pointers_attempted", "three_pointers_made"]].tolist() == [1, 0]
+    assert box.loc[105, "personal_fouls"] == 1
+    assert not box.loc[202, "is_home"] and box.loc[202, "opponent_team_id"] == HOME
+
+def test_team_box_counts_team_actions_and_matches_the_score():
+    box = TeamBoxScoreBuilder().build(EVENTS).set_index("team_id")
+    assert box.loc[HOME, "pts"] == 2 and box.loc[AWAY, "pts"] == 4
+    # the team turnover has no player, it still counts for the team
+    assert box.loc[HOME, "turnovers"] == 2
+    assert box.loc[HOME, "plus_minus"] == -2 and box.loc[AWAY, "plus_minus"] == 2
+
+def test_player_points_add_up_to_team_points():
+    players = PlayerBoxScoreBuilder().build(EVENTS).groupby("team_id")["pts"].sum()
+    teams = TeamBoxScoreBuilder().build(EVENTS).set_index("team_id")["pts"]
+    assert players.to_dict() == teams.to_dict()
+
+def test_actions_without_a_team_use_the_players_team_from_elsewhere_in_the_game(caplog):
+    events = EVENTS.copy()
+    # the feed left the team off 101's turnover and off a rebound by a player seen nowhere else
+    events.loc[events["turnover_id"] == 101, "event_team_id"] = None
+    events.loc[events["event_num"] == 4, ["event_team_id", "rebounder_id"]] = [None, 199]
+    with caplog.at_level(logging.WARNING, logger="loaders.buildBoxScores"):
+        box = PlayerBoxScoreBuilder().build(events).set_index("player_id")
+    assert box.loc[101, ["team_id", "turnovers"]].tolist() == [HOME, 1]
+    # neither 199 nor the stealer 202 (whose team came from the turnover) shows up anywhere else
+    assert 199 not in box.index and 202 not in box.index
+    assert "DROPPING 2 PLAYER BOX SCORE ACTIONS WITH NO TEAM" in caplog.text
+
+def test_team_plus_minus_comes_from_the_final_score_when_only_one_team_has_rows():
+    events = pbp_events([
+        {"event_type": "period", "event_subtype": "start", "clock_seconds": 720},
+        {"event_type": "2pt", "shot_made": True, "event_team_id": HOME, "shooter_id": 101, "clock_seconds": 700, "home_score": 2},
+        {"event_type": "timeout", "clock_seconds": 690, "away_score": 3},
+    ])
+    box = TeamBoxScoreBuilder().build(events).set_index("team_id")
+    assert box.index.tolist() == [HOME]
+    assert box.loc[HOME, "plus_minus"] == -1
+
+def test_team_box_reconciliation_only_rewrites_stale_flags():
+    cur = FakeCursor()
+    TeamBoxScoreBuilder().after_write(cur, 22500001)
+    assert "AND t.matches_official IS DISTINCT FROM ((t.pts," in cur.statements[0]
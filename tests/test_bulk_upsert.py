@@ -0,0 +1,51 @@
+import numpy as np
+from loaders.bulkUpsert import _to_python, bulk_upsert, merge_rows
+from tests.fakes import FakeCursor
+
+COLUMNS = ["game_id", "event_num", "home_score"]
+KEYS = ["game_id", "event_num"]
+
+def test_to_python_normalizes_numpy_and_nan():
+    assert _to_python(np.int64(7)) == 7 and type(_to_python(np.int64(7))) is int
+    assert _to_python(np.float64(1.5)) == 1.5
+    assert _to_python(float("nan")) is None
+    assert _to_python(np.float64("nan")) is None
+    assert _to_python(None) is None
+    assert _to_python("PT12M00.00S") == "PT12M00.00S"
+
+def test_bulk_upsert_stages_then_upserts_only_changed_rows():
+    cur = FakeCursor(fetchone=[(2, 1)])
+    result = bulk_upsert(cur, "pbp_raw_event", COLUMNS, KEYS, [(1, 1, np.int64(2)), (1, 2, float("nan")), (1, 3, 5)])
+    assert (result.staged, result.inserted, result.updated, result.changed) == (3, 2, 1, 3)
+    assert cur.copied == [(1, 1, 2), (1, 2, None), (1, 3, 5)]
+    upsert = cur.statements[-1]
+    assert 'ON CONFLICT ("game_id", "event_num") DO UPDATE SET "home_score" = EXCLUDED."home_score"' in upsert
+    # unchanged rows aren't rewritten
+    assert 'WHERE ("pbp_raw_event"."home_score") IS DISTINCT FROM (EXCLUDED."home_score")' in upsert
+    assert 'SELECT DISTINCT ON ("game_id", "event_num")' in upsert
+
+def test_bulk_upsert_skips_the_upsert_for_an_empty_batch():
+    cur = FakeCursor()
+    result = bulk_upsert(cur, "pbp_raw_event", COLUMNS, KEYS, [])
+    assert result.staged == 0 and result.changed == 0
+    assert not any(s.startswith("WITH upserted") for s in cur.statements)
+
+def test_bulk_upsert_without_update_columns_does_nothing_on_conflict():
+    cur = FakeCursor(fetchone=[(1, 0)])
+    bulk_upsert(cur, "player", ["id"], ["id"], [(1,)])
+    assert "DO NOTHING" in cur.statements[-1]
+
+def test_merge_rows_deletes_rows_missing_from_the_batch_within_the_scope():
+    cur = FakeCursor(fetchone=[(0, 1)], rowcount=4)
+    result = merge_rows(cur, "pbp_raw_event", COLUMNS, KEYS, {"game_id": 22500001, "season_id": 22025}, [(22500001, 1, 0)])
+    delete = next(s for s in cur.statements if s.startswith("DELETE"))
+    assert '"pbp_raw_event"."game_id" = 22500001 AND "pbp_raw_event"."season_id" = 22025' in delete
+    assert 'NOT EXISTS (SELECT 1 FROM "_stage_pbp_raw_event" s WHERE s."game_id" = "pbp_raw_event"."game_id" AND s."event_num" = "pbp_raw_event"."event_num")' in delete
+    assert (result.deleted, result.inserted, result.updated) == (4, 0, 1)
+
+def test_merge_rows_with_an_empty_batch_clears_the_scope():
+    cur = FakeCursor(rowcount=3)
+    result = merge_rows(cur, "possessions", COLUMNS, KEYS, {"game_id": 1}, [])
+    assert result.deleted == 3 and result.inserted == 0
+    assert not any(s.startswith("WITH upserted") for s in cur.statements)
+    assert result.changed == 3
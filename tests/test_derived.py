@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from loaders.derived import DerivedTableBuilder, frame_rows, write_derived
+from loaders.instrumentation import LoadMetrics
+from loaders.loadPBP import PBPDataLoader
+from tests.fakes import FakeConnection, FakeCursor
+
+def test_builders_must_implement_build():
+    class Incomplete(DerivedTableBuilder):
+        table = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_every_registered_builder_is_complete():
+    loader = PBPDataLoader(FakeConnection(), update=True, whole_current_season=False)
+    for builder in loader.derived_builders:
+        assert isinstance(builder, DerivedTableBuilder)
+        assert builder.table and set(builder.key_columns) <= set(builder.columns)
+
+def test_frame_rows_selects_columns_and_nulls_missing_values():
+    df = pd.DataFrame({"b": [np.int64(1), pd.NA], "a": [np.nan, 2.5], "extra": [0, 0]})
+    assert frame_rows(df, ["a", "b"]) == [(None, 1), (2.5, None)]
+    assert frame_rows(df.iloc[0:0], ["a", "b"]) == []
+
+def test_write_derived_appends_without_deleting_the_rest_of_the_game():
+    class Constant(DerivedTableBuilder):
+        table = "constant"
+        columns = ["game_id", "n"]
+        key_columns = ["game_id", "n"]
+
+        def build(self, events):
+            return pd.DataFrame({"game_id": [1], "n": [1]})
+
+    cur = FakeCursor(fetchone=[(1, 0)])
+    write_derived(cur, Constant(), 1, pd.DataFrame(), LoadMetrics("test"), append=True)
+    assert not any(s.startswith("DELETE") for s in cur.statements)
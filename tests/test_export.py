@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+import app.services.export as export
+from app.core.config import settings
+from app.main import app
+from app.models.user import UserInDB
+from app.services.auth_service import get_current_active_user
+from app.services.export import ExportBusy, bounded, rollup_query, start_stream, stream_csv
+from app.services.rate_limiting import limiter
+from tests.fakes import FakeAsyncConnection, FakeAsyncCursor, FakeAsyncPool
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakeAsyncPool(FakeAsyncConnection(FakeAsyncCursor(copy_chunks=[b"player_id,pts\n", b"1,30\n", b"2,7\n"])))
+    monkeypatch.setattr(export, "get_async_pool_ro", lambda: pool)
+    monkeypatch.setattr(export, "export_slots", asyncio.Semaphore(settings.EXPORT_MAX_CONCURRENT))
+    return pool
+
+@pytest.fixture
+def client(pool, monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    app.dependency_overrides[get_current_active_user] = lambda: UserInDB(email="test@example.com", full_name="test", password_hash="-")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in await start_stream(chunks)])
+
+def test_rollup_exports_are_bounded():
+    query = bounded(rollup_query("mv_assist_pairs", 22025)).as_string(None)
+    assert query == f'SELECT * FROM (SELECT * FROM "mv_assist_pairs" WHERE season_id = 22025) AS export LIMIT {settings.EXPORT_MAX_ROWS}'
+
+def test_csv_export_runs_read_only_with_timeouts(pool):
+    body = asyncio.run(collect(stream_csv(bounded("SELECT player_id, pts FROM player_game_box"))))
+    assert body == b"player_id,pts\n1,30\n2,7\n"
+    statements = pool.conn.cur.statements
+    assert statements[0] == "SET TRANSACTION READ ONLY;"
+    assert f"SET LOCAL idle_in_transaction_session_timeout = '{settings.EXPORT_IDLE_TIMEOUT_SECONDS}s'" in statements
+    assert statements[-1].startswith("COPY (SELECT * FROM (SELECT player_id, pts FROM player_game_box) AS export LIMIT")
+    assert pool.in_use == 0
+
+def test_exports_past_the_concurrency_limit_are_rejected(pool, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_SLOT_WAIT_SECONDS", 0.01)
+
+    async def scenario():
+        export.export_slots = asyncio.Semaphore(1)
+        running = stream_csv(bounded("SELECT 1"))
+        await anext(running)
+        with pytest.raises(ExportBusy):
+            await collect(stream_csv(bounded("SELECT 2")))
+        await running.aclose()
+        # the slot is free again once the first stream is done
+        assert await collect(stream_csv(bounded("SELECT 3")))
+
+    asyncio.run(scenario())
+    assert pool.in_use == 0
+
+def test_exports_stop_at_the_deadline(pool, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_MAX_SECONDS", -1)
+    monkeypatch.setattr(export, "CSV_CHUNK_BYTES", 1)
+    with pytest.raises(TimeoutError):
+        asyncio.run(collect(stream_csv(bounded("SELECT 1"))))
+    assert pool.in_use == 0
+
+def test_export_endpoint_streams_a_rollup_as_csv(client):
+    response = client.post("/export", json={"rollup": "mv_assist_pairs", "season_id": 22025})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="mv_assist_pairs_22025.csv"'
+    assert response.content == b"player_id,pts\n1,30\n2,7\n"
+
+def test_export_endpoint_answers_503_when_exports_are_busy(client, monkeypatch):
+    async def busy(chunks):
+        raise ExportBusy()
+    monkeypatch.setattr("app.api.export.start_stream", busy)
+    response = client.post("/export", json={"rollup": "mv_assist_pairs"})
+    assert response.status_code == 503 and response.headers["retry-after"] == "5"
+
+def test_export_requests_need_exactly_one_source(client):
+    assert client.post("/export", json={}).status_code == 422
+    assert client.post("/export", json={"question": "who scored most", "rollup": "mv_assist_pairs"}).status_code == 422
@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta, timezone
+import pandas as pd
+import psycopg
+import pytest
+from loaders.liveLoader import LiveGameLoader, LiveGameState, scoreboard_game
+from tests.fakes import FakeConnection, FakeCursor
+
+GAME_DATE = date(2026, 10, 19)
+
+def entry(game_id: str, status_text: str = "7:30 pm ET", tip_off: str = "2026-10-19T23:30:00Z") -> dict:
+    return {
+        "gameId": game_id, "gameStatus": 1, "gameStatusText": status_text, "gameTimeUTC": tip_off,
+        "homeTeam": {"teamId": 1610612747, "teamTricode": "LAL"},
+        "awayTeam": {"teamId": 1610612738, "teamTricode": "BOS"},
+    }
+
+def make_loader(cursor: FakeCursor | None = None) -> LiveGameLoader:
+    return LiveGameLoader(FakeConnection(cursor))
+
+def test_scoreboard_game_matches_the_game_table_tuple():
+    game = scoreboard_game(entry("0022500101"), GAME_DATE)
+    assert game == (22500101, "regular", 22025, 1610612747, 1610612738, "LAL", "BOS", GAME_DATE)
+    assert scoreboard_game(entry("0042500101"), GAME_DATE)[1:3] == ("playoff", 42025)
+
+def test_scoreboard_game_skips_preseason_and_postponed_games():
+    assert scoreboard_game(entry("0012500101"), GAME_DATE) is None
+    assert scoreboard_game(entry("0022500101", status_text="PPD"), GAME_DATE) is None
+
+def test_track_scheduled_games_reads_the_scoreboard_and_resumes_from_stored_actions(monkeypatch):
+    cur = FakeCursor(fetchone=[(2, 0)], fetchall=[(22500101, 40)])
+    loader = make_loader(cur)
+    monkeypatch.setattr(loader, "fetch_scoreboard", lambda: (GAME_DATE, [
+        entry("0022500101"), entry("0022500102"), entry("0022500103", status_text="PPD"), entry("0012500104"),
+    ]))
+    loader.track_scheduled_games()
+    assert sorted(loader.games) == [22500101, 22500102]
+    assert loader.games[22500101].last_action_number == 40
+    assert loader.games[22500102].last_action_number == 0
+    # placeholder game rows so the derived tables' foreign keys hold, never overwriting what the nightly loader stored
+    assert [row[0] for row in cur.copied] == [22500101, 22500102]
+    assert any('INSERT INTO "game"' in s and "DO NOTHING" in s for s in cur.statements)
+
+def feed(final: bool) -> pd.DataFrame:
+    actions = [(1, "period", "start"), (2, "2pt", "Jump Shot")]
+    if final:
+        actions.append((3, "game", "end"))
+    return pd.DataFrame(actions, columns=["actionNumber", "actionType", "subType"])
+
+def poll_ready(monkeypatch, loader: LiveGameLoader, df: pd.DataFrame):
+    monkeypatch.setattr(loader.pbp_loader, "fetch_game_actions", lambda game_id: df)
+    monkeypatch.setattr(loader.pbp_loader, "build_event_rows", lambda df, game: [])
+    monkeypatch.setattr(loader.pbp_loader, "store_derived", lambda *args, **kwargs: None)
+
+def test_poll_game_marks_a_game_final_only_after_the_write_commits(monkeypatch):
+    loader = make_loader(FakeCursor(fetchone=[(1,)]))
+    state = LiveGameState(scoreboard_game(entry("0022500101"), GAME_DATE), 0)
+    poll_ready(monkeypatch, loader, feed(final=True))
+
+    def failing_partition(cur, season_id):
+        raise psycopg.OperationalError("connection lost")
+    monkeypatch.setattr(loader.pbp_loader, "ensure_partition", failing_partition)
+    with pytest.raises(psycopg.OperationalError):
+        loader.poll_game(state)
+    assert not state.is_final and state.last_action_number == 0
+
+    monkeypatch.setattr(loader.pbp_loader, "ensure_partition", lambda cur, season_id: None)
+    assert loader.poll_game(state) == 3
+    assert state.is_final and state.last_action_number == 3
+
+def test_poll_game_rebuilds_a_final_feed_with_nothing_new(monkeypatch):
+    loader = make_loader(FakeCursor(fetchone=[(1,)]))
+    state = LiveGameState(scoreboard_game(entry("0022500101"), GAME_DATE), 3)
+    poll_ready(monkeypatch, loader, feed(final=True))
+    monkeypatch.setattr(loader.pbp_loader, "ensure_partition", lambda cur, season_id: None)
+    assert loader.poll_game(state) == 0
+    assert state.is_final
+
+def test_run_gives_up_on_games_that_never_end(monkeypatch):
+    loader = make_loader()
+    stale = datetime.now(timezone.utc) - timedelta(hours=12)
+    monkeypatch.setattr(loader, "track_scheduled_games", lambda: loader.games.update(
+        {22500101: LiveGameState(scoreboard_game(entry("0022500101"), GAME_DATE), 0, stale)}
+    ))
+    monkeypatch.setattr(loader, "poll_game", lambda state: pytest.fail("a given up game was polled"))
+    loader.run()
+    assert loader.games[22500101].gave_up and not loader.games[22500101].is_final
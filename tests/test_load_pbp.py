@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+from loaders import loadPBP
+from loaders.loadPBP import PBPDataLoader, PBP_COLUMNS
+from tests.events import pbp_events
+from tests.fakes import FakeConnection, FakeCursor
+
+GAMES = [(22500001, "regular", 22025, 1, 2, "LAL", "BOS", None), (22500002, "regular", 22025, 1, 2, "LAL", "BOS", None),
+         (22400001, "regular", 22024, 1, 2, "LAL", "BOS", None)]
+
+def test_load_pbp_data_counts_only_stored_games(monkeypatch):
+    loader = PBPDataLoader(FakeConnection(FakeCursor(fetchall=GAMES)), update=False, whole_current_season=False, season_ids=[22025])
+    feeds = {22500001: pd.DataFrame({"actionNumber": [1, 2]}), 22500002: pd.DataFrame()}
+    stored = []
+    monkeypatch.setattr(loader, "fetch_game_actions", lambda game_id: feeds[game_id])
+    monkeypatch.setattr(loader, "build_event_rows", lambda df, game: [game[0]] * len(df))
+    monkeypatch.setattr(loader, "store_game_events", lambda game_id, season_id, rows: stored.append(game_id))
+    # the empty feed for 22500002 is skipped, and doesn't count as loaded
+    assert loader.load_pbp_data() == {"games": 1, "events": 2}
+    assert stored == [22500001]
+
+class QueuedCursor(FakeCursor):
+    # one fetchall result per query, in order
+    def __init__(self, results):
+        super().__init__()
+        self.results = list(results)
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+def test_rebuild_derived_reads_stored_events_without_the_api(monkeypatch):
+    events = pbp_events([{"event_type": "2pt", "shooter_id": 1, "shot_made": True, "shot_value": 2}])
+    rows = [tuple(row) for row in events[PBP_COLUMNS].itertuples(index=False)]
+    # player ids, then the stored games, then each game's events
+    cur = QueuedCursor([[], [(22500001, 22025), (22500002, 22025)], rows, rows])
+    loader = PBPDataLoader(FakeConnection(cur), update=False, whole_current_season=False, season_ids=[22025])
+    rebuilt, bumped = [], []
+    monkeypatch.setattr(loader, "fetch_game_actions", lambda game_id: pytest.fail("rebuild must not call the api"))
+    monkeypatch.setattr(loader, "store_derived",
+                        lambda cur, game_id, events, builders: rebuilt.append((game_id, len(events))) or game_id == 22500001)
+    monkeypatch.setattr(loadPBP, "bump_data_version", lambda cur, season_ids: bumped.extend(season_ids))
+    assert loader.rebuild_derived() == {"games": 2, "events": 2}
+    assert rebuilt == [(22500001, 1), (22500002, 1)]
+    # only the game whose derived rows changed bumps its season
+    assert bumped == [22025]
+    assert any("FROM pbp_raw_event WHERE season_id = %s AND game_id = %s" in statement for statement in cur.statements)
@@ -0,0 +1,53 @@
+import logging
+from types import SimpleNamespace
+import pytest
+from app.services.oracle import FOLLOWUP_NEEDS_SCHEMA, Oracle, asks_for_schema
+
+class StubResponses:
+    def __init__(self, replies: list[str]):
+        self.replies = replies
+        self.prompts = []
+
+    def create(self, model, input):
+        self.prompts.append(input)
+        return SimpleNamespace(output_text=self.replies.pop(0), usage=None)
+
+def oracle(replies: list[str] | None = None) -> Oracle:
+    client = SimpleNamespace(responses=StubResponses(replies or []))
+    return Oracle(logger=logging.getLogger("test"), schema="-- schema", client=client)
+
+TURNS = [{"question": "who led the league in assists?", "sql": "SELECT 1",
+          "result": {"columns": ["player"], "rows": [["x"]], "row_count": 1}}]
+
+@pytest.mark.parametrize("query", [
+    "",
+    "   ",
+    "DELETE FROM player",
+    "SELECT * FROM player; DROP TABLE player",
+    "SELECT * FROM player -- hi",
+    "SELECT * FROM player /* hi */",
+    "WITH x AS (DELETE FROM player RETURNING *) SELECT * FROM x",
+    "SELECT * FROM player WHERE id IN (SELECT 1) " + "x" * 5000,
+    "SELECT * FROM player FOR UPDATE; COPY player TO STDOUT",
+])
+def test_sanitize_sql_rejects_unsafe_queries(query):
+    assert oracle().sanitize_sql(query) == ""
+
+def test_sanitize_sql_keeps_selects_and_drops_the_trailing_semicolon():
+    assert oracle().sanitize_sql("  SELECT full_name FROM player;  ") == "SELECT full_name FROM player"
+    assert oracle().sanitize_sql("with t as (select 1) select * from t") == "with t as (select 1) select * from t"
+    # keywords only count as whole words
+    assert oracle().sanitize_sql("SELECT created_at, updated_by FROM player") == "SELECT created_at, updated_by FROM player"
+
+@pytest.mark.parametrize("reply", [FOLLOWUP_NEEDS_SCHEMA, "NEW_QUESTION.", "`NEW_QUESTION`", "```\nNEW_QUESTION\n```",
+                                   "```sql\nNEW_QUESTION\n```", " new_question "])
+def test_followups_needing_the_schema_fall_back_to_the_full_prompt(reply):
+    o = oracle([reply, "SELECT 2"])
+    assert asks_for_schema(reply)
+    assert o.get_followup_sql("what about rebounds?", TURNS) == "SELECT 2"
+    assert 'following up on: "who led the league in assists?"' in o.client.responses.prompts[-1]
+
+def test_followup_sql_is_returned_without_code_fences():
+    o = oracle(["SELECT 3```"])
+    assert o.get_followup_sql("and last season?", TURNS) == "SELECT 3"
+    assert not asks_for_schema("SELECT NEW_QUESTION FROM x")
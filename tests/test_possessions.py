@@ -0,0 +1,82 @@
+import pandas as pd
+from loaders.buildPossessions import PossessionBuilder
+from tests.events import AWAY, HOME, pbp_events
+
+# the feed flips possession_team_id on the event that ends a possession, including single-event ones (the away
+# turnover at 3 and the home make at 7)
+EVENTS = pbp_events([
+    {"event_type": "period", "event_subtype": "start", "clock_seconds": 720, "possession_team_id": HOME},
+    {"event_type": "2pt", "shot_made": True, "event_team_id": HOME, "clock_seconds": 700, "home_score": 2, "possession_team_id": AWAY},
+    {"event_type": "turnover", "event_team_id": AWAY, "clock_seconds": 690, "possession_team_id": HOME},
+    {"event_type": "3pt", "shot_made": False, "event_team_id": HOME, "clock_seconds": 675, "possession_team_id": HOME},
+    {"event_type": "rebound", "offensive_rebound": False, "event_team_id": AWAY, "clock_seconds": 673, "possession_team_id": AWAY},
+    {"event_type": "2pt", "shot_made": True, "event_team_id": AWAY, "clock_seconds": 660, "away_score": 2, "possession_team_id": HOME},
+    {"event_type": "2pt", "shot_made": True, "event_team_id": HOME, "clock_seconds": 655, "home_score": 4, "possession_team_id": AWAY},
+    {"event_type": "2pt", "shot_made": False, "event_team_id": AWAY, "clock_seconds": 640, "possession_team_id": AWAY},
+    {"event_type": "rebound", "offensive_rebound": False, "event_team_id": HOME, "clock_seconds": 638, "possession_team_id": HOME},
+    {"event_type": "freethrow", "event_subtype": "1 of 2", "shot_made": True, "event_team_id": HOME, "clock_seconds": 630, "home_score": 5, "possession_team_id": HOME},
+    {"event_type": "freethrow", "event_subtype": "2 of 2", "shot_made": True, "event_team_id": HOME, "clock_seconds": 630, "home_score": 6, "possession_team_id": AWAY},
+    {"event_type": "period", "event_subtype": "end", "clock_seconds": 0, "possession_team_id": AWAY},
+    {"event_type": "period", "event_subtype": "start", "period": 2, "clock_seconds": 720, "possession_team_id": AWAY},
+    {"event_type": "3pt", "shot_made": True, "event_team_id": AWAY, "clock_seconds": 700, "away_score": 5, "possession_team_id": HOME},
+    {"event_type": "period", "event_subtype": "end", "clock_seconds": 0, "possession_team_id": HOME},
+    {"event_type": "game", "event_subtype": "end", "clock_seconds": 0, "possession_team_id": HOME},
+])
+
+def test_offense_is_the_team_entering_the_possession():
+    possessions = PossessionBuilder().build(EVENTS)
+    assert possessions["offense_team_id"].tolist() == [HOME, AWAY, HOME, AWAY, HOME, AWAY, HOME, AWAY, AWAY, HOME]
+    assert possessions["start_event_num"].tolist() == [1, 3, 4, 6, 7, 8, 10, 12, 13, 15]
+    assert (possessions["defense_team_id"] != possessions["offense_team_id"]).all()
+    assert possessions["possession_num"].tolist() == list(range(1, 11))
+
+def test_possession_points_sum_to_the_final_score():
+    possessions = PossessionBuilder().build(EVENTS)
+    points = possessions.groupby("offense_team_id")["points"].sum()
+    assert points[HOME] == 6 and points[AWAY] == 5
+    assert (possessions["points"] >= 0).all()
+
+def test_possession_results():
+    possessions = PossessionBuilder().build(EVENTS)
+    assert possessions["result"].tolist() == ["made_shot", "turnover", "missed_shot", "made_shot", "made_shot", "missed_shot",
+                                              "free_throws", "end_of_period", "made_shot", "end_of_period"]
+
+def test_an_and_one_stays_in_the_shooting_possession():
+    events = pbp_events([
+        {"event_type": "period", "event_subtype": "start", "clock_seconds": 720, "possession_team_id": HOME},
+        {"event_type": "2pt", "shot_made": True, "event_team_id": HOME, "clock_seconds": 700, "home_score": 2, "possession_team_id": AWAY},
+        {"event_type": "freethrow", "event_subtype": "1 of 1", "shot_made": True, "event_team_id": HOME, "clock_seconds": 700, "home_score": 3, "possession_team_id": AWAY},
+        {"event_type": "period", "event_subtype": "end", "clock_seconds": 0, "possession_team_id": AWAY},
+    ])
+    possessions = PossessionBuilder().build(events)
+    assert possessions["offense_team_id"].tolist() == [HOME, AWAY]
+    assert possessions["points"].tolist() == [3, 0]
+
+def test_no_events_no_possessions():
+    assert PossessionBuilder().build(pbp_events([])).empty
+
+def test_a_flip_without_an_explicit_end_still_ends_the_possession():
+    events = pbp_events([
+        {"event_type": "period", "event_subtype": "start", "clock_seconds": 720, "possession_team_id": HOME},
+        {"event_type": "violation", "event_team_id": HOME, "clock_seconds": 710, "possession_team_id": AWAY},
+        {"event_type": "2pt", "shot_made": True, "event_team_id": AWAY, "clock_seconds": 700, "away_score": 2, "possession_team_id": HOME},
+        {"event_type": "period", "event_subtype": "end", "clock_seconds": 0, "possession_team_id": HOME},
+    ])
+    possessions = PossessionBuilder().build(events)
+    assert possessions["offense_team_id"].tolist() == [HOME, AWAY, HOME]
+    assert possessions["end_event_num"].tolist() == [2, 3, 4]
+    assert possessions["points"].tolist() == [0, 2, 0]
+
+def test_a_period_starting_with_the_other_teams_ball_is_not_a_flip():
+    events = pbp_events([
+        {"event_type": "period", "event_subtype": "start", "clock_seconds": 720, "possession_team_id": HOME},
+        {"event_type": "turnover", "event_team_id": HOME, "clock_seconds": 700, "possession_team_id": AWAY},
+        {"event_type": "period", "event_subtype": "end", "clock_seconds": 0, "possession_team_id": AWAY},
+        {"event_type": "period", "event_subtype": "start", "period": 2, "clock_seconds": 720, "possession_team_id": HOME},
+        {"event_type": "2pt", "shot_made": True, "event_team_id": HOME, "clock_seconds": 700, "home_score": 2, "possession_team_id": AWAY},
+        {"event_type": "period", "event_subtype": "end", "clock_seconds": 0, "possession_team_id": AWAY},
+    ])
+    possessions = PossessionBuilder().build(events)
+    assert possessions["start_event_num"].tolist() == [1, 3, 4, 6]
+    assert possessions["offense_team_id"].tolist() == [HOME, AWAY, HOME, AWAY]
+    assert possessions["points"].tolist() == [0, 0, 2, 0]
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+import psycopg
+import pytest
+from fastapi.testclient import TestClient
+import app.api.sessions as sessions_api
+from app.core.config import settings
+from app.db.db import get_async_conn_ro
+from app.main import app
+from app.models.user import UserInDB
+from app.services.auth_service import get_current_active_user
+from app.services.data_version import DataVersions
+from app.services.rate_limiting import limiter
+from app.services.sessions import ConversationSession, ResultCache, compact_result, get_session, save_turn
+from tests.fakes import FakeAsyncConnection, FakeAsyncCursor
+
+def test_compact_result_keeps_a_json_friendly_sample():
+    rows = [(i, Decimal("1.5"), "x" * 100, date(2025, 1, 1), None) for i in range(settings.SESSION_RESULT_ROWS + 5)]
+    compact = compact_result({"columns": ["id", "avg", "name", "day", "none"], "rows": rows})
+    assert compact["row_count"] == len(rows) and len(compact["rows"]) == settings.SESSION_RESULT_ROWS
+    assert compact["rows"][0] == [0, "1.5", "x" * 64, "2025-01-01", None]
+
+def test_result_cache_keys_on_normalized_sql_and_data_version():
+    versions = DataVersions()
+    cache = ResultCache(versions, max_entries=2)
+    result = {"columns": ["n"], "rows": [(1,)]}
+    cache.put("SELECT count(*)\n  FROM game;", result)
+    assert cache.get("SELECT count(*) FROM game") is result
+    versions.apply(22025, 1)
+    assert cache.get("SELECT count(*) FROM game") is None
+
+def test_result_cache_evicts_the_least_recently_used():
+    cache = ResultCache(DataVersions(), max_entries=2)
+    cache.put("SELECT 1", {"rows": [1]})
+    cache.put("SELECT 2", {"rows": [2]})
+    cache.get("SELECT 1")
+    cache.put("SELECT 3", {"rows": [3]})
+    assert cache.get("SELECT 2") is None and cache.get("SELECT 1") and cache.get("SELECT 3")
+
+def test_save_turn_appends_and_trims_in_the_database():
+    stored = [{"question": "q1", "sql": "SELECT 1", "result": {}}, {"question": "q2", "sql": "SELECT 2", "result": {}}]
+    cur = FakeAsyncCursor(fetchone=[(stored,)])
+    session = ConversationSession(id="s", user_email="a@example.com", turns=stored[:1])
+    asyncio.run(save_turn(FakeAsyncConnection(cur), session, "q2", "SELECT 2", {"columns": ["n"], "rows": [(2,)]}))
+    statement, params = cur.statements[-1], cur.params[-1]
+    # no read-modify-write of the list loaded with the session: the new turn is appended to whatever is stored now
+    assert "turns || %s::jsonb" in statement and "LIMIT %s" in statement
+    assert params[0].obj == [{"question": "q2", "sql": "SELECT 2", "result": {"columns": ["n"], "rows": [[2]], "row_count": 1}}]
+    assert params[1:] == (settings.SESSION_MAX_TURNS, "s", "a@example.com")
+    assert session.turns == stored
+
+def test_get_session_is_scoped_to_the_user():
+    cur = FakeAsyncCursor(fetchone=[None])
+    assert asyncio.run(get_session(FakeAsyncConnection(cur), "s", "b@example.com")) is None
+    assert cur.params[-1][1:] == ("s", "b@example.com")
+
+class BrokenPool:
+    def connection(self):
+        raise psycopg.OperationalError("connection refused")
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    monkeypatch.setattr(sessions_api, "get_async_pool_rw", lambda: BrokenPool())
+    app.dependency_overrides[get_current_active_user] = lambda: UserInDB(email="test@example.com", full_name="test", password_hash="-")
+    app.dependency_overrides[get_async_conn_ro] = lambda: FakeAsyncConnection()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def test_session_endpoints_answer_500_when_the_database_is_down(client):
+    assert client.post("/sessions").status_code == 500
+    response = client.post("/sessions/s/question", json={"question": "and last season?"})
+    assert response.status_code == 500 and response.json()["detail"] == "DB Error when loading session."
+    assert client.delete("/sessions/s").status_code == 500
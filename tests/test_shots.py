@@ -0,0 +1,51 @@
+import pandas as pd
+from loaders.buildShots import COURT_LENGTH, COURT_WIDTH, BASKET_FROM_BASELINE, ShotBuilder
+from tests.events import AWAY, HOME, pbp_events
+
+# the feed's x runs along the court's length and y across it, both as percentages
+def feed_point(x_feet: float, y_feet: float, side: str) -> tuple[float, float]:
+    from_baseline = y_feet + BASKET_FROM_BASELINE
+    if side == "right":
+        return (COURT_LENGTH - from_baseline) / COURT_LENGTH * 100, (COURT_WIDTH / 2 - x_feet) / COURT_WIDTH * 100
+    return from_baseline / COURT_LENGTH * 100, (x_feet + COURT_WIDTH / 2) / COURT_WIDTH * 100
+
+def shot(x_feet, y_feet, side, area, shot_value=2, team_id=HOME):
+    shot_x, shot_y = feed_point(x_feet, y_feet, side)
+    return {"event_type": f"{shot_value}pt", "shot_value": shot_value, "shot_made": False, "event_team_id": team_id,
+            "shooter_id": 101 if team_id == HOME else 201, "side": side, "shot_x": shot_x, "shot_y": shot_y,
+            "area": area, "clock_seconds": 600}
+
+SHOTS = [
+    shot(0, 2, "left", "Restricted Area"),
+    shot(-5, 10, "right", "In The Paint (Non-RA)", team_id=AWAY),
+    shot(12, 12, "left", "Mid-Range"),
+    shot(-23, 3, "left", "Left Corner 3", shot_value=3),
+    shot(23, 3, "right", "Right Corner 3", shot_value=3, team_id=AWAY),
+    shot(0, 26, "right", "Above the Break 3", shot_value=3),
+    shot(0, 60, "left", "Backcourt", shot_value=3),
+]
+
+def test_coordinates_are_normalized_to_the_attacking_basket():
+    shots = ShotBuilder().build(pbp_events(SHOTS))
+    assert shots["x"].round(6).tolist() == [0, -5, 12, -23, 23, 0, 0]
+    assert shots["y"].round(6).tolist() == [2, 10, 12, 3, 3, 26, 60]
+
+def test_derived_zone_matches_the_feed_area():
+    shots = ShotBuilder().build(pbp_events(SHOTS))
+    assert shots["zone"].tolist() == shots["area"].tolist()
+
+def test_shots_without_a_side_keep_the_feed_area_and_no_coordinates():
+    events = pbp_events([shot(12, 12, "left", "Mid-Range"), shot(0, 2, "left", "Restricted Area")])
+    events.loc[0, "side"] = None
+    shots = ShotBuilder().build(events)
+    first = shots.iloc[0]
+    assert pd.isna(first["x"]) and pd.isna(first["y"]) and pd.isna(first["bin"])
+    assert first["zone"] == "Mid-Range"
+    assert shots.iloc[1]["zone"] == "Restricted Area" and not pd.isna(shots.iloc[1]["bin"])
+
+def test_only_attributed_field_goals_become_shots():
+    events = pbp_events(SHOTS[:1] + [{"event_type": "freethrow", "shooter_id": 101, "clock_seconds": 600},
+                                     {**SHOTS[1], "shooter_id": None}])
+    shots = ShotBuilder().build(events)
+    assert shots["event_num"].tolist() == [1]
+    assert shots["shooter_id"].dtype == "int64"
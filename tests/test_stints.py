@@ -0,0 +1,50 @@
+from loaders.buildStints import LineupStintBuilder, PlayerStintBuilder, lineup_hash, period_starters
+from loaders.derived import ordered_events
+from tests.events import AWAY, HOME, pbp_events
+
+HOME_PLAYERS = [101, 102, 103, 104, 105]
+AWAY_PLAYERS = [201, 202, 203, 204, 205]
+HOME_SUB = 106
+
+def shot(team_id, shooter_id, clock_seconds, **score):
+    return {"event_type": "2pt", "shot_made": bool(score), "event_team_id": team_id, "shooter_id": shooter_id,
+            "clock_seconds": clock_seconds, **score}
+
+# every starter shows up before the home substitution at 600 (106 for 105), 106 then scores
+EVENTS = pbp_events(
+    [{"event_type": "period", "event_subtype": "start", "clock_seconds": 720}]
+    + [shot(HOME, p, 710 - i) for i, p in enumerate(HOME_PLAYERS)]
+    + [shot(AWAY, p, 700 - i) for i, p in enumerate(AWAY_PLAYERS)]
+    + [shot(HOME, 101, 650, home_score=2), shot(AWAY, 201, 640, away_score=2),
+       {"event_type": "substitution", "event_team_id": HOME, "sub_in_id": HOME_SUB, "sub_out_id": 105, "clock_seconds": 600},
+       shot(HOME, HOME_SUB, 500, home_score=4), shot(AWAY, 202, 400, away_score=4),
+       {"event_type": "period", "event_subtype": "end", "clock_seconds": 0}]
+)
+
+def test_period_starters_are_players_seen_before_being_subbed_in():
+    ev = ordered_events(EVENTS)
+    assert period_starters(ev, HOME) == HOME_PLAYERS
+    assert period_starters(ev, AWAY) == AWAY_PLAYERS
+
+def test_lineup_stints_split_at_substitutions():
+    stints = LineupStintBuilder().build(EVENTS)
+    home = stints[stints["team_id"] == HOME]
+    assert home["player_ids"].tolist() == [HOME_PLAYERS, sorted(HOME_PLAYERS[:4] + [HOME_SUB])]
+    assert home["seconds_played"].tolist() == [120, 600]
+    assert home["lineup_hash"].tolist() == [lineup_hash(ids) for ids in home["player_ids"]]
+    assert home["stint_num"].tolist() == [1, 2]
+
+def test_lineup_stints_cover_the_period_and_the_final_score():
+    stints = LineupStintBuilder().build(EVENTS)
+    for team_id, score, opponent_score in ((HOME, 4, 4), (AWAY, 4, 4)):
+        team = stints[stints["team_id"] == team_id]
+        assert team["seconds_played"].sum() == 720
+        assert team["points_for"].sum() == score and team["points_against"].sum() == opponent_score
+
+def test_player_stints_follow_each_player_on_court():
+    stints = PlayerStintBuilder().build(EVENTS).set_index("player_id")
+    assert stints.loc[105, "seconds_played"] == 120
+    assert stints.loc[HOME_SUB, "seconds_played"] == 600
+    assert stints.loc[101, "seconds_played"] == 720 and stints.loc[101, "points_for"] == 4
+    assert stints.loc[HOME_SUB, ["points_for", "points_against"]].tolist() == [2, 2]
+    assert (PlayerStintBuilder().build(EVENTS).groupby("team_id")["seconds_played"].sum() == 5 * 720).all()
@@ -0,0 +1,64 @@
+import random
+import pandas as pd
+import pytest
+from loaders.buildPossessions import PossessionBuilder
+from loaders.buildShots import ShotBuilder
+from loaders.buildBoxScores import PlayerBoxScoreBuilder, TeamBoxScoreBuilder
+from loaders.loadPBP import PBPDataLoader, PBP_COLUMNS
+from loaders.syntheticLoader import FEED_COLUMNS, SHOT_ZONES, SyntheticGame, _feed_coordinates, _shot_location, roster
+from tests.events import pbp_events
+from tests.fakes import FakeConnection, FakeCursor
+
+HOME, AWAY = (1610612747, "LAL", roster(0)), (1610612738, "BOS", roster(1))
+
+# a few simulated games run through the same transform as real feeds
+@pytest.fixture(scope="module")
+def games():
+    players = [(p,) for team in (HOME, AWAY) for p in team[2]]
+    loader = PBPDataLoader(FakeConnection(FakeCursor(fetchall=players)), update=False, whole_current_season=False)
+    rng = random.Random(7)
+    played = []
+    for number in range(1, 6):
+        game = SyntheticGame(rng, [HOME, AWAY])
+        actions = pd.DataFrame(game.play(), columns=FEED_COLUMNS)
+        game_tuple = (9000000000 + number, "regular", 22900, HOME[0], AWAY[0], HOME[1], AWAY[1], None)
+        played.append((game, pd.DataFrame(loader.build_event_rows(actions, game_tuple), columns=PBP_COLUMNS)))
+    return played
+
+@pytest.mark.parametrize("area", [zone[0] for zone in SHOT_ZONES])
+def test_shot_locations_classify_back_to_their_area(area):
+    rng = random.Random(area)
+    value = next(zone[2] for zone in SHOT_ZONES if zone[0] == area)
+    actions = []
+    for _ in range(2000):
+        side = rng.choice(["left", "right"])
+        shot_x, shot_y = _feed_coordinates(*_shot_location(rng, area), side)
+        actions.append({"event_type": f"{value}pt", "shot_value": value, "shooter_id": 101, "side": side,
+                        "shot_x": shot_x, "shot_y": shot_y, "area": area, "clock_seconds": 600})
+    assert set(ShotBuilder().build(pbp_events(actions))["zone"]) == {area}
+
+def test_derived_zones_match_the_feed_area(games):
+    for _, events in games:
+        shots = ShotBuilder().build(events)
+        assert len(shots) > 50
+        assert (shots["zone"] == shots["area"]).all()
+
+def test_possession_points_sum_to_the_final_score(games):
+    for game, events in games:
+        possessions = PossessionBuilder().build(events)
+        points = possessions.groupby("offense_team_id")["points"].sum()
+        assert points.get(HOME[0], 0) == game.score[0]
+        assert points.get(AWAY[0], 0) == game.score[1]
+        # possessions alternate within a period
+        for _, period in possessions.groupby("period"):
+            offense = period["offense_team_id"].tolist()
+            assert all(a != b for a, b in zip(offense, offense[1:]))
+
+def test_box_scores_match_the_simulated_stats(games):
+    for game, events in games:
+        teams = TeamBoxScoreBuilder().build(events).set_index("team_id")
+        players = PlayerBoxScoreBuilder().build(events).groupby("team_id")["pts"].sum()
+        for index, (team_id, _, _) in enumerate((HOME, AWAY)):
+            assert teams.loc[team_id, "pts"] == game.score[index] == players[team_id]
+            assert teams.loc[team_id, "field_goals_attempted"] == game.stats[index]["fga"]
+            assert teams.loc[team_id, "free_throws_made"] == game.stats[index]["ftm"]